@@ -0,0 +1,264 @@
+# bench_funcoes.py
+"""
+Benchmarks de ferramentas.funcoes: tempo e pico de memória de cada função pública
+com dados sintéticos de tamanho crescente, em JSON para comparar entre execuções.
+Média e variância são medidas também em cada modo numérico (ferramentas.precisao).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_funcoes                          # grava benchmarks/resultado.json
+    python -m benchmarks.bench_funcoes --rapido                 # tamanhos menores
+    python -m benchmarks.bench_funcoes --salvar-baseline        # grava benchmarks/baseline.json
+    python -m benchmarks.bench_funcoes --comparar benchmarks/baseline.json --tolerancia 0.25
+
+Com --comparar, o código de saída é 1 se alguma função ficou mais lenta que
+baseline * (1 + tolerância) (diferenças abaixo de 1 ms são tratadas como ruído).
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ferramentas import funcoes, precisao
+from ferramentas.cache import cache_resultados
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+SEMENTE = 20240601
+RUIDO_S = 1e-3
+
+
+# -------------------------------
+# Geradores sintéticos (determinísticos pela semente)
+# -------------------------------
+def gerar_tabela_discreta(distintos: int, total: int, semente: int = SEMENTE) -> pd.DataFrame:
+    """Tabela (xi, fi) com 'distintos' valores e soma de fi ~= 'total'."""
+    rng = np.random.default_rng(semente)
+    xi = np.round(rng.normal(50, 15, distintos), 2)
+    pesos = rng.random(distintos)
+    fi = np.maximum(1, np.floor(pesos / pesos.sum() * total))
+    return pd.DataFrame({"xi": xi, "fi": fi})
+
+
+def gerar_texto(quantidade: int, semente: int = SEMENTE) -> str:
+    """Valores brutos separados por espaço, metade com vírgula decimal."""
+    rng = np.random.default_rng(semente)
+    valores = np.round(rng.normal(50, 15, quantidade), 1).astype(str)
+    valores[::2] = np.char.replace(valores[::2], ".", ",")
+    return " ".join(valores)
+
+
+def gerar_tabela_classes(linhas: int, semente: int = SEMENTE) -> pd.DataFrame:
+    """Classes contíguas de amplitude 2 com frequências aleatórias."""
+    rng = np.random.default_rng(semente)
+    li = np.arange(linhas, dtype=float) * 2
+    return pd.DataFrame({"Li": li, "Ls": li + 2, "fi": rng.integers(0, 100, linhas).astype(float)})
+
+
+def gerar_tabela_larga(linhas: int, colunas: int, grupos: int, semente: int = SEMENTE) -> pd.DataFrame:
+    """Várias colunas numéricas (uma casa decimal) e uma coluna de grupo com 'grupos' categorias."""
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame(np.round(rng.normal(50, 15, (linhas, colunas)), 1), columns=[f"c{i}" for i in range(colunas)])
+    df["grupo"] = rng.integers(0, grupos, linhas).astype(str)
+    return df
+
+
+# -------------------------------
+# Casos: (função, descrição, tamanho, chamada)
+# -------------------------------
+def montar_casos(rapido: bool) -> list:
+    tamanhos_discretos = [(10, 1_000), (1_000, 1_000_000)] if rapido else \
+        [(10, 1_000), (1_000, 1_000_000), (100_000, 1_000_000_000)]
+    tamanhos_texto = [1_000, 100_000] if rapido else [1_000, 100_000, 1_000_000]
+    tamanhos_classes = [10, 1_000] if rapido else [10, 1_000, 100_000]
+    tamanhos_largos = [(1_000, 10)] if rapido else [(1_000, 10), (100_000, 30)]
+
+    casos = []
+    for distintos, total in tamanhos_discretos:
+        df = gerar_tabela_discreta(distintos, total)
+        desc = f"discreto d={distintos} N={total}"
+        for nome in ("media_ponderada_df", "mediana_df", "moda_df", "variancia_df", "descrever_discreto",
+                     "tabela_frequencias_discreta"):
+            casos.append((nome, desc, distintos, lambda f=getattr(funcoes, nome), df=df: f(df)))
+        casos.append(("planejar_medidas", desc, distintos,
+                      lambda: funcoes.planejar_medidas(["coeficiente_variacao"], funcoes.DEPENDENCIAS_DISCRETO)))
+        # Custo de cada modo numérico (o caso sem modo acima usa "auto")
+        for modo in ("rapido", "exato"):
+            for nome in ("media_ponderada_df", "variancia_df"):
+                casos.append((nome, f"{desc} modo={modo}", distintos,
+                              lambda f=getattr(funcoes, nome), df=df, m=modo: f(df, modo=m)))
+
+    for quantidade in tamanhos_texto:
+        texto = gerar_texto(quantidade)
+        desc = f"texto n={quantidade}"
+        casos.append(("parse_numeros", desc, quantidade, lambda t=texto: funcoes.parse_numeros(t)))
+        casos.append(("iterar_blocos_numeros", desc, quantidade,
+                      lambda t=texto: sum(len(b) for b in funcoes.iterar_blocos_numeros(t))))
+        casos.append(("contar_numeros", desc, quantidade, lambda t=texto: funcoes.contar_numeros(t)))
+        # Blocos extraídos no pool de processos (o pico de memória medido é só o deste processo)
+        casos.append(("contar_numeros", f"{desc} processos", quantidade,
+                      lambda t=texto: funcoes.contar_numeros(t, processos=True)))
+
+        valores = np.random.default_rng(SEMENTE).normal(50, 15, quantidade)
+        casos.append(("arredondar_array", f"array n={quantidade}", quantidade,
+                      lambda v=valores: funcoes.arredondar_array(v)))
+        for regra in ("sturges", "fd"):
+            casos.append(("construir_classes", f"array n={quantidade} {regra}", quantidade,
+                          lambda v=valores, r=regra: funcoes.construir_classes(v, r)))
+        if quantidade <= 100_000:
+            casos.append(("arredondar", f"laço n={quantidade}", quantidade,
+                          lambda v=valores.tolist(): [funcoes.arredondar(x) for x in v]))
+        # Somas: referência sem compensação (np.sum) contra os dois modos de precisao
+        casos.append(("np.sum", f"array n={quantidade} (referência)", quantidade, lambda v=valores: float(v.sum())))
+        for modo in ("rapido", "exato"):
+            casos.append(("precisao.soma", f"array n={quantidade} modo={modo}", quantidade,
+                          lambda v=valores, m=modo: precisao.soma(v, m)))
+
+    for linhas in tamanhos_classes:
+        df = gerar_tabela_classes(linhas)
+        desc = f"classes k={linhas}"
+        for nome in ("media_agrupada", "mediana_agrupada", "moda_agrupada", "descrever_agrupado",
+                     "tabela_frequencias_classes"):
+            casos.append((nome, desc, linhas, lambda f=getattr(funcoes, nome), df=df: f(df)))
+        casos.append(("variancia_agrupada", desc, linhas, lambda df=df: funcoes.variancia_agrupada(df, 50.0)))
+        for modo in ("rapido", "exato"):
+            casos.append(("media_agrupada", f"{desc} modo={modo}", linhas,
+                          lambda df=df, m=modo: funcoes.media_agrupada(df, m)))
+            casos.append(("variancia_agrupada", f"{desc} modo={modo}", linhas,
+                          lambda df=df, m=modo: funcoes.variancia_agrupada(df, 50.0, m)))
+
+    for linhas, colunas in tamanhos_largos:
+        df = gerar_tabela_larga(linhas, colunas, grupos=12)
+        desc = f"larga {linhas}x{colunas} 12 grupos"
+        casos.append(("descrever_colunas", desc, linhas * colunas,
+                      lambda df=df: funcoes.descrever_colunas(df, "grupo")))
+        casos.append(("descrever_colunas", f"{desc} sem moda", linhas * colunas,
+                      lambda df=df: funcoes.descrever_colunas(df, "grupo", medidas=["media", "mediana",
+                                                                                    "coeficiente_variacao"])))
+        # Caminho de ler_colunas: contagens por lote, somadas e descritas no fim
+        metade = len(df) // 2
+        partes = [funcoes.contar_colunas(df.iloc[:metade], "grupo"), funcoes.contar_colunas(df.iloc[metade:], "grupo")]
+        contagens = funcoes.mesclar_contagens(partes)
+        casos.append(("contar_colunas", desc, linhas * colunas, lambda df=df: funcoes.contar_colunas(df, "grupo")))
+        casos.append(("mesclar_contagens", f"{desc} 2 partes", linhas * colunas,
+                      lambda p=partes: funcoes.mesclar_contagens(p)))
+        casos.append(("descrever_colunas_contagens", desc, linhas * colunas,
+                      lambda c=contagens: funcoes.descrever_colunas_contagens(c)))
+    return casos
+
+
+def funcoes_publicas() -> set:
+    return {nome for nome, obj in inspect.getmembers(funcoes, inspect.isfunction)
+            if not nome.startswith("_") and obj.__module__ == funcoes.__name__}
+
+
+# -------------------------------
+# Medição
+# -------------------------------
+def medir(chamada, repeticoes: int) -> dict:
+    """
+    Tempo (mínimo e mediana de 'repeticoes' execuções) e pico de memória (tracemalloc,
+    execução separada para não distorcer o tempo). O cache de resultados é limpo
+    antes de cada execução, para medir o cálculo e não o acerto no cache.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        cache_resultados.limpar()
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append(time.perf_counter() - inicio)
+
+    cache_resultados.limpar()
+    tracemalloc.start()
+    chamada()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"tempo_min_s": min(tempos), "tempo_mediana_s": statistics.median(tempos), "pico_bytes": pico}
+
+
+def executar(rapido: bool, repeticoes: int, filtro=None) -> dict:
+    casos = montar_casos(rapido)
+    faltando = funcoes_publicas() - {c[0] for c in casos}
+    if faltando:
+        print(f"Aviso: funções sem benchmark: {', '.join(sorted(faltando))}", file=sys.stderr)
+
+    resultados = []
+    for nome, desc, tamanho, chamada in casos:
+        if filtro and filtro not in nome:
+            continue
+        medida = medir(chamada, repeticoes)
+        resultados.append({"funcao": nome, "caso": desc, "tamanho": tamanho, **medida})
+        print(f"{nome:<24} {desc:<32} {medida['tempo_min_s'] * 1e3:>10.2f} ms "
+              f"{medida['pico_bytes'] / 2**20:>10.2f} MiB", file=sys.stderr)
+
+    return {
+        "ambiente": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+    }
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list:
+    """
+    Lista de regressões: casos (função, caso) mais lentos que o baseline além da tolerância.
+    """
+    base = {(r["funcao"], r["caso"]): r for r in baseline["resultados"]}
+    regressoes = []
+    for r in atual["resultados"]:
+        b = base.get((r["funcao"], r["caso"]))
+        if b is None:
+            continue
+        limite = b["tempo_min_s"] * (1 + tolerancia)
+        if r["tempo_min_s"] > limite and r["tempo_min_s"] - b["tempo_min_s"] > RUIDO_S:
+            regressoes.append({
+                "funcao": r["funcao"], "caso": r["caso"],
+                "baseline_s": b["tempo_min_s"], "atual_s": r["tempo_min_s"],
+                "razao": r["tempo_min_s"] / b["tempo_min_s"],
+            })
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_funcoes", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rapido", action="store_true", help="usa apenas os tamanhos menores")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--filtro", default=None, help="mede só funções cujo nome contém este texto")
+    parser.add_argument("--saida", default=os.path.join(PASTA, "resultado.json"))
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava também em benchmarks/baseline.json")
+    parser.add_argument("--comparar", default=None, help="JSON de baseline para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="lentidão aceita (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    atual = executar(args.rapido, args.repeticoes, args.filtro)
+    destinos = [args.saida] + ([os.path.join(PASTA, "baseline.json")] if args.salvar_baseline else [])
+    for destino in destinos:
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(atual, json.load(f), args.tolerancia)
+        for r in regressoes:
+            print(f"REGRESSÃO {r['funcao']} [{r['caso']}]: {r['baseline_s'] * 1e3:.2f} ms -> "
+                  f"{r['atual_s'] * 1e3:.2f} ms ({r['razao']:.2f}x)", file=sys.stderr)
+        if regressoes:
+            return 1
+        print("Nenhuma regressão acima da tolerância.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# bench_paginas.py
+"""
+Latência das páginas do Streamlit: custo de importação e da primeira renderização
+em um processo novo (como logo após subir o servidor), da troca de página (primeira
+execução de uma página depois de outra já aberta no mesmo processo) e de cada rerun.
+
+Cada página é medida em um subprocesso limpo, com streamlit.testing (AppTest):
+- importacao_s: só os imports da página (ferramentas + pandas/NumPy), antes do script;
+- primeira_s: primeira execução do script, depois dos imports (inclui o que o Streamlit
+  importa só ao desenhar, como o pyarrow das tabelas);
+- troca_s: primeira execução depois de abrir a página inicial no mesmo processo;
+- rerun_s: mediana das execuções seguintes (cada interação reexecuta o script).
+Com --aquecer, o aquecimento de ferramentas.aquecimento termina antes das medições
+(servidor já aquecido); sem ele, o aquecimento fica desligado (STATAPP_AQUECIMENTO=0).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_paginas                  # grava benchmarks/paginas.json
+    python -m benchmarks.bench_paginas --aquecer
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(PASTA)
+INICIO = glob.glob(os.path.join(RAIZ, "*Início.py"))[0]
+
+
+def paginas() -> list:
+    return [INICIO] + sorted(glob.glob(os.path.join(RAIZ, "pages", "*.py")))
+
+
+def _imports(caminho: str):
+    # Imports de nível de módulo do script (o que a página paga antes de desenhar)
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    arvore.body = [no for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom))]
+    return compile(arvore, caminho, "exec")
+
+
+def _aquecer():
+    # Mesmo caminho do servidor (thread de iniciar()), esperando terminar
+    from ferramentas.aquecimento import iniciar
+    iniciar().join()
+
+
+def medir_pagina(caminho: str, aquecer: bool, repeticoes: int) -> dict:
+    """
+    Executada no subprocesso: mede uma página em um processo que ainda não a importou.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    medida = {"pagina": os.path.basename(caminho), "aquecimento_s": None}
+    if aquecer:
+        inicio = time.perf_counter()
+        _aquecer()
+        medida["aquecimento_s"] = time.perf_counter() - inicio
+
+    modulos = set(sys.modules)
+    inicio = time.perf_counter()
+    exec(_imports(caminho), {})
+    medida["importacao_s"] = time.perf_counter() - inicio
+    medida["pandas_no_import"] = "pandas" in sys.modules
+
+    app = AppTest.from_file(caminho, default_timeout=120)
+    inicio = time.perf_counter()
+    app.run()
+    medida["primeira_s"] = time.perf_counter() - inicio
+    medida["modulos_importados"] = len(set(sys.modules) - modulos)
+
+    reruns = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        app.run()
+        reruns.append(time.perf_counter() - inicio)
+    medida["rerun_s"] = statistics.median(reruns)
+    medida["erros"] = [str(e.value) for e in app.exception]
+    return medida
+
+
+def medir_troca(caminho: str, aquecer: bool) -> float:
+    """
+    Executada no subprocesso: abre a página inicial e depois 'caminho' (troca de página).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    if aquecer:
+        _aquecer()
+    AppTest.from_file(INICIO, default_timeout=120).run()
+    app = AppTest.from_file(caminho, default_timeout=120)
+    inicio = time.perf_counter()
+    app.run()
+    return time.perf_counter() - inicio
+
+
+def _subprocesso(*args) -> str:
+    # Sem --aquecer, o aquecimento das próprias páginas fica desligado (processo frio de verdade)
+    ambiente = {**os.environ, "STATAPP_AQUECIMENTO": "1" if "--aquecer" in args else "0"}
+    resultado = subprocess.run([sys.executable, "-m", "benchmarks.bench_paginas", *args], cwd=RAIZ,
+                               env=ambiente, capture_output=True, text=True, check=True)
+    return resultado.stdout.strip().splitlines()[-1]
+
+
+def executar(aquecer: bool, repeticoes: int) -> dict:
+    extra = ["--aquecer"] if aquecer else []
+    resultados = []
+    for caminho in paginas():
+        medida = json.loads(_subprocesso("--medir", caminho, "--repeticoes", str(repeticoes), *extra))
+        medida["troca_s"] = None if caminho == INICIO else float(_subprocesso("--troca", caminho, *extra))
+        resultados.append(medida)
+        troca = "" if medida["troca_s"] is None else f"{medida['troca_s'] * 1e3:>9.1f} ms"
+        print(f"{medida['pagina']:<34} import {medida['importacao_s'] * 1e3:>8.1f} ms  "
+              f"primeira {medida['primeira_s'] * 1e3:>8.1f} ms  rerun {medida['rerun_s'] * 1e3:>7.1f} ms  "
+              f"troca {troca:>12}", file=sys.stderr)
+        for erro in medida["erros"]:
+            print(f"  erro: {erro}", file=sys.stderr)
+    return {
+        "aquecer": aquecer,
+        "repeticoes": repeticoes,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_paginas", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aquecer", action="store_true", help="roda o aquecimento do servidor antes de medir")
+    parser.add_argument("--repeticoes", type=int, default=5, help="reruns medidos por página")
+    parser.add_argument("--saida", default=os.path.join(PASTA, "paginas.json"))
+    parser.add_argument("--medir", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--troca", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        print(json.dumps(medir_pagina(args.medir, args.aquecer, args.repeticoes)))
+        return 0
+    if args.troca:
+        print(medir_troca(args.troca, args.aquecer))
+        return 0
+
+    atual = executar(args.aquecer, args.repeticoes)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(atual, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# aquecimento.py
+"""
+Aquecimento do processo do servidor: paga uma vez, fora de qualquer interação, o que a
+primeira visita a cada página pagaria (imports do pandas, pyarrow e altair, primeiras
+chamadas de groupby/read_csv, tabela da normal em cache). O pool de processos de
+tarefas não é aquecido: ele só sobe no primeiro tarefas.mapear, então quem nunca usa
+processos não paga pela memória deles.
+
+- iniciar(): chamado no topo de todas as páginas; na primeira vez no processo dispara
+  aquecer() em uma thread em segundo plano e retorna na hora. Como o servidor só executa
+  scripts quando chega a primeira sessão, o aquecimento corre enquanto a página inicial
+  (leve, sem pandas) já está na tela.
+- aquecer(): as mesmas etapas, síncronas, na thread atual.
+- tempos(): duração de cada etapa já concluída, para o painel de diagnóstico.
+
+Este módulo não importa nada pesado no topo. STATAPP_AQUECIMENTO=0 desliga o aquecimento.
+"""
+import io
+import logging
+import os
+import threading
+import time
+
+ATIVO = os.environ.get("STATAPP_AQUECIMENTO", "1") != "0"
+
+logger = logging.getLogger("statapp.aquecimento")
+
+_trava = threading.Lock()
+_linha = None
+_tempos = {}
+
+
+def _bibliotecas():
+    import numpy  # noqa: F401
+    import pandas as pd
+    import pyarrow as pa
+
+    # Mesmo caminho das tabelas do Streamlit: DataFrame -> Arrow -> bytes IPC
+    tabela = pa.Table.from_pandas(pd.DataFrame({"xi": [1.0, 2.0], "fi": [1, 2]}))
+    saida = pa.BufferOutputStream()
+    with pa.RecordBatchStreamWriter(saida, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def _graficos():
+    import altair  # noqa: F401  (st.line_chart, st.bar_chart e st.scatter_chart)
+
+
+def _calculos():
+    import numpy as np
+    import pandas as pd
+
+    from ferramentas import arquivos, funcoes, probabilidade, quantis, regressao
+    from ferramentas.incremental import AgregadoDiscreto
+    from ferramentas.sessao import TabelaCompacta
+
+    # Funções internas (sem cache_resultados): não deixam entradas nem contagens no cache
+    xi, fi = np.array([1.0, 2.0, 3.0]), np.array([1.0, 2.0, 1.0])
+    for modo in ("exato", "rapido"):
+        funcoes._descrever_discreto(xi, fi, list(funcoes.DEPENDENCIAS_DISCRETO), 2, modo)
+        funcoes._descrever_agrupado(pd.DataFrame({"Li": [0.0, 10.0], "Ls": [10.0, 20.0], "fi": [1.0, 2.0]}),
+                                    list(funcoes.DEPENDENCIAS_AGRUPADO), modo)
+    for separador in funcoes.PADROES_NUMERO:
+        funcoes.contar_numeros("1 2,5 1.234,5 1,234.5", separador)
+    funcoes.descrever_colunas(pd.DataFrame({"g": ["a", "a", "b"], "x": [1.0, 2.0, 2.0]}), "g")
+    arquivos.ler_valores_brutos(io.BytesIO(b"v\n1\n2\n2\n"), "v")
+    quantis.descrever_aproximado([np.arange(10.0)], percentis=[90])
+    probabilidade.quantil("normal", 0.5)  # monta a grade da normal (compartilhada em cache_tabelas)
+    regressao.ajustar_regressao([1.0, 2.0, 3.0], [1.0, 2.0, 4.0])
+    tabela = TabelaCompacta.de_df(pd.DataFrame({"xi": [1.0, 2.0], "fi": [1, 2]})).para_df()
+    AgregadoDiscreto().atualizar(tabela)
+
+
+ETAPAS = {
+    "bibliotecas (numpy, pandas, pyarrow)": _bibliotecas,
+    "gráficos (altair)": _graficos,
+    "cálculos (primeiras chamadas)": _calculos,
+}
+
+
+def aquecer() -> dict:
+    """
+    Executa todas as etapas e devolve {etapa: segundos}. Falhas são registradas no log
+    e não interrompem as etapas seguintes (o aquecimento nunca derruba a página).
+    """
+    from ferramentas.diagnostico import medir
+
+    for nome, etapa in ETAPAS.items():
+        inicio = time.perf_counter()
+        try:
+            with medir(f"aquecimento: {nome}"):
+                etapa()
+        except Exception:
+            logger.warning("Falha no aquecimento (%s)", nome, exc_info=True)
+        _tempos[nome] = time.perf_counter() - inicio
+    return dict(_tempos)
+
+
+def iniciar():
+    """
+    Dispara aquecer() em segundo plano, uma única vez por processo (chamadas seguintes
+    não fazem nada). Devolve a thread, ou None com STATAPP_AQUECIMENTO=0.
+    """
+    global _linha
+    with _trava:
+        if _linha is None and ATIVO:
+            _linha = threading.Thread(target=aquecer, name="statapp-aquecimento", daemon=True)
+            _linha.start()
+    return _linha
+
+
+def tempos() -> dict:
+    """
+    {etapa: segundos} das etapas já concluídas.
+    """
+    return dict(_tempos)
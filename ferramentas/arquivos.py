@@ -0,0 +1,212 @@
+# arquivos.py
+import io
+
+import numpy as np
+import pandas as pd
+
+from ferramentas.diagnostico import instrumentar
+from ferramentas.funcoes import contar_colunas, mesclar_contagens
+
+# Linhas lidas por vez nos CSVs: limita o pico de memória em arquivos grandes
+TAMANHO_LOTE = 200_000
+
+
+def _eh_excel(arquivo) -> bool:
+    nome = getattr(arquivo, "name", str(arquivo)).lower()
+    return nome.endswith((".xlsx", ".xls"))
+
+
+def _voltar_inicio(arquivo):
+    # Arquivos enviados pelo Streamlit (UploadedFile) são lidos mais de uma vez
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+
+
+def reabrir(arquivo):
+    """
+    Leitor próprio (posição independente) sobre o conteúdo de um arquivo enviado, para
+    ler em outra thread enquanto a página continua usando o original. Não copia os bytes.
+    """
+    if not hasattr(arquivo, "getvalue"):
+        return arquivo  # caminho: cada leitura abre o arquivo de novo
+    novo = io.BytesIO(arquivo.getvalue())
+    novo.name = getattr(arquivo, "name", "")
+    novo.size = getattr(arquivo, "size", None)
+    return novo
+
+
+def _tamanho_arquivo(arquivo):
+    # UploadedFile tem .size; caminhos e outros objetos ficam sem total (progresso indeterminado)
+    return getattr(arquivo, "size", None)
+
+
+def _informar(progresso, arquivo, total):
+    if progresso is not None:
+        feito = arquivo.tell() if hasattr(arquivo, "tell") else 0
+        progresso(feito, total)
+
+
+def _coagir(lote: pd.DataFrame, colunas: list, decimal: str) -> pd.DataFrame:
+    # Texto -> float64: o que não é número vira NaN. astype converte bem mais rápido
+    # que to_numeric, que só é usado nas colunas do lote com algum texto
+    for c in colunas:
+        valores = lote[c]
+        if decimal != "." and valores.dtype == object:
+            valores = valores.str.replace(decimal, ".", regex=False)
+        try:
+            lote[c] = valores.astype("float64")
+        except (TypeError, ValueError):
+            lote[c] = pd.to_numeric(valores, errors="coerce").astype("float64")
+    return lote
+
+
+def _ler_lotes(arquivo, colunas: list, sep: str = ",", decimal: str = ".", tamanho_lote: int = TAMANHO_LOTE,
+               texto=(), progresso=None, coagir: bool = False):
+    """
+    Lê apenas 'colunas' do arquivo, já como float64 (as de 'texto' como str), em lotes
+    de 'tamanho_lote' linhas.
+    Sem 'coagir', texto em uma coluna numérica é erro; com 'coagir', as colunas numéricas
+    são lidas como texto e convertidas em cada lote (pd.to_numeric com errors="coerce"),
+    e as células não numéricas viram NaN.
+    CSV é lido em lotes (pd.read_csv com chunksize); XLSX é lido de uma vez,
+    pois o pandas não oferece leitura parcial de planilhas (requer openpyxl).
+    'progresso(feito, total)' recebe a posição no arquivo (bytes) a cada lote lido.
+    """
+    _voltar_inicio(arquivo)
+    numericas = [c for c in colunas if c not in texto]
+    tipos = {c: ("str" if c in texto else "object" if coagir else "float64") for c in colunas}
+    total = _tamanho_arquivo(arquivo)
+    try:
+        if _eh_excel(arquivo):
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                raise ValueError("Para ler arquivos .xlsx instale o pacote openpyxl.")
+            tabela = pd.read_excel(arquivo, usecols=colunas, dtype=tipos)
+            _informar(progresso, arquivo, total)
+            yield _coagir(tabela, numericas, ".") if coagir else tabela
+        else:
+            with pd.read_csv(arquivo, sep=sep, decimal=decimal, usecols=colunas,
+                             dtype=tipos, chunksize=tamanho_lote) as leitor:
+                for lote in leitor:
+                    _informar(progresso, arquivo, total)
+                    yield _coagir(lote, numericas, decimal) if coagir else lote
+    except ValueError as e:
+        # Ex.: coluna inexistente ou texto em coluna numérica
+        raise ValueError(f"Não foi possível ler o arquivo: {e}")
+
+
+@instrumentar()
+def colunas_arquivo(arquivo, sep: str = ",") -> list:
+    """
+    Nomes das colunas (cabeçalho) do arquivo, sem ler os dados.
+    """
+    _voltar_inicio(arquivo)
+    if _eh_excel(arquivo):
+        colunas = pd.read_excel(arquivo, nrows=0).columns.tolist()
+    else:
+        colunas = pd.read_csv(arquivo, sep=sep, nrows=0).columns.tolist()
+    _voltar_inicio(arquivo)
+    return [str(c) for c in colunas]
+
+
+@instrumentar()
+def ler_valores_brutos(arquivo, coluna: str, sep: str = ",", decimal: str = ".",
+                       tamanho_lote: int = TAMANHO_LOTE, progresso=None) -> pd.DataFrame:
+    """
+    Lê uma coluna de valores brutos e devolve a tabela de frequências (xi, fi) ordenada por xi.
+    Cada lote é reduzido com value_counts, então a memória cresce com o nº de valores distintos.
+    """
+    total = pd.Series(dtype="int64")
+    for lote in _ler_lotes(arquivo, [coluna], sep, decimal, tamanho_lote, progresso=progresso):
+        contagem = lote[coluna].dropna().value_counts()
+        total = total.add(contagem, fill_value=0)
+    total = total.sort_index()
+    return pd.DataFrame({"xi": total.index.to_numpy(dtype=float), "fi": total.to_numpy().astype("int64")})
+
+
+@instrumentar()
+def ler_tabela_discreta(arquivo, coluna_xi: str = "xi", coluna_fi: str = "fi", sep: str = ",",
+                        decimal: str = ".", tamanho_lote: int = TAMANHO_LOTE, progresso=None) -> pd.DataFrame:
+    """
+    Lê uma tabela (xi, fi); linhas com o mesmo xi têm as frequências somadas.
+    Devolve a tabela ordenada por xi, pronta para descrever_discreto.
+    """
+    total = pd.Series(dtype="float64")
+    for lote in _ler_lotes(arquivo, [coluna_xi, coluna_fi], sep, decimal, tamanho_lote,
+                           progresso=progresso):
+        lote = lote.dropna()
+        total = total.add(lote.groupby(coluna_xi)[coluna_fi].sum(), fill_value=0)
+    total = total.sort_index()
+    return pd.DataFrame({"xi": total.index.to_numpy(dtype=float), "fi": total.to_numpy(dtype=float)})
+
+
+@instrumentar()
+def ler_tabela_classes(arquivo, coluna_li: str = "Li", coluna_ls: str = "Ls", coluna_fi: str = "fi",
+                       sep: str = ",", decimal: str = ".", tamanho_lote: int = TAMANHO_LOTE,
+                       progresso=None) -> pd.DataFrame:
+    """
+    Lê uma tabela de classes (Li, Ls, fi), mantendo a ordem das linhas
+    e descartando linhas incompletas.
+    """
+    colunas = [coluna_li, coluna_ls, coluna_fi]
+    lotes = [lote.dropna() for lote in _ler_lotes(arquivo, colunas, sep, decimal, tamanho_lote,
+                                                   progresso=progresso)]
+    tabela = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame(columns=colunas, dtype=float)
+    tabela = tabela[colunas]
+    tabela.columns = ["Li", "Ls", "fi"]
+    return tabela
+
+
+def _contar_lotes(arquivo, colunas: list, grupo, sep: str, decimal: str, tamanho_lote: int, progresso,
+                  coagir: bool) -> pd.Series:
+    usar = list(colunas) + ([grupo] if grupo is not None else [])
+    texto = (grupo,) if grupo is not None else ()
+    total = None
+    for lote in _ler_lotes(arquivo, usar, sep, decimal, tamanho_lote, texto, progresso, coagir):
+        parcial = contar_colunas(lote, grupo, colunas)
+        total = parcial if total is None else mesclar_contagens([total, parcial])
+    if total is None:
+        total = contar_colunas(pd.DataFrame(columns=usar), grupo, colunas)
+    return total
+
+
+@instrumentar()
+def ler_colunas(arquivo, colunas: list, grupo=None, sep: str = ",", decimal: str = ".",
+                tamanho_lote: int = TAMANHO_LOTE, progresso=None) -> pd.Series:
+    """
+    Lê várias colunas numéricas e, opcionalmente, uma coluna de grupo (texto), e devolve
+    as contagens de funcoes.contar_colunas, prontas para funcoes.descrever_colunas_contagens.
+    Células vazias ou com texto não numérico ficam como NaN.
+    Cada lote é reduzido às contagens por valor e somado ao total, então a memória cresce
+    com o nº de valores distintos por (grupo, coluna), não com o nº de linhas.
+
+    A primeira leitura usa a conversão para float64 do próprio leitor de CSV (a mais
+    rápida); se algum lote tiver texto em coluna numérica, o arquivo é lido de novo com
+    as colunas como texto, convertidas lote a lote (ver _ler_lotes com 'coagir').
+    """
+    try:
+        return _contar_lotes(arquivo, colunas, grupo, sep, decimal, tamanho_lote, progresso, coagir=False)
+    except ValueError:
+        return _contar_lotes(arquivo, colunas, grupo, sep, decimal, tamanho_lote, progresso, coagir=True)
+
+
+def ler_pares(arquivo, coluna_x: str = "x", coluna_y: str = "y", sep: str = ",", decimal: str = ".",
+              tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Gera os pontos (x, y) do arquivo em lotes, como pares de arrays float64.
+    Nada é acumulado aqui: quem consome (ex.: AcumuladorRegressao) decide o que guardar.
+    """
+    for lote in _ler_lotes(arquivo, [coluna_x, coluna_y], sep, decimal, tamanho_lote):
+        yield lote[coluna_x].to_numpy(), lote[coluna_y].to_numpy()
+
+
+def iterar_valores(arquivo, coluna: str, sep: str = ",", decimal: str = ".", tamanho_lote: int = TAMANHO_LOTE,
+                   progresso=None):
+    """
+    Gera os valores brutos de uma coluna em lotes (arrays float64, sem NaN),
+    para cálculos de memória fixa como quantis.descrever_aproximado.
+    """
+    for lote in _ler_lotes(arquivo, [coluna], sep, decimal, tamanho_lote, progresso=progresso):
+        valores = lote[coluna].to_numpy()
+        yield valores[~np.isnan(valores)]
@@ -0,0 +1,98 @@
+# cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CacheLRU:
+    """
+    Cache em memória com tamanho máximo e descarte do item usado há mais tempo (LRU).
+    Seguro para várias threads: o Streamlit atende cada sessão em uma thread,
+    então uma instância no nível do módulo é compartilhada por todas as sessões do processo.
+    Os valores guardados devem ser imutáveis (ex.: NamedTuple), pois são devolvidos sem cópia.
+
+    Opcionalmente limita também a memória: 'peso' diz quanto cada valor ocupa
+    (ex.: bytes dos arrays) e os itens mais antigos saem enquanto a soma passar
+    de 'peso_maximo' (o item mais recente sempre fica).
+    """
+
+    def __init__(self, tamanho_maximo: int = 256, peso=None, peso_maximo=None):
+        if tamanho_maximo < 1:
+            raise ValueError("O tamanho máximo do cache deve ser ao menos 1.")
+        self.tamanho_maximo = tamanho_maximo
+        self.peso = peso
+        self.peso_maximo = peso_maximo
+        self.peso_total = 0
+        self._itens = OrderedDict()
+        self._pesos = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, calcular):
+        """
+        Devolve o valor de 'chave'; se não existir, chama calcular() e guarda o resultado.
+        Exceções de calcular() não são guardadas.
+        """
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+
+        # Calcula fora da trava para não bloquear as outras sessões
+        valor = calcular()
+
+        with self._trava:
+            if chave not in self._itens and self.peso is not None:
+                self._pesos[chave] = self.peso(valor)
+                self.peso_total += self._pesos[chave]
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo or (
+                    self.peso_maximo is not None and self.peso_total > self.peso_maximo and len(self._itens) > 1):
+                antiga, _ = self._itens.popitem(last=False)
+                self.peso_total -= self._pesos.pop(antiga, 0)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self._pesos.clear()
+            self.peso_total = 0
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "tamanho_maximo": self.tamanho_maximo,
+                "peso_total": self.peso_total,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
+
+
+def chave_hash(*arrays, extra=()) -> str:
+    """
+    Gera uma chave de conteúdo (BLAKE2b) a partir de arrays numéricos e parâmetros extras.
+    Os arrays são convertidos para float64 contíguo, então o mesmo dado digitado
+    como int ou float produz a mesma chave.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr(extra).encode())
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        h.update(str(a.shape).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+# Cache de resultados das medidas, compartilhado entre reruns e sessões do processo
+cache_resultados = CacheLRU(tamanho_maximo=256)
@@ -0,0 +1,191 @@
+# diagnostico.py
+"""
+Medição leve de tempo e memória por etapa (funções de cálculo e etapas das páginas).
+
+Desligado, medir() e @instrumentar custam só uma consulta a uma ContextVar e um
+teste de flag por chamada. A medição liga em dois casos:
+- a página chamou iniciar_coleta(True) (painel de diagnóstico da sessão): os registros
+  vão para a lista da execução atual, isolada por sessão via ContextVar;
+- um log foi configurado (configurar_log ou variável STATAPP_DIAGNOSTICO_LOG):
+  cada registro vira uma linha JSON no arquivo, para análise posterior.
+
+A memória é o pico alocado dentro da etapa (tracemalloc, ligado só enquanto alguma
+etapa medida estiver aberta). Com várias sessões medindo ao mesmo tempo o pico é
+aproximado, pois o tracemalloc é global ao processo.
+"""
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from functools import wraps
+
+logger = logging.getLogger("statapp.diagnostico")
+
+_coleta = ContextVar("coleta_diagnostico", default=None)  # lista de registros da execução atual
+_pilha = ContextVar("pilha_diagnostico", default=())      # etapas abertas (aninhamento)
+_log_ativo = False
+_memoria = {"ativas": 0, "dono": False}
+_trava_memoria = threading.Lock()
+_NULO = contextlib.nullcontext()
+
+
+def configurar_log(caminho: str):
+    """
+    Grava cada registro medido como uma linha JSON em 'caminho' (liga a medição em todo o processo).
+    """
+    global _log_ativo
+    manipulador = logging.FileHandler(caminho, encoding="utf-8")
+    manipulador.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(manipulador)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _log_ativo = True
+
+
+def iniciar_coleta(ativo: bool = True):
+    """
+    Começa (ou desliga, com ativo=False) a coleta de registros para a execução atual da página.
+    Devolve a lista que receberá os registros, ou None.
+    """
+    registros = [] if ativo else None
+    _coleta.set(registros)
+    _pilha.set(())
+    return registros
+
+
+def ativo() -> bool:
+    return _log_ativo or _coleta.get() is not None
+
+
+def _ligar_memoria():
+    with _trava_memoria:
+        if _memoria["ativas"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memoria["dono"] = True
+        _memoria["ativas"] += 1
+
+
+def _desligar_memoria():
+    with _trava_memoria:
+        _memoria["ativas"] -= 1
+        if _memoria["ativas"] == 0 and _memoria["dono"]:
+            tracemalloc.stop()
+            _memoria["dono"] = False
+
+
+class _Etapa:
+    __slots__ = ("nome", "info", "inicio", "memoria_inicial", "pico_filhos", "pico_antes", "token")
+
+    def __init__(self, nome, info):
+        self.nome = nome
+        self.info = info
+
+    def __enter__(self):
+        pilha = _pilha.get()
+        if not pilha:
+            _ligar_memoria()
+        atual, pico = tracemalloc.get_traced_memory()
+        # reset_peak zera o pico global: guarda o pico visto até aqui para a etapa de fora
+        self.pico_antes = pico
+        tracemalloc.reset_peak()
+        self.memoria_inicial = atual
+        self.pico_filhos = 0
+        self.token = _pilha.set(pilha + (self,))
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, rastro):
+        ms = (time.perf_counter() - self.inicio) * 1000
+        _, pico = tracemalloc.get_traced_memory()
+        pico = max(pico, self.pico_filhos)
+        _pilha.reset(self.token)
+        pilha = _pilha.get()
+        if pilha:
+            pilha[-1].pico_filhos = max(pilha[-1].pico_filhos, pico, self.pico_antes)
+        else:
+            _desligar_memoria()
+
+        registro = {
+            "etapa": self.nome,
+            "ms": round(ms, 3),
+            "pico_kib": round(max(pico - self.memoria_inicial, 0) / 1024, 1),
+            "profundidade": len(pilha),
+            **self.info,
+        }
+        if tipo is not None:
+            registro["erro"] = tipo.__name__
+        registros = _coleta.get()
+        if registros is not None:
+            registros.append(registro)
+        if _log_ativo:
+            logger.info(json.dumps({"ts": time.time(), "pid": os.getpid(), **registro},
+                                   ensure_ascii=False, default=str))
+        return False
+
+
+def medir(etapa: str, **info):
+    """
+    Context manager que mede o bloco: with medir("parse", linhas=n): ...
+    Desligado, devolve um nullcontext compartilhado.
+    """
+    if not (_log_ativo or _coleta.get() is not None):
+        return _NULO
+    return _Etapa(etapa, info)
+
+
+def instrumentar(etapa=None):
+    """
+    Decorador: mede cada chamada da função com o nome 'etapa' (padrão: módulo.função).
+    Uso: @instrumentar() ou @instrumentar("nome").
+    """
+    def decorador(funcao):
+        nome = etapa or f"{funcao.__module__.rsplit('.', 1)[-1]}.{funcao.__name__}"
+
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not (_log_ativo or _coleta.get() is not None):
+                return funcao(*args, **kwargs)
+            with _Etapa(nome, {}):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def tabela_registros(registros):
+    """
+    Registros em ordem de início, com a etapa recuada pelo aninhamento (para o painel),
+    como DataFrame. Os registros são gravados ao terminar cada etapa; aqui os filhos ficam
+    abaixo do pai. O pandas é importado só aqui: os módulos de cálculo que importam
+    diagnostico (probabilidade, regressao, quantis) não dependem dele.
+    """
+    import pandas as pd
+
+    ordenados, pendentes = [], []
+    for r in registros:
+        # Um registro de profundidade p fecha depois dos filhos (p + 1) que estão pendentes
+        filhos = [f for f in pendentes if f["profundidade"] > r["profundidade"]]
+        pendentes = [f for f in pendentes if f["profundidade"] <= r["profundidade"]]
+        pendentes.append({**r, "_filhos": filhos})
+    def achatar(itens):
+        for item in itens:
+            filhos = item.pop("_filhos")
+            ordenados.append(item)
+            achatar(filhos)
+    achatar(pendentes)
+
+    linhas = [{
+        "Etapa": " " * r["profundidade"] + r["etapa"],
+        "Tempo (ms)": r["ms"],
+        "Pico de memória (KiB)": r["pico_kib"],
+        "Detalhes": ", ".join(f"{k}={v}" for k, v in r.items()
+                              if k not in ("etapa", "ms", "pico_kib", "profundidade")),
+    } for r in ordenados]
+    return pd.DataFrame(linhas, columns=["Etapa", "Tempo (ms)", "Pico de memória (KiB)", "Detalhes"])
+
+
+if os.environ.get("STATAPP_DIAGNOSTICO_LOG"):
+    configurar_log(os.environ["STATAPP_DIAGNOSTICO_LOG"])
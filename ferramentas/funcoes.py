@@ -1,138 +1,429 @@
 # funcoes.py
 import re
+import codecs
 import math
-import statistics
+import numpy as np
 import pandas as pd
-from collections import Counter
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from ferramentas.cache import cache_resultados, chave_hash
+from ferramentas.diagnostico import instrumentar
+from ferramentas import precisao
+from ferramentas.tarefas import mapear
+
+@lru_cache(maxsize=None)
+def _quantizador(casas: int) -> Decimal:
+    # Padrão do quantize ("1.00" para 2 casas), criado uma vez por nº de casas
+    return Decimal("1." + "0"*casas)
+
 
 def arredondar(valor: float, casas: int = 2) -> float:
     """
     Arredonda 'valor' para 'casas' decimais usando HALF_UP (5 arredonda para cima).
     Evita erros de binário do float usando Decimal.
     """
-    return float(Decimal(str(valor)).quantize(Decimal("1." + "0"*casas), rounding=ROUND_HALF_UP))
+    return float(Decimal(str(valor)).quantize(_quantizador(casas), rounding=ROUND_HALF_UP))
+
+
+def _perto_de_empate(v: np.ndarray, casas: int) -> np.ndarray:
+    """
+    Máscara dos valores em que o float não decide sozinho o HALF_UP: os que ficam a
+    poucos ulps de um empate ...,5 (ex.: 1.005, que em binário é 1.00499999...) e os
+    grandes demais para a escala (>= 2**52). NaN e inf ficam fora.
+    """
+    with np.errstate(over="ignore", invalid="ignore"):
+        x = np.abs(v) * 10.0 ** casas
+        frac = x - np.floor(x)
+        duvida = (np.abs(frac - 0.5) <= 1e-9 + x * 1e-14) | ~(x < 2.0**52)
+    return duvida & np.isfinite(v)
+
+
+@instrumentar()
+def arredondar_array(valores, casas: int = 2) -> np.ndarray:
+    """
+    Versão vetorizada de arredondar para arrays (mesmo resultado, valor a valor).
+    Arredonda |x|*10^casas com floor(+0.5) e repõe o sinal (HALF_UP se afasta do zero).
+    Só os valores em que o float não decide sozinho (_perto_de_empate) usam o
+    caminho com Decimal.
+    NaN, inf e valores além da precisão do Decimal são devolvidos como vieram.
+    """
+    v = np.asarray(valores, dtype=np.float64)
+    escala = 10.0 ** casas
+    with np.errstate(over="ignore", invalid="ignore"):
+        # |x| * escala pode estourar para inf (ex.: 1e308); esses caem na dúvida abaixo
+        resultado = np.copysign(np.floor(np.abs(v) * escala + 0.5) / escala, v)
+    resultado = np.where(np.isfinite(v), resultado, v)
+
+    for i in np.flatnonzero(_perto_de_empate(v, casas)):
+        try:
+            resultado.flat[i] = arredondar(float(v.flat[i]), casas)
+        except InvalidOperation:
+            # Mais dígitos que a precisão do Decimal (ex.: 1e300): o float já é o valor arredondado
+            resultado.flat[i] = v.flat[i]
+    return resultado
+
+
+# Padrões de número por separador de milhar: (regex, caracteres a remover, decimal)
+#   None -> vírgula OU ponto como decimal, sem milhar (comportamento original)
+#   "."  -> "1.234,56": ponto separa milhar, vírgula é decimal
+#   ","  -> "1,234.56": vírgula separa milhar, ponto é decimal
+PADROES_NUMERO = {
+    None: (re.compile(r'[-+]?\d+(?:[.,]\d+)?'), "", ","),
+    ".": (re.compile(r'[-+]?\d{1,3}(?:\.\d{3})+(?:,\d+)?|[-+]?\d+(?:,\d+)?'), ".", ","),
+    ",": (re.compile(r'[-+]?\d{1,3}(?:,\d{3})+(?:\.\d+)?|[-+]?\d+(?:\.\d+)?'), ",", None),
+}
 
+# Caracteres que podem fazer parte de um número; o corte entre blocos é feito fora deles
+_CARACTERES_NUMERO = frozenset("0123456789.,+-")
 
-def parse_numeros(s: str):
+
+def _blocos_texto(fonte, tamanho_bloco: int):
+    """
+    Divide 'fonte' (str, bytes, arquivo aberto ou iterável de str/bytes) em blocos
+    de ~tamanho_bloco caracteres, sem cortar um número ao meio: o final de cada
+    bloco a partir do último caractere que não pode fazer parte de um número
+    passa para o bloco seguinte.
+    Bytes são decodificados como UTF-8 com um decodificador incremental, que guarda
+    um caractere multibyte cortado entre dois pedaços até o pedaço seguinte; bytes
+    que não são UTF-8 válido levantam ValueError com a posição.
+    """
+    if isinstance(fonte, (str, bytes)):
+        pedacos = (fonte[i:i + tamanho_bloco] for i in range(0, len(fonte), tamanho_bloco))
+    elif hasattr(fonte, "read"):
+        pedacos = iter(lambda: fonte.read(tamanho_bloco), fonte.read(0))
+    else:
+        pedacos = fonte
+
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    lidos = 0  # bytes já entregues ao decodificador, para situar o erro
+
+    def decodificar(pedaco: bytes, final: bool = False) -> str:
+        nonlocal lidos
+        try:
+            return decodificador.decode(pedaco, final)
+        except UnicodeDecodeError as e:
+            pendentes = len(decodificador.getstate()[0])
+            raise ValueError(f"O texto não está em UTF-8 (byte inválido na posição {lidos - pendentes + e.start}).") from e
+        finally:
+            lidos += len(pedaco)
+
+    resto = ""
+    for pedaco in pedacos:
+        if isinstance(pedaco, bytes):
+            pedaco = decodificar(pedaco)
+        texto = resto + pedaco
+        corte = len(texto)
+        while corte > 0 and texto[corte - 1] in _CARACTERES_NUMERO:
+            corte -= 1
+        if corte == 0:
+            # Bloco inteiro é (parte de) um número: acumula e segue
+            resto = texto
+            continue
+        resto = texto[corte:]
+        yield texto[:corte]
+    decodificar(b"", final=True)  # um caractere multibyte incompleto no fim também é erro
+    if resto:
+        yield resto
+
+
+def _tamanho_fonte(fonte) -> Optional[int]:
+    # Total para o progresso: caracteres do texto ou bytes do arquivo enviado (UploadedFile.size)
+    if isinstance(fonte, (str, bytes)):
+        return len(fonte)
+    return getattr(fonte, "size", None)
+
+
+def _numeros_bloco(bloco: str, padrao, remover: str, decimal: Optional[str]) -> Optional[np.ndarray]:
+    tokens = padrao.findall(bloco)
+    if not tokens:
+        return None
+    # Normaliza os tokens de uma vez (join + replace) e converte em C com np.fromstring
+    texto = " ".join(tokens)
+    if remover:
+        texto = texto.replace(remover, "")
+    if decimal:
+        texto = texto.replace(decimal, ".")
+    return np.fromstring(texto, dtype=np.float64, sep=" ")
+
+
+def iterar_blocos_numeros(fonte, separador_milhar: Optional[str] = None, tamanho_bloco: int = 1 << 20,
+                          progresso=None):
+    """
+    Lê números de 'fonte' em blocos e devolve um array float64 por bloco.
+    O pico de memória depende do tamanho do bloco, não do texto inteiro.
+    'separador_milhar' escolhe a regra de PADROES_NUMERO (None, "." ou ",").
+    'progresso(feito, total)' é chamado a cada bloco consumido (ver tarefas).
+    """
+    if separador_milhar not in PADROES_NUMERO:
+        raise ValueError("Separador de milhar deve ser None, '.' ou ','.")
+    padrao, remover, decimal = PADROES_NUMERO[separador_milhar]
+
+    total, feito = _tamanho_fonte(fonte), 0
+    for bloco in _blocos_texto(fonte, tamanho_bloco):
+        numeros = _numeros_bloco(bloco, padrao, remover, decimal)
+        if numeros is not None:
+            yield numeros
+        feito += len(bloco)
+        if progresso is not None:
+            progresso(feito, total)
+
+
+def _contar_bloco(bloco: str, separador_milhar: Optional[str]):
+    """
+    Frequências de um bloco de texto (executado em outro processo por contar_numeros).
+    """
+    numeros = _numeros_bloco(bloco, *PADROES_NUMERO[separador_milhar])
+    if numeros is None:
+        return len(bloco), None, None
+    return (len(bloco), *np.unique(numeros, return_counts=True))
+
+
+@instrumentar()
+def parse_numeros(s: str, separador_milhar: Optional[str] = None):
     """
     Extrai números de um texto aceitando vírgula OU ponto como decimal.
     Ex.: "10,5 7 2.3" -> [10.5, 7.0, 2.3]
 
-    Observação: não trata milhares do tipo "1.234,56". Para isso,
-    seria necessário um parser um pouco mais elaborado.
+    Com separador_milhar="." trata "1.234,56" -> 1234.56;
+    com separador_milhar="," trata "1,234.56" -> 1234.56.
     """
-    tokens = re.findall(r'[-+]?\d+(?:[.,]\d+)?', s)
-    return [float(t.replace(",", ".")) for t in tokens]
+    return [float(x) for bloco in iterar_blocos_numeros(s, separador_milhar) for x in bloco]
 
 
-def media_ponderada_df(df: pd.DataFrame) -> float:
+@instrumentar()
+def contar_numeros(fonte, separador_milhar: Optional[str] = None, tamanho_bloco: int = 1 << 20,
+                   progresso=None, processos: bool = False) -> pd.DataFrame:
     """
-    Média ponderada para dados discretos: sum(xi*fi) / sum(fi).
-    Exige ao menos uma linha válida e sum(fi) > 0.
+    Converte o texto direto em tabela de frequências (xi, fi), ordenada por xi,
+    sem montar a lista completa de números: cada bloco é reduzido com np.unique
+    e somado às contagens acumuladas. Memória ~ nº de valores distintos + 1 bloco.
+
+    A extração com regex segura o GIL; com processos=True os blocos são extraídos e
+    contados no pool de processos de tarefas.mapear (só as contagens voltam); entradas
+    de um bloco só ficam na thread atual, onde não pagam o envio aos processos.
+    'progresso(feito, total)' é chamado a cada bloco concluído.
+    """
+    if separador_milhar not in PADROES_NUMERO:
+        raise ValueError("Separador de milhar deve ser None, '.' ou ','.")
+    if processos and (_tamanho_fonte(fonte) or 0) > tamanho_bloco:
+        total, feito = _tamanho_fonte(fonte), 0
+
+        def partes():
+            nonlocal feito
+            for tamanho, v, c in mapear(_contar_bloco, _blocos_texto(fonte, tamanho_bloco), separador_milhar):
+                feito += tamanho
+                if progresso is not None:
+                    progresso(feito, total)
+                if v is not None:
+                    yield v, c
+    else:
+        def partes():
+            for bloco in iterar_blocos_numeros(fonte, separador_milhar, tamanho_bloco, progresso):
+                yield np.unique(bloco, return_counts=True)
+
+    valores = np.empty(0, dtype=np.float64)
+    contagens = np.empty(0, dtype=np.int64)
+    for v, c in partes():
+        valores, inverso = np.unique(np.concatenate([valores, v]), return_inverse=True)
+        contagens = np.bincount(inverso, weights=np.concatenate([contagens, c])).astype(np.int64)
+    return pd.DataFrame({"xi": valores, "fi": contagens})
+
+
+TIPOS_MODA = {
+    1: "unimodal", 2: "bimodal", 3: "trimodal", 4: "tetramodal",
+    5: "pentamodal", 6: "hexamodal", 7: "heptamodal", 8: "octamodal",
+}
+
+
+def _validar_discreto(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Remove linhas vazias e garante ao menos uma linha válida com sum(fi) > 0.
     """
     df = df.dropna()
     if df.empty or df["fi"].sum() == 0:
         raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
-    return (df["xi"]*df["fi"]).sum() / df["fi"].sum()
+    if (df["fi"] < 0).any():
+        raise ValueError("As frequências (fi) não podem ser negativas.")
+    return df
 
 
-def mediana_df(df: pd.DataFrame) -> float:
+def _frequencias_por_valor(xi: np.ndarray, fi: np.ndarray):
     """
-    Mediana para dados discretos: repete cada xi pela sua fi e aplica statistics.median.
+    Agrupa a tabela (xi, fi) por xi, sem expandir as frequências:
+    - fi é truncado para inteiro (como fazia o antigo repeat());
+    - xi repetidos somam suas frequências;
+    - mantém a ordem da primeira aparição de cada xi com fi > 0.
+    Retorna dois arrays: valores distintos e suas contagens.
     """
-    df = df.dropna()
-    if df.empty or df["fi"].sum() == 0:
+    fi = np.asarray(fi, dtype=float).astype(np.int64)
+    positivos = fi > 0
+    contagem = pd.Series(fi[positivos], index=np.asarray(xi, dtype=float)[positivos])
+    contagem = contagem.groupby(level=0, sort=False).sum()
+    if contagem.empty:
         raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
-    serie_numeros_df = df["xi"].repeat(df["fi"])
-    lista_numeros_df = serie_numeros_df.tolist()
-    return statistics.median(lista_numeros_df)
+    return contagem.index.to_numpy(), contagem.to_numpy()
+
+
+def _mediana_ponderada(valores: np.ndarray, contagens: np.ndarray) -> float:
+    """
+    Mediana pela frequência acumulada (Fac): localiza com busca binária
+    o(s) elemento(s) central(is) da lista ordenada, sem materializá-la.
+    """
+    ordem = np.argsort(valores, kind="stable")
+    valores, fac = valores[ordem], np.cumsum(contagens[ordem])
+    n = int(fac[-1])
 
+    def elemento(pos):
+        # posição (base 0) na lista ordenada -> valor correspondente
+        return float(valores[np.searchsorted(fac, pos, side="right")])
 
+    if n % 2 == 1:
+        return elemento(n // 2)
+    return (elemento(n // 2 - 1) + elemento(n // 2)) / 2
+
+
+def _moda_ponderada(valores: np.ndarray, contagens: np.ndarray):
+    """
+    Moda a partir das contagens por valor (ver moda_df).
+    """
+    freqmax = contagens.max()
+
+    # Todos empatados no máximo => amodal
+    if (contagens == freqmax).all():
+        return [], "amodal"
+
+    lista_modais = valores[contagens == freqmax].tolist()
+    tipo_moda = TIPOS_MODA.get(len(lista_modais), "multimodal")
+    return lista_modais, tipo_moda
+
+
+def _variancia_ponderada(valores: np.ndarray, contagens: np.ndarray, modo: str = "auto") -> float:
+    """
+    Variância amostral (N-1): sum(fi*(xi - média)²) / (N-1), no modo numérico 'modo'
+    (ver precisao.variancia_amostral; no exato, soma e divisão arredondadas uma só vez).
+    """
+    n = int(contagens.sum())
+    if n < 2:
+        raise ValueError("A amostra precisa ter mais de um elemento para calcular a variância.")
+    return precisao.variancia_amostral(valores, contagens, modo=modo)
+
+
+@instrumentar()
+def media_ponderada_df(df: pd.DataFrame, modo: str = "auto") -> float:
+    """
+    Média ponderada para dados discretos: sum(xi*fi) / sum(fi).
+    Exige ao menos uma linha válida e sum(fi) > 0.
+    'modo': "rapido" (soma compensada), "exato" (frações) ou "auto" (ver precisao).
+    """
+    df = _validar_discreto(df)
+    return precisao.media_ponderada(df["xi"].to_numpy(dtype=float), df["fi"].to_numpy(dtype=float), modo)
+
+
+@instrumentar()
+def mediana_df(df: pd.DataFrame) -> float:
+    """
+    Mediana para dados discretos: busca na frequência acumulada de cada xi,
+    sem repetir os valores (custo proporcional ao nº de xi distintos).
+    """
+    df = _validar_discreto(df)
+    return _mediana_ponderada(*_frequencias_por_valor(df["xi"], df["fi"]))
+
+
+@instrumentar()
 def moda_df(df: pd.DataFrame):
     """
     Moda para dados discretos:
-    - Conta as ocorrências considerando as frequências;
+    - Soma as frequências de cada xi (agrupamento, sem expandir fi);
     - Retorna a(s) moda(s) e o tipo (uni, bi, tri, ... multimodal);
     - Se todas as frequências empatam, considera amodal.
     """
-    df = df.dropna()
-    if df.empty or df["fi"].sum() == 0:
-        raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
-    
-    serie_numeros_df = df["xi"].repeat(df["fi"])
-    lista_numeros_df = serie_numeros_df.tolist()
-    
-    contagem = Counter(lista_numeros_df)
-    freqmax = max(contagem.values())
-    
-    # Todos empatados no máximo => amodal
-    if all(f == freqmax for f in contagem.values()):
-        return [], "amodal"
-    
-    lista_modais = [valor for valor, f in contagem.items() if f == freqmax]
-    
-    qtd_modais = len(lista_modais)
-    tipos = {
-        1: "unimodal", 2: "bimodal", 3: "trimodal", 4: "tetramodal",
-        5: "pentamodal", 6: "hexamodal", 7: "heptamodal", 8: "octamodal",
-    }
-    tipo_moda = tipos.get(qtd_modais, "multimodal")
-    return lista_modais, tipo_moda
+    df = _validar_discreto(df)
+    return _moda_ponderada(*_frequencias_por_valor(df["xi"], df["fi"]))
 
 
-def variancia_df(df: pd.DataFrame) -> float:
+@instrumentar()
+def variancia_df(df: pd.DataFrame, modo: str = "auto") -> float:
     """
-    Variância amostral para dados discretos (statistics.variance já usa N-1).
+    Variância amostral para dados discretos (divide por N-1), calculada
+    com somas ponderadas por fi no modo numérico 'modo'.
     """
-    df = df.dropna()
-    if df.empty or df["fi"].sum() == 0:
-        raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
-    serie_numeros_df = df["xi"].repeat(df["fi"])
-    lista_numeros_df = serie_numeros_df.tolist()
-    return statistics.variance(lista_numeros_df)
+    df = _validar_discreto(df)
+    return _variancia_ponderada(*_frequencias_por_valor(df["xi"], df["fi"]), modo)
+
+
+class _TabelaClasses(NamedTuple):
+    """
+    Intermediários da tabela de classes em arrays NumPy (calculados uma vez).
+    """
+    li: np.ndarray
+    ls: np.ndarray
+    fi: np.ndarray
+    pmi: np.ndarray  # ponto médio (Li + Ls)/2
+    fac: np.ndarray  # frequência acumulada
+    h: np.ndarray    # amplitude de cada classe
+    n: float         # soma das frequências
 
 
-def media_agrupada(df: pd.DataFrame) -> float:
+def _preparar_classes(df: pd.DataFrame) -> _TabelaClasses:
+    """
+    Copia Li, Ls e fi para arrays float64 e calcula Pmi, Fac e h.
+    Não altera o DataFrame recebido.
     """
-    Média para dados agrupados: usa ponto médio Pmi = (Li + Ls)/2 e soma ponderada por fi.
+    li = df["Li"].to_numpy(dtype=float)
+    ls = df["Ls"].to_numpy(dtype=float)
+    fi = df["fi"].to_numpy(dtype=float)
+    if fi.size == 0:
+        raise ValueError("A tabela está vazia ou contém dados inválidos.")
+    if (fi < 0).any():
+        raise ValueError("As frequências (fi) não podem ser negativas.")
+    fac = np.cumsum(fi)
+    return _TabelaClasses(li, ls, fi, (li + ls) / 2, fac, ls - li, float(fac[-1]))
+
+
+@instrumentar()
+def media_agrupada(df: pd.DataFrame, modo: str = "auto") -> float:
     """
-    df["Pmi"] = (df["Li"] + df["Ls"]) / 2
-    N = df["fi"].sum()
-    if N == 0:
+    Média para dados agrupados: usa ponto médio Pmi = (Li + Ls)/2 e soma ponderada por fi
+    (no modo numérico 'modo').
+    """
+    return _media_classes(_preparar_classes(df), modo)
+
+
+def _media_classes(t: _TabelaClasses, modo: str = "auto") -> float:
+    if t.n == 0:
         raise ValueError("A soma das frequências (N) não pode ser zero.")
-    media = (df["Pmi"] * df["fi"]).sum() / N
+    media = precisao.media_ponderada(t.pmi, t.fi, modo)
     return arredondar(media)
 
 
+@instrumentar()
 def mediana_agrupada(df: pd.DataFrame) -> float:
     """
     Mediana para dados agrupados:
     1) Calcula Fac (frequência acumulada);
-    2) Encontra a classe onde Fac >= N/2;
+    2) Encontra por busca binária (searchsorted) a primeira classe onde Fac >= N/2;
     3) Aplica interpolação linear: Med = L + ((N/2 - F_anterior)/f_classe)*h.
     """
-    N = df["fi"].sum()
-    df["Fac"] = df["fi"].cumsum()
-    
-    N2 = N / 2
-    try:
-        linha_mediana = df[df["Fac"] >= N2].iloc[0]
-        idx_mediana = linha_mediana.name
-    except IndexError:
-        raise ValueError("Não foi possível encontrar a classe da mediana.")
+    return _mediana_classes(_preparar_classes(df))
+
+
+def _mediana_classes(t: _TabelaClasses) -> float:
+    if t.n == 0:
+        raise ValueError("A soma das frequências (N) não pode ser zero.")
 
-    L = linha_mediana["Li"]
-    h = linha_mediana["Ls"] - linha_mediana["Li"]
-    f = linha_mediana["fi"]
-    
-    idx_pos = df.index.get_loc(idx_mediana)
-    F_anterior = df.iloc[idx_pos - 1]["Fac"] if idx_pos > 0 else 0
+    N2 = t.n / 2
+    pos = int(np.searchsorted(t.fac, N2, side="left"))
+    if pos >= len(t.fac):
+        raise ValueError("Não foi possível encontrar a classe da mediana.")
 
-    mediana = L + ((N2 - F_anterior) / f) * h
+    F_anterior = t.fac[pos - 1] if pos > 0 else 0
+    mediana = t.li[pos] + ((N2 - F_anterior) / t.fi[pos]) * t.h[pos]
     return arredondar(mediana)
 
 
+@instrumentar()
 def moda_agrupada(df: pd.DataFrame):
     """
     Moda para dados agrupados (bruta e Czuber):
@@ -141,60 +432,519 @@ def moda_agrupada(df: pd.DataFrame):
         Mo ≈ Li + (d1/(d1+d2)) * h, onde d1 = f_modal - f_prev e d2 = f_modal - f_next.
       Neste código, quando (d1+d2) <= 0 (ex.: planalto/empate), retorna None (N/A).
       Obs.: se quiser a REGRA RIGOROSA dos vizinhos (pico local estrito), troque a
-      checagem por:
-         if f_prev is not None and f_next is not None and (f_modal > f_prev) and (f_modal > f_next):
-            ...
-         else:
-            modas_czuber.append(None)
+      máscara 'definida' por:
+         definida = (pos > 0) & (pos < len(fi) - 1) & (d1 > 0) & (d2 > 0)
     - 'tipo_moda' classifica uni/bi/tri/.../multimodal segundo o nº de classes modais.
+    Todas as classes modais são calculadas de uma vez (arrays), sem laço por classe.
     """
-    t = df.reset_index(drop=True)
-    freqmax = t["fi"].max()
-    modal_pos = t.index[t["fi"] == freqmax].tolist()
-
-    tipos = {
-        1: "unimodal", 2: "bimodal", 3: "trimodal", 4: "tetramodal",
-        5: "pentamodal", 6: "hexamodal", 7: "heptamodal", 8: "octamodal"
-    }
-    tipo_moda = tipos.get(len(modal_pos), "multimodal")
-
-    modas_brutas = []
-    modas_czuber = []
-
-    for pos in modal_pos:
-        Li, Ls = float(t.at[pos, "Li"]), float(t.at[pos, "Ls"])
-        h_classe = Ls - Li
-        # Moda bruta (ponto médio)
-        modas_brutas.append((Li + Ls) / 2)
-        
-        f_modal = float(t.at[pos, "fi"])
-        f_prev = float(t.at[pos - 1, "fi"]) if pos - 1 >= 0 else 0.0
-        f_next = float(t.at[pos + 1, "fi"]) if pos + 1 < len(t) else 0.0
-        
-        d1, d2 = f_modal - f_prev, f_modal - f_next
-
-        # Czuber definida somente se (d1 + d2) > 0 (evita divisão por zero/planaltos)
-        # (Para a regra rigorosa de pico local, veja comentário no docstring acima.)
-        if (d1 + d2) > 0:
-            moda_cz = Li + (d1 / (d1 + d2)) * h_classe
-            modas_czuber.append(arredondar(moda_cz))
-        else:
-            modas_czuber.append(None)
-            
+    return _moda_classes(_preparar_classes(df))
+
+
+def _moda_classes(t: _TabelaClasses):
+    pos = np.flatnonzero(t.fi == t.fi.max())
+    tipo_moda = TIPOS_MODA.get(len(pos), "multimodal")
+
+    # Vizinhos de cada classe (0 fora da tabela)
+    f_prev = np.concatenate(([0.0], t.fi[:-1]))[pos]
+    f_next = np.concatenate((t.fi[1:], [0.0]))[pos]
+    f_modal = t.fi[pos]
+    d1, d2 = f_modal - f_prev, f_modal - f_next
+
+    # Czuber definida somente se (d1 + d2) > 0 (evita divisão por zero/planaltos)
+    definida = (d1 + d2) > 0
+    soma = np.where(definida, d1 + d2, 1.0)
+    czuber = t.li[pos] + (d1 / soma) * t.h[pos]
+
+    modas_brutas = t.pmi[pos].tolist()
+    modas_czuber = [m if ok else None for m, ok in zip(arredondar_array(czuber).tolist(), definida)]
     return modas_brutas, modas_czuber, tipo_moda
 
 
-def variancia_agrupada(df: pd.DataFrame, media: float) -> float:
+@instrumentar()
+def variancia_agrupada(df: pd.DataFrame, media: float, modo: str = "auto") -> float:
     """
     Variância amostral para dados agrupados (dividindo por N-1).
-    Usa Pmi como representante da classe.
+    Usa Pmi como representante da classe, no modo numérico 'modo' (ver precisao.variancia_amostral).
     """
-    N = df["fi"].sum()
-    if N <= 1:
+    return _variancia_classes(_preparar_classes(df), media, modo)
+
+
+def _variancia_classes(t: _TabelaClasses, media: float, modo: str = "auto") -> float:
+    if t.n <= 1:
         raise ValueError("A amostra precisa ter mais de um elemento para calcular a variância.")
-    
-    if "Pmi" not in df.columns:
-         df["Pmi"] = (df["Li"] + df["Ls"]) / 2
-         
-    variancia = (((df["Pmi"] - media)**2) * df["fi"]).sum() / (N - 1)
-    return arredondar(variancia)
\ No newline at end of file
+
+    variancia = precisao.variancia_amostral(t.pmi, t.fi, centro=media, modo=modo)
+    return arredondar(variancia)
+
+
+# Regras para construir classes a partir de valores brutos
+REGRAS_CLASSES = {
+    "sturges": "Sturges: k = ⌈log₂ n⌉ + 1 classes",
+    "fd": "Freedman–Diaconis: h = 2·IQR / n^(1/3)",
+    "largura": "Largura fixa h",
+}
+
+# Limite de classes geradas (evita tabelas enormes com FD ou larguras pequenas)
+MAXIMO_CLASSES = 1000
+
+
+@instrumentar()
+def construir_classes(valores, regra: str = "sturges", largura: Optional[float] = None) -> pd.DataFrame:
+    """
+    Agrupa valores brutos em classes (Li, Ls, fi) com um único np.histogram:
+    - "sturges": k = ⌈log₂ n⌉ + 1 classes de mesma amplitude entre o mínimo e o máximo;
+    - "fd": amplitude h = 2·IQR/n^(1/3) (Freedman–Diaconis), robusta a valores extremos;
+      com IQR = 0 usa Sturges;
+    - "largura": amplitude 'largura' informada, a partir do mínimo.
+    As classes são [Li, Ls), com a última fechada em Ls (como no np.histogram).
+    A tabela vai direto para media_agrupada, mediana_agrupada, moda_agrupada etc.
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    valores = valores[np.isfinite(valores)]
+    if valores.size == 0:
+        raise ValueError("Nenhum número encontrado.")
+    if regra not in REGRAS_CLASSES:
+        raise ValueError(f"Regra de classes desconhecida: {regra}")
+
+    n = valores.size
+    minimo, maximo = float(valores.min()), float(valores.max())
+    amplitude_total = maximo - minimo
+
+    if regra == "largura":
+        if largura is None or not largura > 0:
+            raise ValueError("Informe uma largura de classe maior que zero.")
+        k = int(amplitude_total // largura) + 1
+        h = float(largura)
+    else:
+        k = math.ceil(math.log2(n)) + 1
+        if regra == "fd":
+            q1, q3 = np.percentile(valores, [25, 75])
+            if q3 > q1:
+                k = max(1, math.ceil(amplitude_total / (2 * (q3 - q1) / n ** (1 / 3))))
+        # Todos os valores iguais: uma classe de amplitude 1 em torno do valor
+        h = amplitude_total / k if amplitude_total > 0 else 1.0
+        if amplitude_total == 0:
+            k, minimo = 1, minimo - 0.5
+
+    if k > MAXIMO_CLASSES:
+        raise ValueError(f"A regra gera {k} classes (máximo {MAXIMO_CLASSES}); use uma largura maior.")
+
+    limites = minimo + h * np.arange(k + 1)
+    if regra != "largura" and amplitude_total > 0:
+        limites[-1] = maximo  # evita que o arredondamento deixe o máximo de fora
+    fi, _ = np.histogram(valores, bins=limites)
+    return pd.DataFrame({"Li": limites[:-1], "Ls": limites[1:], "fi": fi.astype(float)})
+
+
+# Medidas que cada cartão depende (ordem das chaves = ordem de cálculo)
+DEPENDENCIAS_DISCRETO = {
+    "media": (),
+    "mediana": (),
+    "moda": (),
+    "variancia": (),
+    "desvio_padrao": ("variancia",),
+    "coeficiente_variacao": ("media", "desvio_padrao"),
+}
+
+DEPENDENCIAS_AGRUPADO = {
+    "media": (),
+    "mediana": (),
+    "moda_bruta": (),
+    "moda_czuber": (),
+    "variancia": ("media",),
+    "desvio_padrao": ("variancia",),
+    "coeficiente_variacao": ("media", "desvio_padrao"),
+}
+
+
+def planejar_medidas(medidas, dependencias: dict) -> list:
+    """
+    Devolve as medidas a calcular: as selecionadas mais tudo de que dependem,
+    na ordem de 'dependencias' (que já é uma ordem válida de cálculo).
+    Ex.: ["coeficiente_variacao"] -> ["media", "variancia", "desvio_padrao", "coeficiente_variacao"]
+    """
+    pendentes = list(medidas)
+    plano = set()
+    while pendentes:
+        medida = pendentes.pop()
+        if medida not in dependencias:
+            raise ValueError(f"Medida desconhecida: {medida}")
+        if medida not in plano:
+            plano.add(medida)
+            pendentes.extend(dependencias[medida])
+    return [m for m in dependencias if m in plano]
+
+
+class DescricaoDiscreta(NamedTuple):
+    """
+    Resultado de descrever_discreto, já arredondado como exibido nos cartões.
+    Medidas fora do plano de cálculo ficam como None.
+    Os valores são imutáveis porque o mesmo objeto é reaproveitado pelo cache.
+    """
+    media: Optional[float] = None
+    mediana: Optional[float] = None
+    modas: Optional[tuple] = None  # em ordem crescente
+    tipo_moda: Optional[str] = None
+    variancia: Optional[float] = None
+    desvio_padrao: Optional[float] = None
+    coeficiente_variacao: Optional[float] = None  # também None quando a média é zero
+
+
+@instrumentar()
+def descrever_discreto(df: pd.DataFrame, medidas=None, casas: int = 2, modo: str = "auto") -> DescricaoDiscreta:
+    """
+    Calcula as medidas de dados discretos de uma só vez:
+    valida a tabela uma única vez, agrupa por xi uma única vez e reaproveita
+    esses intermediários para média, mediana, moda, variância, desvio padrão e CV.
+
+    'medidas' limita o cálculo ao necessário para os cartões pedidos
+    (ver DEPENDENCIAS_DISCRETO); None calcula tudo.
+
+    Arredondamento igual ao da página: desvio padrão a partir da variância
+    arredondada e CV a partir da média e do desvio arredondados.
+    'modo' escolhe as somas da média e da variância (ver precisao).
+
+    O resultado fica em cache_resultados, com chave no conteúdo da tabela
+    normalizada (linhas ordenadas por xi e fi), no plano e nas casas decimais:
+    a mesma tabela enviada de novo, em qualquer sessão, não é recalculada.
+    """
+    plano = planejar_medidas(DEPENDENCIAS_DISCRETO if medidas is None else medidas, DEPENDENCIAS_DISCRETO)
+    df = _validar_discreto(df)
+
+    # Normaliza: ordem das linhas não altera o resultado (nem a chave)
+    xi = df["xi"].to_numpy(dtype=float)
+    fi = df["fi"].to_numpy(dtype=float)
+    ordem = np.lexsort((fi, xi))
+    xi, fi = xi[ordem], fi[ordem]
+
+    # "auto" resolvido antes da chave: compartilha o cache com o modo escolhido
+    modo = precisao.escolher_modo(xi, fi, modo=modo)
+    chave = chave_hash(xi, fi, extra=("discreto", tuple(plano), casas, modo))
+    return cache_resultados.obter(chave, lambda: _descrever_discreto(xi, fi, plano, casas, modo))
+
+
+def _descrever_discreto(xi: np.ndarray, fi: np.ndarray, plano: list, casas: int,
+                        modo: str = "auto") -> DescricaoDiscreta:
+    r = {}
+
+    # Agrupamento por xi só quando alguma medida precisa das contagens inteiras
+    if {"mediana", "moda", "variancia"} & set(plano):
+        valores, contagens = _frequencias_por_valor(xi, fi)
+
+    for medida in plano:
+        if medida == "media":
+            r["media"] = arredondar(precisao.media_ponderada(xi, fi, modo), casas)
+        elif medida == "mediana":
+            r["mediana"] = arredondar(_mediana_ponderada(valores, contagens), casas)
+        elif medida == "moda":
+            modas, r["tipo_moda"] = _moda_ponderada(valores, contagens)
+            r["modas"] = tuple(sorted(modas))
+        elif medida == "variancia":
+            r["variancia"] = arredondar(_variancia_ponderada(valores, contagens, modo), casas)
+        elif medida == "desvio_padrao":
+            r["desvio_padrao"] = arredondar(math.sqrt(r["variancia"]), casas)
+        elif medida == "coeficiente_variacao":
+            if r["media"] != 0:
+                r["coeficiente_variacao"] = arredondar((100 * r["desvio_padrao"]) / r["media"], casas)
+
+    return DescricaoDiscreta(**r)
+
+
+class DescricaoAgrupada(NamedTuple):
+    """
+    Resultado de descrever_agrupado (medidas fora do plano ficam como None).
+    """
+    media: Optional[float] = None
+    mediana: Optional[float] = None
+    modas_brutas: Optional[tuple] = None
+    modas_czuber: Optional[tuple] = None
+    tipo_moda: Optional[str] = None
+    variancia: Optional[float] = None
+    desvio_padrao: Optional[float] = None
+    coeficiente_variacao: Optional[float] = None  # também None quando a média é zero
+
+
+@instrumentar()
+def descrever_agrupado(df: pd.DataFrame, medidas=None, modo: str = "auto") -> DescricaoAgrupada:
+    """
+    Calcula apenas as medidas pedidas (e suas dependências, ver
+    DEPENDENCIAS_AGRUPADO) para uma tabela de classes já numérica (Li, Ls, fi),
+    com média e variância no modo numérico 'modo'.
+
+    Usa cache_resultados com chave nos limites e frequências das classes
+    (na ordem da tabela), no plano de cálculo e no modo.
+    """
+    plano = planejar_medidas(DEPENDENCIAS_AGRUPADO if medidas is None else medidas, DEPENDENCIAS_AGRUPADO)
+    tabela = df[["Li", "Ls", "fi"]].astype(float)
+
+    modo = precisao.escolher_modo(tabela["Li"], tabela["Ls"], tabela["fi"], modo=modo)
+    chave = chave_hash(tabela["Li"], tabela["Ls"], tabela["fi"], extra=("agrupado", tuple(plano), modo))
+    return cache_resultados.obter(chave, lambda: _descrever_agrupado(tabela, plano, modo))
+
+
+def _descrever_agrupado(df: pd.DataFrame, plano: list, modo: str = "auto") -> DescricaoAgrupada:
+    t = _preparar_classes(df)  # Pmi, Fac e h calculados uma vez para todas as medidas
+    r = {}
+
+    # Moda bruta e de Czuber saem da mesma chamada
+    if "moda_bruta" in plano or "moda_czuber" in plano:
+        modas_brutas, modas_czuber, r["tipo_moda"] = _moda_classes(t)
+        if "moda_bruta" in plano:
+            r["modas_brutas"] = tuple(modas_brutas)
+        if "moda_czuber" in plano:
+            r["modas_czuber"] = tuple(modas_czuber)
+
+    for medida in plano:
+        if medida == "media":
+            r["media"] = _media_classes(t, modo)
+        elif medida == "mediana":
+            r["mediana"] = _mediana_classes(t)
+        elif medida == "variancia":
+            r["variancia"] = _variancia_classes(t, r["media"], modo)
+        elif medida == "desvio_padrao":
+            r["desvio_padrao"] = arredondar(math.sqrt(r["variancia"]))
+        elif medida == "coeficiente_variacao":
+            if r["media"] != 0:
+                r["coeficiente_variacao"] = arredondar((100 * r["desvio_padrao"]) / r["media"], 2)
+
+    return DescricaoAgrupada(**r)
+
+
+def _numericas(df: pd.DataFrame, colunas: list) -> pd.DataFrame:
+    # Células vazias ou não numéricas viram NaN e a linha é ignorada (como nos agregados das páginas)
+    return df[colunas].apply(pd.to_numeric, errors="coerce").dropna()
+
+
+@instrumentar()
+def tabela_frequencias_discreta(df: pd.DataFrame, modo: str = "auto") -> pd.DataFrame:
+    """
+    Tabela de frequências de dados discretos, montada de uma vez (sem laço por linha)
+    a partir das mesmas contagens por valor da mediana, moda e variância:
+    xi (crescente), fi, fri, Fac, Fri e as colunas auxiliares xi·fi e (xi − x̄)²·fi.
+    fri e Fri são proporções (0 a 1); x̄ é a média sem arredondar, no modo numérico 'modo'.
+    """
+    df = _validar_discreto(_numericas(df, ["xi", "fi"]))
+    valores, contagens = _frequencias_por_valor(df["xi"].to_numpy(), df["fi"].to_numpy())
+    ordem = np.argsort(valores, kind="stable")
+    xi, fi = valores[ordem], contagens[ordem].astype(float)
+
+    fac = np.cumsum(fi)
+    n = fac[-1]
+    media = precisao.media_ponderada(xi, fi, precisao.escolher_modo(xi, fi, modo=modo))
+    return pd.DataFrame({
+        "xi": xi,
+        "fi": fi,
+        "fri": fi / n,
+        "Fac": fac,
+        "Fri": fac / n,
+        "xi·fi": xi * fi,
+        "(xi − x̄)²·fi": (xi - media) ** 2 * fi,
+    })
+
+
+@instrumentar()
+def tabela_frequencias_classes(df: pd.DataFrame, modo: str = "auto") -> pd.DataFrame:
+    """
+    Tabela de frequências de dados agrupados a partir dos intermediários de _preparar_classes
+    (os mesmos Pmi e Fac da média, mediana e variância), na ordem das classes:
+    Li, Ls, Pmi, fi, fri, Fac, Fri, Pmi·fi e (Pmi − x̄)²·fi.
+    x̄ é a média arredondada do cartão, a mesma usada na variância: a soma da última
+    coluna dividida por N − 1 reproduz a variância exibida (antes do arredondamento final).
+    """
+    t = _preparar_classes(_numericas(df, ["Li", "Ls", "fi"]))
+    media = _media_classes(t, precisao.escolher_modo(t.pmi, t.fi, modo=modo))
+    return pd.DataFrame({
+        "Li": t.li,
+        "Ls": t.ls,
+        "Pmi": t.pmi,
+        "fi": t.fi,
+        "fri": t.fi / t.n,
+        "Fac": t.fac,
+        "Fri": t.fac / t.n,
+        "Pmi·fi": t.pmi * t.fi,
+        "(Pmi − x̄)²·fi": (t.pmi - media) ** 2 * t.fi,
+    })
+
+
+# Colunas da matriz de descrever_colunas (além de "n"), na ordem de exibição
+COLUNAS_DESCRICAO = ["media", "mediana", "modas", "tipo_moda", "variancia", "desvio_padrao", "coeficiente_variacao"]
+
+
+def contar_colunas(df: pd.DataFrame, grupo: Optional[str] = None, colunas=None) -> pd.Series:
+    """
+    Forma reduzida de várias colunas para descrever_colunas_contagens: Series 'fi' com o
+    nº de ocorrências de cada valor, indexada por ([grupo,] "coluna", "valor").
+    Células vazias (ou texto não numérico) entram com valor NaN, para que um (grupo, coluna)
+    sem nenhum valor continue na matriz com n = 0; linhas sem grupo são descartadas.
+    Contagens de partes da tabela se juntam com mesclar_contagens.
+
+    'colunas' None usa todas as colunas menos 'grupo'.
+    """
+    if colunas is None:
+        colunas = [c for c in df.columns if c != grupo]
+    colunas = list(colunas)
+    if not colunas:
+        raise ValueError("Escolha ao menos uma coluna numérica.")
+    if grupo is not None and grupo in colunas:
+        raise ValueError("A coluna de grupo não pode estar entre as colunas descritas.")
+
+    valores = df[colunas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    k = len(colunas)
+    if grupo is None:
+        codigos = np.zeros(len(valores), dtype=np.int64)
+    else:
+        codigos, grupos = pd.factorize(df[grupo])
+        valores, codigos = valores[codigos >= 0], codigos[codigos >= 0]
+
+    # Uma chave inteira por (grupo, coluna), na ordem das linhas e depois das colunas:
+    # todas as colunas contadas em um único groupby().size(); sort=False mantém as
+    # colunas na ordem pedida (ordem de primeira aparição)
+    chaves = (codigos[:, None] * k + np.arange(k)).ravel()
+    v = valores.ravel()
+    contagem = pd.Series(v).groupby([chaves, v], sort=False, dropna=False).size()
+
+    chaves = contagem.index.get_level_values(0).to_numpy()
+    niveis = [pd.Index(colunas).take(chaves % k), contagem.index.get_level_values(1)]
+    nomes = ["coluna", "valor"]
+    if grupo is not None:
+        niveis.insert(0, grupos.take(chaves // k))
+        nomes.insert(0, grupo)
+    return pd.Series(contagem.to_numpy(), index=pd.MultiIndex.from_arrays(niveis, names=nomes), name="fi")
+
+
+def mesclar_contagens(contagens: list) -> pd.Series:
+    """
+    Soma as contagens de contar_colunas de várias partes (ex.: lotes de um arquivo).
+    """
+    juntas = pd.concat(contagens)
+    return juntas.groupby(level=list(range(juntas.index.nlevels)), sort=False, dropna=False).sum()
+
+
+@instrumentar()
+def descrever_colunas(df: pd.DataFrame, grupo: Optional[str] = None, colunas=None, medidas=None,
+                      casas: int = 2, modo: str = "auto") -> pd.DataFrame:
+    """
+    Medidas de dados discretos (valores brutos, cada linha com fi = 1) para várias
+    colunas numéricas de uma vez, opcionalmente por grupo (ex.: escola, mês).
+
+    Devolve uma matriz: uma linha por (grupo, coluna) — ou por coluna, sem grupo — e
+    uma coluna por medida, com "n" (valores não vazios) sempre presente.
+    A tabela é reduzida às contagens de cada valor (contar_colunas) e as medidas saem
+    delas (descrever_colunas_contagens), com os mesmos valores de descrever_discreto.
+
+    'colunas' None usa todas as colunas menos 'grupo'; texto não numérico vira vazio.
+    'medidas' e o arredondamento seguem descrever_discreto (desvio a partir da variância
+    arredondada, CV a partir da média e do desvio arredondados; CV vazio com média zero,
+    variância vazia com n < 2, modas vazias quando amodal).
+    """
+    return descrever_colunas_contagens(contar_colunas(df, grupo, colunas), medidas, casas, modo)
+
+
+@instrumentar()
+def descrever_colunas_contagens(contagens: pd.Series, medidas=None, casas: int = 2,
+                                modo: str = "auto") -> pd.DataFrame:
+    """
+    Matriz de descrever_colunas a partir das contagens de contar_colunas (ou de
+    mesclar_contagens), sem precisar dos valores brutos.
+    Sobre a tabela (chave, valor, fi), ordenada por chave e valor: n, Σx·fi e
+    Σ(x − x̄)²·fi por groupby().sum() (o pandas soma com compensação de Kahan), a mediana
+    por busca binária na frequência acumulada de todas as chaves e a moda pela maior
+    fi de cada chave. Nada é feito coluna a coluna em Python, exceto a média e a
+    variância das chaves perto de um empate do arredondamento (ou de todas, com
+    modo="exato"), refeitas com precisao no modo 'modo' para dar os mesmos valores
+    de descrever_discreto.
+    """
+    plano = planejar_medidas(DEPENDENCIAS_DISCRETO if medidas is None else medidas, DEPENDENCIAS_DISCRETO)
+    niveis = list(contagens.index.names[:-1])
+
+    # Linhas da matriz: grupos ordenados x colunas na ordem de contar_colunas
+    colunas = contagens.index.get_level_values("coluna").unique()
+    if len(niveis) > 1:
+        grupos = contagens.index.get_level_values(niveis[0]).unique().sort_values()
+        indice = pd.MultiIndex.from_product([grupos, colunas], names=niveis)
+    else:
+        indice = pd.Index(colunas, name="coluna")
+
+    validas = contagens[contagens.index.get_level_values("valor").notna()].sort_index()
+    x = validas.index.get_level_values("valor").to_numpy(dtype=float)
+    f = validas.to_numpy(dtype=np.int64)
+    por_chave = validas.groupby(level=niveis, sort=False)
+    # Chaves contíguas após sort_index: os vetores por chave (sort=False) seguem essa ordem,
+    # e a chave i ocupa as posições primeiras[i]:fins[i] de x e f
+    n = por_chave.sum()
+    total = n.to_numpy()
+    fins = np.cumsum(por_chave.size().to_numpy())
+    primeiras = fins - por_chave.size().to_numpy()
+
+    def somar(v: np.ndarray) -> np.ndarray:
+        return pd.Series(v, index=validas.index).groupby(level=niveis, sort=False).sum().to_numpy()
+
+    def conferir(estimativa: np.ndarray, calcular) -> pd.Series:
+        # Só as chaves perto de um empate do arredondamento (todas no modo exato) são
+        # refeitas com precisao, como descrever_discreto faria
+        refazer = np.isfinite(estimativa) if modo == "exato" else _perto_de_empate(estimativa, casas)
+        for i in np.flatnonzero(refazer):
+            a, b = primeiras[i], fins[i]
+            estimativa[i] = calcular(x[a:b], f[a:b].astype(float))
+        return pd.Series(estimativa, index=n.index)
+
+    r = pd.DataFrame(index=indice)
+    r["n"] = n.reindex(indice, fill_value=0).astype("int64")
+    if "media" in plano or "variancia" in plano:
+        centro = somar(x * f) / total
+    if "media" in plano:
+        media = conferir(centro.copy(), lambda v, c: precisao.media_ponderada(v, c, modo))
+        r["media"] = arredondar_array(media.reindex(indice).to_numpy(), casas)
+    if "mediana" in plano:
+        # Posições (n-1)//2 e n//2 de cada chave na frequência acumulada de todas
+        acumulada = np.cumsum(f)
+        inicio = acumulada[primeiras] - f[primeiras]
+        baixo = x[np.searchsorted(acumulada, inicio + (total - 1) // 2, side="right")]
+        alto = x[np.searchsorted(acumulada, inicio + total // 2, side="right")]
+        mediana = pd.Series((baixo + alto) / 2, index=n.index)
+        r["mediana"] = arredondar_array(mediana.reindex(indice).to_numpy(), casas)
+    if "moda" in plano:
+        modas, tipos = _modas_por_coluna(validas, niveis)
+        r["modas"] = modas.reindex(indice)
+        r["tipo_moda"] = tipos.reindex(indice)
+    if "variancia" in plano:
+        desvios = x - np.repeat(centro, fins - primeiras)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            estimativa = np.where(total > 1, somar(desvios * desvios * f) / (total - 1), np.nan)
+        variancia = conferir(estimativa, lambda v, c: precisao.variancia_amostral(v, c, modo=modo))
+        r["variancia"] = arredondar_array(variancia.reindex(indice).to_numpy(), casas)
+    if "desvio_padrao" in plano:
+        r["desvio_padrao"] = arredondar_array(np.sqrt(r["variancia"].to_numpy()), casas)
+    if "coeficiente_variacao" in plano:
+        media, desvio = r["media"].to_numpy(), r["desvio_padrao"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = np.where(media != 0, 100 * desvio / media, np.nan)
+        r["coeficiente_variacao"] = arredondar_array(cv, casas)
+
+    # Só as medidas pedidas (e "n"), na ordem dos cartões
+    pedidas = set(plano if medidas is None else medidas)
+    if "moda" in pedidas:
+        pedidas.add("modas")
+        pedidas.add("tipo_moda")
+    return r[["n"] + [c for c in COLUNAS_DESCRICAO if c in pedidas]]
+
+
+def _modas_por_coluna(contagens: pd.Series, niveis: list):
+    """
+    Modas e tipo de moda de cada (grupo, coluna) a partir das contagens por valor
+    (sem NaN, ordenadas por valor). Amodal quando todos os valores empatam (como moda_df).
+    """
+    por_chave = contagens.groupby(level=niveis, sort=False)
+    maximo = por_chave.transform("max")
+    no_maximo = contagens == maximo
+    qtd_modas = no_maximo.groupby(level=niveis, sort=False).transform("sum")
+    amodal = qtd_modas == por_chave.transform("size")
+
+    modais = contagens[no_maximo & ~amodal].reset_index()
+    modas = modais.groupby(niveis, sort=False)["valor"].agg(tuple)
+    tipos = qtd_modas[no_maximo].groupby(level=niveis, sort=False).first()
+    tipos = tipos.map(lambda k: TIPOS_MODA.get(k, "multimodal"))
+    tipos[amodal.groupby(level=niveis, sort=False).first()] = "amodal"
+    # Chaves amodais ficam sem modas: tupla vazia, como descrever_discreto
+    modas = modas.reindex(tipos.index).map(lambda m: m if isinstance(m, tuple) else ())
+    return modas, tipos
@@ -0,0 +1,476 @@
+# incremental.py
+"""
+Recalculo incremental das medidas a partir das edições do st.data_editor.
+
+Cada agregado guarda uma cópia da última tabela recebida e as somas que as medidas
+usam. Em atualizar(), as linhas alteradas vêm do próprio estado do st.data_editor
+(edited_rows, added_rows e deleted_rows em st.session_state[key]) quando ele é
+relativo à última tabela recebida; senão, a tabela nova é comparada com a anterior
+(comparação vetorizada, por rótulo de linha). Só as linhas adicionadas, removidas ou
+editadas têm a contribuição retirada/incluída nas somas. Assim, mudar uma célula de uma
+tabela com 50 mil linhas atualiza média, variância e moda em O(linhas alteradas).
+
+As somas (Σfi, Σfi·x e Σfi·x²) são racionais exatos (Fraction), inclusive os produtos,
+então não há erro acumulado depois de muitas edições: a média e a variância são as
+mesmas do cálculo direto no modo numérico "exato" (precisao.somas_exatas e
+variancia_exata), arredondadas uma única vez.
+"""
+import heapq
+import math
+import sys
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import Counter
+from fractions import Fraction
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ferramentas.diagnostico import instrumentar
+from ferramentas.precisao import somas_exatas, variancia_exata
+from ferramentas.funcoes import (
+    TIPOS_MODA, DEPENDENCIAS_DISCRETO, DEPENDENCIAS_AGRUPADO, DescricaoDiscreta, DescricaoAgrupada,
+    arredondar, planejar_medidas, _preparar_classes, _mediana_classes, _moda_classes
+)
+
+
+class _AgregadoTabela(ABC):
+    """
+    Base dos agregados: compara a tabela nova com a anterior e repassa as diferenças
+    linha a linha para _contribuir (sinal -1 retira, +1 inclui). Linhas com alguma célula vazia (ou não numérica)
+    não contribuem, como no dropna() das páginas.
+    """
+    colunas = ()
+
+    # Acima desta fração de linhas alteradas, reconstruir do zero é mais barato
+    FRACAO_RECONSTRUCAO = 0.25
+
+    def __init__(self):
+        self._tabela = None
+        self.linhas_alteradas = 0  # total aplicado de forma incremental (diagnóstico)
+        self.reconstrucoes = 0
+        self.origem = None  # marca livre do chamador para a última tabela (ex.: ArmazemSessao.versao)
+
+    @instrumentar("incremental.atualizar")
+    def atualizar(self, df: pd.DataFrame, edicoes: Optional[dict] = None) -> int:
+        """
+        Aplica as diferenças entre 'df' e a tabela anterior. Devolve o nº de linhas alteradas.
+
+        'edicoes' é o estado do st.data_editor que produziu 'df' (st.session_state[key]),
+        com as posições relativas à tabela passada ao editor. Só pode ser usado quando essa
+        tabela é a última recebida aqui (o chamador garante); então as demais linhas não são
+        comparadas. Se o estado não fechar com as duas tabelas, compara tudo.
+        """
+        novo = df[list(self.colunas)]
+        if not all(pd.api.types.is_float_dtype(t) for t in novo.dtypes):
+            novo = novo.apply(pd.to_numeric, errors="coerce").astype(float)
+        else:
+            novo = novo.copy()
+        antigo = self._tabela
+        if antigo is None or not novo.index.is_unique:
+            self._reconstruir(novo)
+            return len(novo)
+
+        diferencas = None if edicoes is None else self._diferencas_do_editor(antigo, novo, edicoes)
+        removidos, adicionados, editados = diferencas or self._diferencas(antigo, novo)
+
+        alteradas = len(removidos) + len(adicionados) + len(editados)
+        if alteradas > max(64, self.FRACAO_RECONSTRUCAO * len(novo)):
+            self._reconstruir(novo)
+            return alteradas
+
+        valores_antigos = antigo.to_numpy()
+        valores_novos = novo.to_numpy()
+        for pos in antigo.index.get_indexer(removidos.append(editados)):
+            self._aplicar(valores_antigos[pos], -1)
+        for pos in novo.index.get_indexer(editados.append(adicionados)):
+            self._aplicar(valores_novos[pos], +1)
+
+        self._tabela = novo
+        self.linhas_alteradas += alteradas
+        if alteradas:
+            self._tabela_mudou()
+        return alteradas
+
+    @staticmethod
+    def _diferencas(antigo: pd.DataFrame, novo: pd.DataFrame):
+        # Comparação completa, por rótulo: (removidos, adicionados, editados)
+        if novo.index.equals(antigo.index):
+            # Caso comum (edição de células): mesmas linhas, sem realinhar
+            removidos = adicionados = novo.index[:0]
+            comuns = novo.index
+            a, b = antigo.to_numpy(), novo.to_numpy()
+        else:
+            removidos = antigo.index.difference(novo.index, sort=False)
+            adicionados = novo.index.difference(antigo.index, sort=False)
+            comuns = novo.index.intersection(antigo.index, sort=False)
+            a = antigo.loc[comuns].to_numpy()
+            b = novo.loc[comuns].to_numpy()
+        iguais = (a == b) | (np.isnan(a) & np.isnan(b))
+        return removidos, adicionados, comuns[~iguais.all(axis=1)]
+
+    @staticmethod
+    def _diferencas_do_editor(antigo: pd.DataFrame, novo: pd.DataFrame, edicoes: dict):
+        """
+        (removidos, adicionados, editados) a partir do estado do st.data_editor, que aplica
+        edições e remoções por posição na tabela original e acrescenta as linhas novas no
+        fim. None se o estado não corresponder às tabelas (ex.: índice editado).
+        """
+        editadas = {int(pos): mudancas for pos, mudancas in edicoes.get("edited_rows", {}).items()}
+        apagadas = sorted({int(pos) for pos in edicoes.get("deleted_rows", [])})
+        mantidas = len(antigo) - len(apagadas)
+        if (any(pos >= len(antigo) for pos in [*editadas, *apagadas])
+                or len(novo) != mantidas + len(edicoes.get("added_rows", []))
+                or any("_index" in mudancas for mudancas in editadas.values())):
+            return None
+        removidos = antigo.index[apagadas]
+        editados = antigo.index[sorted(editadas.keys() - set(apagadas))]
+        adicionados = novo.index[mantidas:]
+        if (novo.index.get_indexer(editados) < 0).any() or (antigo.index.get_indexer(adicionados) >= 0).any():
+            return None
+        return removidos, adicionados, editados
+
+    @property
+    def linhas(self) -> int:
+        return 0 if self._tabela is None else len(self._tabela)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memória aproximada do agregado: a cópia da última tabela mais as estruturas de cada
+        subclasse (usada no orçamento de sessao.ArmazemSessao).
+        """
+        return 0 if self._tabela is None else int(self._tabela.memory_usage(index=True).sum())
+
+    def _reconstruir(self, novo: pd.DataFrame):
+        # Padrão: inclui linha a linha (AgregadoDiscreto tem uma versão vetorizada)
+        self._zerar()
+        self._tabela = novo
+        for linha in novo.to_numpy():
+            self._aplicar(linha, +1)
+        self.reconstrucoes += 1
+        self._tabela_mudou()
+
+    def _aplicar(self, linha: np.ndarray, sinal: int):
+        if np.isfinite(linha).all():
+            self._contribuir(*(float(v) for v in linha), sinal=sinal)
+
+    def _tabela_mudou(self):
+        pass
+
+    @abstractmethod
+    def _zerar(self):
+        """Volta as somas e estruturas ao estado da tabela vazia."""
+
+    @abstractmethod
+    def _contribuir(self, *valores, sinal: int):
+        """Inclui (sinal +1) ou retira (sinal -1) uma linha completa das somas."""
+
+
+class AgregadoDiscreto(_AgregadoTabela):
+    """
+    Agregados da tabela (xi, fi) com as mesmas regras de descrever_discreto:
+    - média com fi como digitado: Σxi·fi / Σfi;
+    - mediana, moda e variância com fi truncado para inteiro, por valor distinto.
+
+    Estruturas mantidas:
+    - contagem por valor (dict) e quantos valores têm cada contagem (Counter);
+    - heap de (-contagem, valor) com remoção preguiçosa, para a moda;
+    - lista ordenada dos valores distintos e uma âncora (valor e frequência acumulada
+      antes dele), para a mediana: a busca parte da âncora e anda só o necessário;
+    - somas exatas (Fraction) de fi e xi·fi das linhas e de c·xi e c·xi² por valor.
+    """
+    colunas = ("xi", "fi")
+
+    def _zerar(self):
+        self.soma_f = Fraction(0)
+        self.soma_xf = Fraction(0)
+        self.negativos = 0
+        self.linhas_validas = 0
+        self.n = 0
+        self.soma_cx = Fraction(0)
+        self.soma_cx2 = Fraction(0)
+        self.contagens = {}
+        self.por_contagem = Counter()
+        self._heap = []
+        self._valores = []
+        self._ancora = None
+        self._antes = 0
+
+    def _reconstruir(self, novo: pd.DataFrame):
+        """
+        Reconstrução vetorizada (primeira tabela ou muitas linhas alteradas):
+        agrupa por valor no pandas e parte das somas exatas de precisao.somas_exatas.
+        """
+        self._zerar()
+        self._tabela = novo
+        self.reconstrucoes += 1
+        linhas = novo.to_numpy()
+        linhas = linhas[np.isfinite(linhas).all(axis=1)]
+        xi, fi = linhas[:, 0], linhas[:, 1]
+        self.linhas_validas = len(linhas)
+        self.negativos = int((fi < 0).sum())
+        self.soma_f, self.soma_xf, _ = somas_exatas(xi, fi)
+
+        c = fi.astype(np.int64)
+        positivos = c > 0
+        contagem = pd.Series(c[positivos]).groupby(xi[positivos]).sum()
+        if contagem.empty:
+            return
+        valores, contagens = contagem.index.to_numpy(dtype=float), contagem.to_numpy()
+        self.n = int(contagens.sum())
+        _, self.soma_cx, self.soma_cx2 = somas_exatas(valores, contagens)
+
+        self._valores = valores.tolist()
+        self.contagens = dict(zip(self._valores, contagens.tolist()))
+        self.por_contagem = Counter(self.contagens.values())
+        self._heap = [(-c, v) for v, c in self.contagens.items()]
+        heapq.heapify(self._heap)
+        self._ancora, self._antes = self._valores[0], 0
+
+    # Objetos Python além dos contêineres: o float de cada valor distinto (o mesmo objeto no dict,
+    # na lista e no heap) e a tupla de cada entrada do heap; contagens pequenas são ints em cache
+    _BYTES_POR_VALOR = sys.getsizeof(0.5)
+    _BYTES_POR_ENTRADA = sys.getsizeof((0, 0.5))
+
+    @property
+    def nbytes(self) -> int:
+        if self._tabela is None:
+            return 0
+        return (super().nbytes + sys.getsizeof(self.contagens) + sys.getsizeof(self._heap)
+                + sys.getsizeof(self._valores) + sys.getsizeof(self.por_contagem)
+                + self._BYTES_POR_VALOR * len(self.contagens) + self._BYTES_POR_ENTRADA * len(self._heap))
+
+    def _contribuir(self, xi: float, fi: float, sinal: int):
+        self.linhas_validas += sinal
+        f = Fraction(fi)
+        self.soma_f += sinal * f
+        self.soma_xf += sinal * Fraction(xi) * f
+        if fi < 0:
+            self.negativos += sinal
+        c = int(fi)  # trunca como astype(int64)
+        if c > 0:
+            self._alterar_contagem(xi, sinal * c)
+
+    def _alterar_contagem(self, v: float, delta: int):
+        antiga = self.contagens.get(v, 0)
+        nova = antiga + delta
+        if antiga:
+            self.por_contagem[antiga] -= 1
+            if not self.por_contagem[antiga]:
+                del self.por_contagem[antiga]
+        if nova:
+            self.por_contagem[nova] += 1
+            self.contagens[v] = nova
+            heapq.heappush(self._heap, (-nova, v))
+        else:
+            del self.contagens[v]
+        if len(self._heap) > 2 * len(self.contagens) + 32:
+            self._heap = [(-c, x) for x, c in self.contagens.items()]
+            heapq.heapify(self._heap)
+
+        self.n += delta
+        x = Fraction(v)
+        self.soma_cx += delta * x
+        self.soma_cx2 += delta * x * x
+
+        # Lista ordenada e âncora da mediana
+        if not antiga:
+            insort(self._valores, v)
+        if self._ancora is None:
+            self._ancora, self._antes = v, 0
+        elif v < self._ancora:
+            self._antes += delta
+        if not nova:
+            i = bisect_left(self._valores, v)
+            del self._valores[i]
+            if v == self._ancora:
+                if i < len(self._valores):
+                    self._ancora = self._valores[i]
+                elif i > 0:
+                    self._ancora = self._valores[i - 1]
+                    self._antes -= self.contagens[self._ancora]
+                else:
+                    self._ancora, self._antes = None, 0
+
+    def _elemento(self, pos: int) -> float:
+        # Valor na posição 'pos' (base 0) da lista ordenada expandida, andando a partir da âncora
+        i = bisect_left(self._valores, self._ancora)
+        while pos < self._antes:
+            i -= 1
+            self._ancora = self._valores[i]
+            self._antes -= self.contagens[self._ancora]
+        while pos >= self._antes + self.contagens[self._ancora]:
+            self._antes += self.contagens[self._ancora]
+            i += 1
+            self._ancora = self._valores[i]
+        return self._ancora
+
+    def _validar(self):
+        if not self.linhas_validas or self.soma_f == 0:
+            raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
+        if self.negativos:
+            raise ValueError("As frequências (fi) não podem ser negativas.")
+
+    def _validar_contagens(self):
+        if not self.n:
+            raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
+
+    def media(self) -> float:
+        self._validar()
+        return float(self.soma_xf / self.soma_f)
+
+    def mediana(self) -> float:
+        self._validar()
+        self._validar_contagens()
+        n = self.n
+        if n % 2 == 1:
+            return self._elemento(n // 2)
+        return (self._elemento(n // 2 - 1) + self._elemento(n // 2)) / 2
+
+    def moda(self):
+        self._validar()
+        self._validar_contagens()
+        heap = self._heap
+        # Descarta do topo as entradas vencidas (contagem já mudou)
+        while self.contagens.get(heap[0][1]) != -heap[0][0]:
+            heapq.heappop(heap)
+        freqmax = -heap[0][0]
+        if self.por_contagem[freqmax] == len(self.contagens):
+            return [], "amodal"
+
+        modas = set()
+        retirados = []
+        while heap and heap[0][0] == -freqmax:
+            entrada = heapq.heappop(heap)
+            if self.contagens.get(entrada[1]) == freqmax and entrada[1] not in modas:
+                modas.add(entrada[1])
+                retirados.append(entrada)
+        for entrada in retirados:
+            heapq.heappush(heap, entrada)
+        return sorted(modas), TIPOS_MODA.get(len(modas), "multimodal")
+
+    def variancia(self) -> float:
+        self._validar()
+        self._validar_contagens()
+        n = self.n
+        if n < 2:
+            raise ValueError("A amostra precisa ter mais de um elemento para calcular a variância.")
+        return variancia_exata(Fraction(n), self.soma_cx, self.soma_cx2)
+
+    @instrumentar("incremental.descrever_discreto")
+    def descrever(self, medidas=None, casas: int = 2) -> DescricaoDiscreta:
+        """
+        Mesmo resultado (e arredondamento) de descrever_discreto para a última tabela recebida.
+        """
+        plano = planejar_medidas(DEPENDENCIAS_DISCRETO if medidas is None else medidas, DEPENDENCIAS_DISCRETO)
+        self._validar()
+        r = {}
+        for medida in plano:
+            if medida == "media":
+                r["media"] = arredondar(self.media(), casas)
+            elif medida == "mediana":
+                r["mediana"] = arredondar(self.mediana(), casas)
+            elif medida == "moda":
+                modas, r["tipo_moda"] = self.moda()
+                r["modas"] = tuple(modas)
+            elif medida == "variancia":
+                r["variancia"] = arredondar(self.variancia(), casas)
+            elif medida == "desvio_padrao":
+                r["desvio_padrao"] = arredondar(math.sqrt(r["variancia"]), casas)
+            elif medida == "coeficiente_variacao":
+                if r["media"] != 0:
+                    r["coeficiente_variacao"] = arredondar((100 * r["desvio_padrao"]) / r["media"], casas)
+        return DescricaoDiscreta(**r)
+
+
+class AgregadoClasses(_AgregadoTabela):
+    """
+    Agregados da tabela de classes (Li, Ls, fi) com as regras de descrever_agrupado.
+    Média e variância saem de somas exatas (Fraction) de fi, fi·Pmi e fi·Pmi², atualizadas
+    por linha. Mediana e moda dependem da ordem das classes (Fac e vizinhas), então usam
+    os kernels vetorizados sobre a tabela atual, montada só quando ela muda; tabelas de
+    classes costumam ter poucas linhas.
+    """
+    colunas = ("Li", "Ls", "fi")
+
+    def _zerar(self):
+        self.linhas_validas = 0
+        self.soma_f = Fraction(0)
+        self.soma_pf = Fraction(0)
+        self.soma_p2f = Fraction(0)
+        self._classes = None
+
+    def _contribuir(self, li: float, ls: float, fi: float, sinal: int):
+        self.linhas_validas += sinal
+        # Pmi arredondado em float como em _preparar_classes; daí em diante, tudo exato
+        pmi, f = Fraction((li + ls) / 2), Fraction(fi)
+        self.soma_f += sinal * f
+        self.soma_pf += sinal * f * pmi
+        self.soma_p2f += sinal * f * pmi * pmi
+
+    def _tabela_mudou(self):
+        self._classes = None
+
+    @property
+    def nbytes(self) -> int:
+        if self._tabela is None:
+            return 0
+        classes = 0 if self._classes is None else sum(
+            parte.nbytes for parte in self._classes if isinstance(parte, np.ndarray))
+        return super().nbytes + classes
+
+    def _tabela_classes(self):
+        if self._classes is None:
+            self._classes = _preparar_classes(self._tabela.dropna())
+        return self._classes
+
+    def _n(self) -> Fraction:
+        if not self.linhas_validas:
+            raise ValueError("A tabela está vazia ou contém dados inválidos.")
+        # Mesma validação de _preparar_classes (frequências negativas)
+        self._tabela_classes()
+        return self.soma_f
+
+    def media(self) -> float:
+        n = self._n()
+        if n == 0:
+            raise ValueError("A soma das frequências (N) não pode ser zero.")
+        return arredondar(float(self.soma_pf / n))
+
+    def variancia(self, media: float) -> float:
+        n = self._n()
+        if n <= 1:
+            raise ValueError("A amostra precisa ter mais de um elemento para calcular a variância.")
+        # Centrada na média arredondada do cartão, como _variancia_classes
+        return arredondar(variancia_exata(n, self.soma_pf, self.soma_p2f, centro=media))
+
+    @instrumentar("incremental.descrever_agrupado")
+    def descrever(self, medidas=None) -> DescricaoAgrupada:
+        """
+        Mesmo resultado de descrever_agrupado para as linhas completas da última tabela recebida.
+        """
+        plano = planejar_medidas(DEPENDENCIAS_AGRUPADO if medidas is None else medidas, DEPENDENCIAS_AGRUPADO)
+        self._n()
+        r = {}
+        if "moda_bruta" in plano or "moda_czuber" in plano:
+            modas_brutas, modas_czuber, r["tipo_moda"] = _moda_classes(self._tabela_classes())
+            if "moda_bruta" in plano:
+                r["modas_brutas"] = tuple(modas_brutas)
+            if "moda_czuber" in plano:
+                r["modas_czuber"] = tuple(modas_czuber)
+
+        for medida in plano:
+            if medida == "media":
+                r["media"] = self.media()
+            elif medida == "mediana":
+                r["mediana"] = _mediana_classes(self._tabela_classes())
+            elif medida == "variancia":
+                r["variancia"] = self.variancia(r["media"])
+            elif medida == "desvio_padrao":
+                r["desvio_padrao"] = arredondar(math.sqrt(r["variancia"]))
+            elif medida == "coeficiente_variacao":
+                if r["media"] != 0:
+                    r["coeficiente_variacao"] = arredondar((100 * r["desvio_padrao"]) / r["media"], 2)
+        return DescricaoAgrupada(**r)
@@ -0,0 +1,184 @@
+# lote.py
+"""
+Processamento em lote (sem Streamlit): calcula as mesmas medidas da página
+"Parâmetros Estatísticos" para muitos arquivos, distribuídos entre processos.
+
+Uso:
+    python -m ferramentas.lote dados/ "turmas/**/*.csv" --saida resultados.csv
+    python -m ferramentas.lote dados/ --saida resultados.jsonl --processos 8
+
+O formato de cada arquivo é detectado pelo cabeçalho:
+- colunas Li, Ls e fi      -> agrupamento por classes;
+- colunas xi e fi          -> tabela discreta (xi, fi);
+- qualquer outra           -> valores brutos da primeira coluna (ou de --coluna).
+
+Com --total, cada processo devolve também um ResumoDiscreto do seu arquivo e os
+resumos são mesclados em uma última linha "(total)", igual ao cálculo sobre todos
+os dados juntos (tabelas de classes ficam fora do total; acima de
+resumo.LIMITE_VALORES valores distintos, mediana e moda do total são aproximadas).
+Linhas de arquivo e total usam o mesmo modo numérico (MODO, o exato do resumo).
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ferramentas.arquivos import (
+    colunas_arquivo, ler_valores_brutos, ler_tabela_discreta, ler_tabela_classes
+)
+from ferramentas.funcoes import descrever_discreto, descrever_agrupado
+from ferramentas.resumo import ResumoDiscreto
+
+EXTENSOES = (".csv", ".xlsx")
+
+# Modo numérico das linhas de cada arquivo: o mesmo das somas exatas do ResumoDiscreto,
+# para que a linha "(total)" de um único arquivo repita a linha do arquivo
+MODO = "exato"
+
+CAMPOS = [
+    "arquivo", "tipo", "n", "media", "mediana", "modas", "modas_czuber", "tipo_moda",
+    "variancia", "desvio_padrao", "coeficiente_variacao", "erro",
+]
+
+
+def listar_arquivos(entradas) -> list:
+    """
+    Expande diretórios (arquivos .csv/.xlsx do diretório) e padrões glob (aceita **).
+    """
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(os.path.join(entrada, nome) for nome in os.listdir(entrada))
+        else:
+            candidatos = sorted(glob.glob(entrada, recursive=True))
+        arquivos.extend(c for c in candidatos if os.path.isfile(c) and c.lower().endswith(EXTENSOES))
+    return list(dict.fromkeys(arquivos))  # remove repetidos mantendo a ordem
+
+
+def _formatar_modas(modas) -> str:
+    # Mesmo texto dos cartões; Czuber indefinida aparece como N/A
+    return ", ".join("N/A" if m is None else f"{m:.2f}" for m in modas)
+
+
+def processar_arquivo(caminho: str, sep: str = ",", decimal: str = ".", coluna=None, resumir: bool = False):
+    """
+    Calcula todas as medidas de um arquivo. Erros viram o campo 'erro' (o lote continua).
+    Com resumir=True devolve (linha, resumo): o ResumoDiscreto do arquivo, ou None
+    para tabelas de classes e arquivos com erro.
+    """
+    linha = {"arquivo": caminho}
+    resumo = None
+    try:
+        colunas = colunas_arquivo(caminho, sep)
+        if {"Li", "Ls", "fi"} <= set(colunas):
+            tabela = ler_tabela_classes(caminho, sep=sep, decimal=decimal)
+            r = descrever_agrupado(tabela)
+            linha.update(tipo="classes", n=int(tabela["fi"].sum()),
+                         modas=_formatar_modas(r.modas_brutas), modas_czuber=_formatar_modas(r.modas_czuber))
+        else:
+            if {"xi", "fi"} <= set(colunas) and coluna is None:
+                tabela = ler_tabela_discreta(caminho, sep=sep, decimal=decimal)
+                linha["tipo"] = "discreto"
+            else:
+                tabela = ler_valores_brutos(caminho, coluna or colunas[0], sep=sep, decimal=decimal)
+                linha["tipo"] = "valores"
+            r = descrever_discreto(tabela, modo=MODO)
+            linha.update(n=int(tabela["fi"].sum()), modas=_formatar_modas(r.modas))
+            if resumir:
+                resumo = ResumoDiscreto.de_tabela(tabela)
+
+        linha.update(media=r.media, mediana=r.mediana, tipo_moda=r.tipo_moda, variancia=r.variancia,
+                     desvio_padrao=r.desvio_padrao, coeficiente_variacao=r.coeficiente_variacao)
+    except Exception as e:
+        linha["erro"] = str(e)
+        resumo = None
+    return (linha, resumo) if resumir else linha
+
+
+def _linha_total(resumo: ResumoDiscreto) -> dict:
+    linha = {"arquivo": "(total)", "tipo": "total"}
+    try:
+        r = resumo.descrever()
+        linha.update(n=resumo.n, media=r.media, mediana=r.mediana, modas=_formatar_modas(r.modas),
+                     tipo_moda=r.tipo_moda, variancia=r.variancia, desvio_padrao=r.desvio_padrao,
+                     coeficiente_variacao=r.coeficiente_variacao)
+    except Exception as e:
+        linha["erro"] = str(e)
+    return linha
+
+
+def executar(arquivos, saida, sep=",", decimal=".", coluna=None, processos=None, relatorio=sys.stderr,
+             total: bool = False) -> int:
+    """
+    Distribui os arquivos entre 'processos' e grava cada resultado em 'saida'
+    assim que fica pronto (.jsonl -> JSON Lines; demais -> CSV).
+    Com total=True, acrescenta a linha "(total)" com os resumos mesclados.
+    Devolve o nº de arquivos com erro.
+    """
+    jsonl = saida.lower().endswith((".jsonl", ".json"))
+    erros = 0
+    resumo_total = ResumoDiscreto()
+    inicio = ultimo_relatorio = time.perf_counter()
+
+    with open(saida, "w", newline="", encoding="utf-8") as destino, \
+            ProcessPoolExecutor(max_workers=processos) as executor:
+        escritor = None if jsonl else csv.DictWriter(destino, fieldnames=CAMPOS)
+        if escritor:
+            escritor.writeheader()
+
+        def gravar(linha):
+            if jsonl:
+                destino.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            else:
+                escritor.writerow(linha)
+
+        futuros = [executor.submit(processar_arquivo, a, sep, decimal, coluna, total) for a in arquivos]
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            linha = futuro.result()
+            if total:
+                linha, resumo = linha
+                if resumo is not None:
+                    resumo_total = resumo_total.mesclar(resumo)
+            erros += "erro" in linha
+            gravar(linha)
+
+            agora = time.perf_counter()
+            if agora - ultimo_relatorio >= 2 or feitos == len(futuros):
+                ultimo_relatorio = agora
+                decorrido = agora - inicio
+                print(f"{feitos}/{len(futuros)} arquivos em {decorrido:.1f} s "
+                      f"({feitos / decorrido:.1f} arquivos/s, {erros} com erro)", file=relatorio)
+
+        if total:
+            gravar(_linha_total(resumo_total))
+    return erros
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ferramentas.lote",
+        description="Calcula média, mediana, moda, variância, desvio padrão e CV para vários arquivos.",
+    )
+    parser.add_argument("entradas", nargs="+", help="diretórios, arquivos ou padrões glob (.csv/.xlsx)")
+    parser.add_argument("--saida", default="resultados.csv", help="arquivo de saída (.csv ou .jsonl)")
+    parser.add_argument("--sep", default=",", help="separador de colunas dos CSVs (padrão: ,)")
+    parser.add_argument("--decimal", default=".", help="separador decimal dos CSVs (padrão: .)")
+    parser.add_argument("--coluna", default=None, help="coluna de valores brutos (padrão: a primeira)")
+    parser.add_argument("--processos", type=int, default=None, help="nº de processos (padrão: nº de CPUs)")
+    parser.add_argument("--total", action="store_true",
+                        help="acrescenta uma linha com as medidas de todos os arquivos juntos (exceto classes)")
+    args = parser.parse_args(argv)
+
+    arquivos = listar_arquivos(args.entradas)
+    if not arquivos:
+        parser.error("nenhum arquivo .csv ou .xlsx encontrado nas entradas.")
+    erros = executar(arquivos, args.saida, args.sep, args.decimal, args.coluna, args.processos, total=args.total)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# precisao.py
+"""
+Somas das medidas com dois modos numéricos:
+
+- "rapido": vetorizado em NumPy, com soma compensada (TwoSum em pares, em árvore) e
+  produtos xi·fi com o erro de arredondamento recuperado (TwoProduct de Dekker).
+  O resultado é tão bom quanto somar em precisão dupla-dupla e depois arredondar
+  (Ogita, Rump e Oishi, 2005): não acumula erro com o tamanho da tabela;
+- "exato": aritmética racional (cada float é um racional diádico m/2^k, somado com
+  inteiros do Python) e um único arredondamento no fim. Não há cancelamento
+  catastrófico na variância, mesmo com valores grandes e pouco espalhados.
+
+"auto" (padrão) usa o exato até LIMITE_EXATO parcelas e o rápido acima disso.
+Valores não finitos (inf, NaN) sempre vão pelo rápido, que os propaga como o NumPy.
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+
+MODOS_NUMERICOS = {
+    "auto": "Automático (exato em tabelas pequenas)",
+    "rapido": "Rápido (soma compensada)",
+    "exato": "Exato (frações)",
+}
+
+# Até aqui (nº de parcelas) o modo automático usa aritmética exata
+LIMITE_EXATO = 2_000
+
+# 2^27 + 1: divide a mantissa de 53 bits em duas metades de 26 bits (Dekker)
+_DIVISOR = 134217729.0
+
+
+class SomaExata:
+    """
+    Soma de floats sem erro de arredondamento, com inclusão e retirada de parcelas.
+    Guarda a soma como lista de parciais que não se sobrepõem (algoritmo de Shewchuk).
+    """
+    __slots__ = ("parciais",)
+
+    def __init__(self):
+        self.parciais = []
+
+    def somar(self, x: float):
+        parciais = self.parciais
+        i = 0
+        for y in parciais:
+            if abs(x) < abs(y):
+                x, y = y, x
+            alto = x + y
+            baixo = y - (alto - x)
+            if baixo:
+                parciais[i] = baixo
+                i += 1
+            x = alto
+        parciais[i:] = [x]
+
+    def valor(self) -> float:
+        return math.fsum(self.parciais)
+
+    def exato(self) -> Fraction:
+        return sum(map(Fraction, self.parciais), Fraction(0))
+
+
+def escolher_modo(*arrays, modo: str = "auto") -> str:
+    """
+    Resolve 'modo' para "rapido" ou "exato" conforme o tamanho e a finitude dos arrays.
+    """
+    if modo not in MODOS_NUMERICOS:
+        raise ValueError(f"Modo numérico desconhecido: {modo}")
+    if modo == "rapido":
+        return "rapido"
+    if not all(np.isfinite(a).all() for a in arrays):
+        return "rapido"
+    if modo == "auto" and max((np.size(a) for a in arrays), default=0) > LIMITE_EXATO:
+        return "rapido"
+    return "exato"
+
+
+# -------------------------------
+# Modo rápido
+# -------------------------------
+def soma_compensada(valores) -> float:
+    """
+    Soma em árvore (pares vizinhos) com TwoSum em cada soma; os erros de todas as
+    somas são acumulados à parte e devolvidos no fim.
+    """
+    v = np.asarray(valores, dtype=np.float64).ravel()
+    if v.size == 0:
+        return 0.0
+    erros, sobras = [], []
+    with np.errstate(invalid="ignore", over="ignore"):
+        while v.size > 1:
+            if v.size % 2:
+                sobras.append(float(v[-1]))
+                v = v[:-1]
+            a, b = v[0::2], v[1::2]
+            s = a + b
+            bb = s - a
+            erros.append(float(((a - (s - bb)) + (b - bb)).sum()))
+            v = s
+    parcelas = [float(v[0]), *erros, *sobras]
+    # inf/NaN nas parcelas: os termos de erro viram NaN; a soma comum já dá o resultado certo
+    if not all(map(math.isfinite, parcelas)):
+        return float(np.sum(valores))
+    return math.fsum(parcelas)
+
+
+def _produto_com_erro(a: np.ndarray, b: np.ndarray):
+    """
+    TwoProduct de Dekker: a·b = p + e exatamente (sem FMA no NumPy).
+    Perto do overflow (|x| > ~1e300) o termo de erro é descartado.
+    """
+    p = a * b
+    with np.errstate(invalid="ignore", over="ignore"):
+        a1, a2 = _dividir(a)
+        b1, b2 = _dividir(b)
+        # e = a2·b2 - (((p - a1·b1) - a2·b1) - a1·b2), reaproveitando os buffers
+        e = p - a1 * b1
+        e -= a2 * b1
+        a1 *= b2
+        e -= a1
+        a2 *= b2
+        np.subtract(a2, e, out=e)
+    e[~np.isfinite(e)] = 0.0
+    return p, e
+
+
+def _dividir(a: np.ndarray):
+    # a = alto + baixo, cada parte com no máximo 26 bits de mantissa (em buffers novos)
+    alto = a * _DIVISOR
+    baixo = alto - a
+    alto -= baixo
+    np.subtract(a, alto, out=baixo)
+    return alto, baixo
+
+
+def _soma_produtos_rapida(a, b) -> float:
+    p, e = _produto_com_erro(a, b)
+    return soma_compensada(np.concatenate([p, e]))
+
+
+# -------------------------------
+# Modo exato (racionais diádicos com inteiros do Python)
+# -------------------------------
+def _diadicos(valores):
+    """
+    Cada float como (numerador, k), com valor numerador / 2**k.
+    """
+    for x in valores.tolist():
+        n, d = x.as_integer_ratio()
+        yield n, d.bit_length() - 1
+
+
+def _somar_diadicos(termos) -> Fraction:
+    termos = list(termos)
+    if not termos:
+        return Fraction(0)
+    k_max = max(k for _, k in termos)
+    return Fraction(sum(n << (k_max - k) for n, k in termos), 1 << k_max)
+
+
+def _para_float(valor: Fraction) -> float:
+    # Arredondamento único no fim; além do maior float vira ±inf, como no modo rápido
+    try:
+        return float(valor)
+    except OverflowError:
+        return math.inf if valor > 0 else -math.inf
+
+
+def somas_exatas(valores, pesos):
+    """
+    Σw, Σw·x e Σw·x² exatos (Fraction), sem arredondar nem os produtos. São os momentos
+    que variancia_exata usa; somas de partes diferentes podem ser somadas entre si.
+    """
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    pesos = np.asarray(pesos, dtype=np.float64).ravel()
+    x = list(_diadicos(valores))
+    w = list(_diadicos(pesos))
+    soma_w = _somar_diadicos(w)
+    soma_wx = _somar_diadicos((nw * nx, kw + kx) for (nx, kx), (nw, kw) in zip(x, w))
+    soma_wx2 = _somar_diadicos((nw * nx * nx, kw + 2 * kx) for (nx, kx), (nw, kw) in zip(x, w))
+    return soma_w, soma_wx, soma_wx2
+
+
+# -------------------------------
+# Funções usadas pelas medidas
+# -------------------------------
+def soma(valores, modo: str = "auto") -> float:
+    """
+    Σ valores no modo pedido.
+    """
+    v = np.asarray(valores, dtype=np.float64).ravel()
+    if escolher_modo(v, modo=modo) == "exato":
+        return _para_float(_somar_diadicos(_diadicos(v)))
+    return soma_compensada(v)
+
+
+def media_ponderada(valores, pesos, modo: str = "auto") -> float:
+    """
+    Σw·x / Σw no modo pedido (Σw = 0 gera ZeroDivisionError no exato e inf/NaN no rápido,
+    como na divisão comum; as funções de cálculo validam antes).
+    """
+    x = np.asarray(valores, dtype=np.float64).ravel()
+    w = np.asarray(pesos, dtype=np.float64).ravel()
+    if escolher_modo(x, w, modo=modo) == "exato":
+        soma_w, soma_wx, _ = somas_exatas(x, w)
+        return _para_float(soma_wx / soma_w)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.float64(_soma_produtos_rapida(x, w)) / np.float64(soma_compensada(w)))
+
+
+def soma_quadrados(valores, pesos, centro=None, modo: str = "auto") -> float:
+    """
+    Σw·(x - centro)², com centro = média ponderada quando None (numerador da variância).
+    - rápido: desvios em relação à média, corrigidos por (Σw·d)²/Σw (duas passadas
+      corrigidas, Björck), com somas compensadas;
+    - exato: Σw·x² - 2·c·Σw·x + c²·Σw em racionais, sem cancelamento.
+    """
+    x = np.asarray(valores, dtype=np.float64).ravel()
+    w = np.asarray(pesos, dtype=np.float64).ravel()
+    if escolher_modo(x, w, modo=modo) == "exato":
+        soma_w, soma_wx, soma_wx2 = somas_exatas(x, w)
+        c = soma_wx / soma_w if centro is None else Fraction(float(centro))
+        return _para_float(soma_wx2 - 2 * c * soma_wx + c * c * soma_w)
+
+    corrigir = centro is None
+    if corrigir:
+        centro = media_ponderada(x, w, "rapido")
+    d = x - centro
+    total = _soma_produtos_rapida(w * d, d)
+    if corrigir:
+        total -= _soma_produtos_rapida(w, d) ** 2 / soma_compensada(w)
+    return total
+
+
+def variancia_exata(soma_w, soma_wx, soma_wx2, centro=None) -> float:
+    """
+    Variância amostral Σw·(x - c)² / (Σw - 1) a partir dos momentos exatos de somas_exatas,
+    com c = Σw·x / Σw quando 'centro' é None. Numerador e divisão em racionais: um único
+    arredondamento no fim.
+    """
+    c = soma_wx / soma_w if centro is None else Fraction(float(centro))
+    return _para_float((soma_wx2 - 2 * c * soma_wx + c * c * soma_w) / (soma_w - 1))
+
+
+def variancia_amostral(valores, pesos, centro=None, modo: str = "auto") -> float:
+    """
+    Σw·(x - centro)² / (Σw - 1) no modo pedido. No exato a divisão também é feita em
+    racionais (variancia_exata); no rápido, soma_quadrados dividido por Σw - 1.
+    Quem chama valida antes que Σw > 1.
+    """
+    x = np.asarray(valores, dtype=np.float64).ravel()
+    w = np.asarray(pesos, dtype=np.float64).ravel()
+    if escolher_modo(x, w, modo=modo) == "exato":
+        return variancia_exata(*somas_exatas(x, w), centro=centro)
+    return soma_quadrados(x, w, centro, "rapido") / (soma_compensada(w) - 1)
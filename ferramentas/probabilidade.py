@@ -0,0 +1,511 @@
+# probabilidade.py
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from ferramentas.cache import CacheLRU
+from ferramentas.diagnostico import instrumentar
+
+# Todas as funções aceitam escalares ou arrays NumPy em x/k e devolvem arrays
+# (uma tabela inteira de P(a <= X <= b) ou uma curva sai de uma única chamada).
+
+
+# -------------------------------
+# Funções auxiliares
+# -------------------------------
+def _erfc(x) -> np.ndarray:
+    """
+    Função erro complementar vetorizada (erro relativo ~1e-13, inclusive nas caudas):
+    - |x| < 1.5: série erf(z) = 2/√π · e^(-z²) · Σ (2z²)^n · z / (1·3·…·(2n+1)), termos todos positivos;
+    - |x| >= 1.5: fração contínua de Laplace, avaliada de trás para frente, sem perder a cauda.
+    Os laços percorrem termos da série, nunca os pontos.
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x)
+    resultado = np.empty_like(z)
+
+    pequeno = z < 1.5
+    zp = z[pequeno]
+    termo = zp.copy()
+    soma = zp.copy()
+    for n in range(1, 50):
+        termo = termo * 2 * zp * zp / (2 * n + 1)
+        soma += termo
+    resultado[pequeno] = 1 - 2 / math.sqrt(math.pi) * np.exp(-zp * zp) * soma
+
+    zg = z[~pequeno]
+    fracao = zg.copy()
+    for k in range(120, 0, -1):
+        fracao = zg + (k / 2) / fracao
+    resultado[~pequeno] = np.exp(-zg * zg) / (math.sqrt(math.pi) * fracao)
+
+    resultado = np.where(x < 0, 2 - resultado, resultado)
+    return np.where(np.isnan(x), np.nan, resultado)
+
+
+# Termos da PMF na forma de ponto de sela de Loader ("Fast and Accurate Computation of
+# Binomial Probabilities", 2000): em vez de diferenças de ln k! (que se cancelam para n e λ
+# grandes), cada termo é pequeno e calculado com erro relativo ~1e-15.
+_LN_2PI = math.log(2 * math.pi)
+_LIMITE_STIRLERR = 16
+# stirlerr(k) para k < 16 a partir de lgamma (cancelamento pequeno: erro absoluto ~1e-15)
+_TABELA_STIRLERR = np.array([0.0] + [math.lgamma(k + 1) - (k + 0.5) * math.log(k) + k - 0.5 * _LN_2PI
+                                     for k in range(1, _LIMITE_STIRLERR)])
+
+
+def _stirlerr(k) -> np.ndarray:
+    """
+    ln(k!) - ln(√(2πk)·(k/e)^k), o erro da fórmula de Stirling, vetorizado para inteiros k >= 0:
+    tabela para k < 16 e série assintótica acima (erro < 1e-16).
+    """
+    k = np.asarray(k, dtype=float)
+    pequeno = k < _LIMITE_STIRLERR
+    indices = np.where(pequeno, k, 0).astype(np.int64)
+    kg = np.where(pequeno, _LIMITE_STIRLERR, k)  # evita divisões por zero nos ramos descartados
+    k2 = kg * kg
+    serie = (1 / 12 - (1 / 360 - (1 / 1260 - (1 / 1680 - 1 / (1188 * k2)) / k2) / k2) / k2) / kg
+    return np.where(pequeno, _TABELA_STIRLERR[indices], serie)
+
+
+def _bd0(x, m, diferenca=None) -> np.ndarray:
+    """
+    Desvio x·ln(x/m) + m - x (>= 0) sem cancelamento: perto de x = m usa a série em
+    v = (x - m)/(x + m), cujos termos são todos positivos. 'diferenca' é x - m quando o chamador
+    a conhece com mais precisão que a subtração em float (o desvio depende dela, não de x e m).
+    """
+    x = np.asarray(x, dtype=float)
+    m = np.asarray(m, dtype=float)
+    d = x - m if diferenca is None else np.asarray(diferenca, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        direto = x * np.log(x / m) + m - x
+        v = d / (x + m)
+        soma = d * v
+        termo = 2 * x * v
+        for j in range(1, 12):  # |v| < 0.1: cada termo cai por v² < 1e-2
+            termo = termo * v * v
+            soma = soma + termo / (2 * j + 1)
+    return np.where(np.abs(d) < 0.1 * (x + m), soma, np.where(x == 0, m, direto))
+
+
+def _produto_exato(a: float, b: float):
+    """a·b = alto + baixo exatamente (produto de Dekker): 'baixo' é o arredondamento de a·b em float."""
+    def dividir(x):
+        t = 134217729.0 * x  # 2^27 + 1
+        alto = t - (t - x)
+        return alto, x - alto
+
+    alto = a * b
+    a1, a2 = dividir(a)
+    b1, b2 = dividir(b)
+    return alto, ((a1 * b1 - alto) + a1 * b2 + a2 * b1) + a2 * b2
+
+
+def _eh_inteiro(k) -> np.ndarray:
+    k = np.asarray(k, dtype=float)
+    return np.isfinite(k) & (k == np.floor(k))
+
+
+def _suporte_efetivo(media: float, desvio: float, maximo: float):
+    """
+    Intervalo de k fora do qual a massa é desprezível (< 1e-300): média ± 40 desvios.
+    Permite somar a CDF em O(desvio) termos em vez de O(n) ou O(λ).
+    """
+    margem = 40 * desvio + 10
+    inicio = max(0, math.floor(media - margem))
+    fim = math.ceil(media + margem)
+    return inicio, (fim if maximo is None else min(maximo, fim))
+
+
+class TabelaAcumulada(NamedTuple):
+    """
+    F(k) para os inteiros k = inicio, ..., inicio + len(F) - 1.
+    Abaixo de 'inicio' F vale 0 e a partir do último k vale 1 (massa restante desprezível).
+    """
+    inicio: int
+    F: np.ndarray
+
+
+def _bytes_tabela(tabela) -> int:
+    # Memória dos arrays de uma tabela em cache (TabelaAcumulada ou grade da normal)
+    return sum(parte.nbytes for parte in tabela if isinstance(parte, np.ndarray))
+
+
+# Tabelas acumuladas por (distribuição, parâmetros), compartilhadas entre reruns e sessões.
+# Cada tabela tem no máximo _LIMITE_TABELA inteiros (8 MiB); acima disso a CDF sai de
+# _cdf_por_quadratura, sem tabela. Limite de memória: 64 MiB somando todas as tabelas.
+_LIMITE_TABELA = 1 << 20
+cache_tabelas = CacheLRU(tamanho_maximo=64, peso=_bytes_tabela, peso_maximo=64 * 2**20)
+
+
+def _suporte_grande(media: float, desvio: float, maximo: float = None) -> bool:
+    inicio, fim = _suporte_efetivo(media, desvio, maximo)
+    return fim - inicio + 1 > _LIMITE_TABELA
+
+
+def _montar_tabela(pmf, inicio: int, fim: int) -> TabelaAcumulada:
+    if fim - inicio + 1 > _LIMITE_TABELA:
+        raise ValueError(f"Suporte com {fim - inicio + 1:,} inteiros: grande demais para tabelar "
+                         f"(limite {_LIMITE_TABELA:,}).")
+    F = np.minimum(np.cumsum(pmf(np.arange(inicio, fim + 1))), 1.0)
+    F.flags.writeable = False  # a mesma tabela é entregue a todos os chamadores
+    return TabelaAcumulada(inicio, F)
+
+
+def _cdf_pela_tabela(k, tabela: TabelaAcumulada) -> np.ndarray:
+    k = np.floor(np.asarray(k, dtype=float))
+    fim = tabela.inicio + len(tabela.F) - 1
+    indices = np.clip(k - tabela.inicio, 0, len(tabela.F) - 1).astype(np.int64)
+    return np.where(k < tabela.inicio, 0.0, np.where(k >= fim, 1.0, tabela.F[indices]))
+
+
+def _quantil_pela_tabela(q, tabela: TabelaAcumulada) -> np.ndarray:
+    # Menor k com F(k) >= q, por busca binária na tabela
+    indices = np.searchsorted(tabela.F, np.asarray(q, dtype=float), side="left")
+    return (tabela.inicio + np.minimum(indices, len(tabela.F) - 1)).astype(float)
+
+
+# Gauss-Legendre de 16 pontos em [-1, 1], aplicado em _PAINEIS_QUADRATURA painéis
+_NOS_GL, _PESOS_GL = np.polynomial.legendre.leggauss(16)
+_PAINEIS_QUADRATURA = 20
+
+
+def _cdf_por_quadratura(k, log_termo, media: float, desvio: float) -> np.ndarray:
+    """
+    F(k) = Σ_{j <= k} f(j) em O(1) por k, para suportes grandes demais para tabelar (desvio > 1e4),
+    com f(média + d) = exp(log_termo(d)) a extensão contínua da PMF; os pontos vão como deslocamentos
+    d, exatos, porque média + d em float perderia dígitos que a PMF amplifica.
+    Soma de Euler-Maclaurin no ponto médio: Σ_{j <= k} f(j) = ∫ f até k + ½ - f'(k + ½)/24, com erro
+    da ordem de f⁽³⁾ ~ f/desvio³. A integral, em z = d/desvio, vai da cauda mais próxima (|z| = 40,
+    massa além desprezível) até k + ½, por Gauss-Legendre em painéis; a derivada, por diferença central.
+    """
+    k = np.floor(np.asarray(k, dtype=float))
+    b = k + 0.5 - media
+    z = np.clip(b / desvio, -40.0, 40.0)
+    inferior = z <= 0  # integra a cauda menor: F(k) direto ou 1 - F(k)
+    z0 = np.where(inferior, -40.0, z)
+    meia = (np.where(inferior, z, 40.0) - z0) / (2 * _PAINEIS_QUADRATURA)
+    centros = z0[..., None] + meia[..., None] * np.arange(1, 2 * _PAINEIS_QUADRATURA, 2)
+    nos = centros[..., None] + meia[..., None, None] * _NOS_GL
+    with np.errstate(divide="ignore", invalid="ignore"):
+        integral = desvio * meia * np.sum(np.exp(log_termo(desvio * nos)) * _PESOS_GL, axis=(-2, -1))
+        derivada = (np.exp(log_termo(b + 1)) - np.exp(log_termo(b - 1))) / 2
+    F = np.where(inferior, integral - derivada / 24, 1 - (integral + derivada / 24))
+    return np.where(b < -40 * desvio, 0.0, np.where(b > 40 * desvio, 1.0, np.clip(F, 0.0, 1.0)))
+
+
+def _quantil_por_bisseccao(q, cdf, inicio: int, fim: int) -> np.ndarray:
+    # Menor k em [inicio, fim] com F(k) >= q, por bissecção nos inteiros (todas as q juntas)
+    q = np.asarray(q, dtype=float)
+    baixo = np.full(q.shape, inicio - 1.0)  # sempre F(baixo) < q, ou baixo abaixo do suporte
+    alto = np.full(q.shape, float(fim))
+    while np.any(alto - baixo > 1):
+        meio = np.floor((baixo + alto) / 2)
+        atinge = cdf(meio) >= q
+        alto = np.where(atinge, meio, alto)
+        baixo = np.where(atinge, baixo, meio)
+    return alto
+
+
+# -------------------------------
+# Contínuas
+# -------------------------------
+def _validar_uniforme(a, b):
+    if not a < b:
+        raise ValueError("Na distribuição uniforme, é preciso ter a < b.")
+
+
+def uniforme_pdf(x, a: float, b: float) -> np.ndarray:
+    """f(x) = 1/(b - a) para a <= x <= b; 0 fora."""
+    _validar_uniforme(a, b)
+    x = np.asarray(x, dtype=float)
+    return np.where((x >= a) & (x <= b), 1 / (b - a), 0.0)
+
+
+def uniforme_cdf(x, a: float, b: float) -> np.ndarray:
+    """F(x) = (x - a)/(b - a), limitada a [0, 1]."""
+    _validar_uniforme(a, b)
+    return np.clip((np.asarray(x, dtype=float) - a) / (b - a), 0.0, 1.0)
+
+
+def _validar_exponencial(lam):
+    if not lam > 0:
+        raise ValueError("Na distribuição exponencial, λ deve ser maior que zero.")
+
+
+def exponencial_pdf(x, lam: float) -> np.ndarray:
+    """f(x) = λ·e^(-λx) para x >= 0."""
+    _validar_exponencial(lam)
+    x = np.asarray(x, dtype=float)
+    return np.where(x >= 0, lam * np.exp(-lam * np.maximum(x, 0)), 0.0)
+
+
+def exponencial_cdf(x, lam: float) -> np.ndarray:
+    """F(x) = 1 - e^(-λx) para x >= 0 (expm1 mantém a precisão perto de zero)."""
+    _validar_exponencial(lam)
+    x = np.asarray(x, dtype=float)
+    return np.where(x >= 0, -np.expm1(-lam * np.maximum(x, 0)), 0.0)
+
+
+def _validar_normal(sigma):
+    if not sigma > 0:
+        raise ValueError("Na distribuição normal, o desvio padrão σ deve ser maior que zero.")
+
+
+def normal_pdf(x, mu: float = 0.0, sigma: float = 1.0) -> np.ndarray:
+    """f(x) = e^(-z²/2) / (σ√(2π)), com z = (x - μ)/σ."""
+    _validar_normal(sigma)
+    z = (np.asarray(x, dtype=float) - mu) / sigma
+    return np.exp(-0.5 * z * z) / (sigma * math.sqrt(2 * math.pi))
+
+
+def normal_cdf(x, mu: float = 0.0, sigma: float = 1.0) -> np.ndarray:
+    """Φ(z) = erfc(-z/√2)/2, precisa também nas caudas."""
+    _validar_normal(sigma)
+    z = (np.asarray(x, dtype=float) - mu) / sigma
+    return 0.5 * _erfc(-z / math.sqrt(2))
+
+
+def _grade_normal_padrao():
+    """
+    Φ(z) numa grade de z em [-37, 37] (até Φ ≈ 1e-300), montada uma vez e compartilhada por
+    qualquer μ e σ (o quantil de N(μ, σ) é μ + σ·z).
+    """
+    def montar():
+        z = np.linspace(-37, 37, 1 << 15)
+        F = normal_cdf(z)
+        z.flags.writeable = False
+        F.flags.writeable = False
+        return z, F
+
+    return cache_tabelas.obter(("normal",), montar)
+
+
+def normal_quantil(q, mu: float = 0.0, sigma: float = 1.0) -> np.ndarray:
+    """
+    x tal que Φ((x - μ)/σ) = q: busca binária na grade em cache, interpolação linear
+    e três passos de Newton em ln Φ exata (erro ~1e-13 em z; perto de q = 1 a precisão
+    é limitada pela própria representação de q). q = 0 dá -inf e q = 1 dá +inf.
+    """
+    _validar_normal(sigma)
+    q = np.asarray(q, dtype=float)
+    z_grade, F_grade = _grade_normal_padrao()
+    i = np.clip(np.searchsorted(F_grade, q, side="left"), 1, len(F_grade) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peso = np.clip((q - F_grade[i - 1]) / (F_grade[i] - F_grade[i - 1]), 0, 1)
+        z = z_grade[i - 1] + peso * (z_grade[i] - z_grade[i - 1])
+        for _ in range(3):
+            # Newton em ln Φ: converge também na cauda, onde Φ varia exponencialmente
+            F = normal_cdf(z)
+            z = z - (np.log(F) - np.log(q)) * F / normal_pdf(z)
+        z = np.where(np.isfinite(z), z, np.clip(z, -37, 37))
+    z = np.where(q <= 0, -np.inf, np.where(q >= 1, np.inf, z))
+    return mu + sigma * z
+
+
+# -------------------------------
+# Discretas (termos em escala logarítmica)
+# -------------------------------
+def _validar_binomial(n, p):
+    if not (n >= 0 and float(n).is_integer()):
+        raise ValueError("Na distribuição binomial, n deve ser um inteiro >= 0.")
+    if not 0 <= p <= 1:
+        raise ValueError("Na distribuição binomial, p deve estar entre 0 e 1.")
+
+
+def _log_binomial(k, n: int, p: float, diferenca=None) -> np.ndarray:
+    """
+    ln P(X = k) na forma de Loader para 0 < k < n, também com k real (a extensão contínua da PMF
+    que _cdf_por_quadratura integra). 'diferenca' é k - np, se o chamador a tem mais precisa.
+    """
+    k = np.asarray(k, dtype=float)
+    # k - np com o resto do arredondamento de np: bd0 depende dessa diferença, e o erro de 1 ulp
+    # em np viraria, em n = 1e15, um erro relativo ~1e-8 na PMF (n - k - nq é o simétrico)
+    np_alto, np_baixo = _produto_exato(float(n), p)
+    if diferenca is None:
+        diferenca = (k - np_alto) - np_baixo
+    return (_stirlerr(n) - _stirlerr(k) - _stirlerr(n - k)
+            - _bd0(k, np_alto, diferenca) - _bd0(n - k, n - np_alto, -diferenca)
+            - 0.5 * (_LN_2PI + np.log(k) + np.log1p(-k / n)))
+
+
+def binomial_pmf(k, n: int, p: float) -> np.ndarray:
+    """
+    P(X = k) = C(n, k)·p^k·(1-p)^(n-k), na forma de ponto de sela de Loader:
+    exp(stirlerr(n) - stirlerr(k) - stirlerr(n-k) - bd0(k, np) - bd0(n-k, nq)) / √(2πk(n-k)/n).
+    Sem estouro nem cancelamento para n grande (a massa total continua 1 em n = 1e12).
+    """
+    _validar_binomial(n, p)
+    k = np.asarray(k, dtype=float)
+    valido = _eh_inteiro(k) & (k >= 0) & (k <= n)
+    if p == 0 or p == 1:
+        return np.where(valido & (k == (0 if p == 0 else n)), 1.0, 0.0)
+    kv = np.where(valido, k, 0)
+    meio = (kv > 0) & (kv < n)
+    with np.errstate(divide="ignore"):
+        log_pmf = _log_binomial(np.where(meio, kv, 1), n, p)  # só os termos 0 < k < n usam a forma completa
+    # Extremos k = 0 e k = n: (1-p)^n e p^n (log1p mantém a precisão com p pequeno)
+    log_zero = n * math.log1p(-p)
+    log_n = n * math.log(p)
+    log_pmf = np.where(meio, log_pmf, np.where(kv == 0, log_zero, log_n))
+    return np.where(valido, np.exp(log_pmf), 0.0)
+
+
+def binomial_cdf(k, n: int, p: float) -> np.ndarray:
+    """
+    P(X <= k), pela soma acumulada da PMF só na região com massa relevante (tabela em cache) ou,
+    se essa região passa de _LIMITE_TABELA inteiros, por quadratura (ver _cdf_por_quadratura).
+    """
+    _validar_binomial(n, p)
+    if 0 < p < 1 and _suporte_grande(n * p, math.sqrt(n * p * (1 - p)), n):
+        media, resto = _produto_exato(float(n), p)
+        return _cdf_por_quadratura(k, lambda d: _log_binomial(media + d, n, p, d - resto),
+                                   media, math.sqrt(n * p * (1 - p)))
+    return _cdf_pela_tabela(k, tabela_binomial(n, p))
+
+
+def tabela_binomial(n: int, p: float) -> TabelaAcumulada:
+    """Tabela acumulada da binomial (em cache por n e p); até _LIMITE_TABELA inteiros."""
+    _validar_binomial(n, p)
+
+    def montar():
+        inicio, fim = _suporte_efetivo(n * p, math.sqrt(n * p * (1 - p)), n)
+        return _montar_tabela(lambda ks: binomial_pmf(ks, n, p), inicio, fim)
+
+    return cache_tabelas.obter(("binomial", float(n), float(p)), montar)
+
+
+def _validar_poisson(lam):
+    if not lam > 0:
+        raise ValueError("Na distribuição de Poisson, λ deve ser maior que zero.")
+
+
+def _log_poisson(k, lam: float, diferenca=None) -> np.ndarray:
+    """ln P(X = k) na forma de Loader para k > 0, também com k real (ver _log_binomial)."""
+    k = np.asarray(k, dtype=float)
+    return -_stirlerr(k) - _bd0(k, lam, diferenca) - 0.5 * (_LN_2PI + np.log(k))
+
+
+def poisson_pmf(k, lam: float) -> np.ndarray:
+    """
+    P(X = k) = e^(-λ)·λ^k / k!, na forma de ponto de sela de Loader:
+    exp(-stirlerr(k) - bd0(k, λ)) / √(2πk), e e^(-λ) em k = 0.
+    """
+    _validar_poisson(lam)
+    k = np.asarray(k, dtype=float)
+    valido = _eh_inteiro(k) & (k >= 0)
+    termo = np.exp(_log_poisson(np.where(valido & (k > 0), k, 1), lam))
+    return np.where(valido, np.where(k == 0, math.exp(-lam), termo), 0.0)
+
+
+def poisson_cdf(k, lam: float) -> np.ndarray:
+    """
+    P(X <= k), pela soma acumulada da PMF só na região com massa relevante (tabela em cache) ou,
+    se essa região passa de _LIMITE_TABELA inteiros, por quadratura (ver _cdf_por_quadratura).
+    """
+    _validar_poisson(lam)
+    if _suporte_grande(lam, math.sqrt(lam)):
+        return _cdf_por_quadratura(k, lambda d: _log_poisson(lam + d, lam, d), lam, math.sqrt(lam))
+    return _cdf_pela_tabela(k, tabela_poisson(lam))
+
+
+def tabela_poisson(lam: float) -> TabelaAcumulada:
+    """Tabela acumulada da Poisson (em cache por λ); até _LIMITE_TABELA inteiros."""
+    _validar_poisson(lam)
+
+    def montar():
+        inicio, fim = _suporte_efetivo(lam, math.sqrt(lam), None)
+        return _montar_tabela(lambda ks: poisson_pmf(ks, lam), inicio, fim)
+
+    return cache_tabelas.obter(("poisson", float(lam)), montar)
+
+
+# -------------------------------
+# Interface comum
+# -------------------------------
+# nome -> (densidade/PMF, CDF, é discreta?, média e variância a partir dos parâmetros)
+DISTRIBUICOES = {
+    "uniforme": (uniforme_pdf, uniforme_cdf, False, lambda a, b: ((a + b) / 2, (b - a) ** 2 / 12)),
+    "exponencial": (exponencial_pdf, exponencial_cdf, False, lambda lam: (1 / lam, 1 / lam**2)),
+    "normal": (normal_pdf, normal_cdf, False, lambda mu=0.0, sigma=1.0: (mu, sigma**2)),
+    "binomial": (binomial_pmf, binomial_cdf, True, lambda n, p: (n * p, n * p * (1 - p))),
+    "poisson": (poisson_pmf, poisson_cdf, True, lambda lam: (lam, lam)),
+}
+
+
+def _distribuicao(nome: str):
+    if nome not in DISTRIBUICOES:
+        raise ValueError(f"Distribuição desconhecida: {nome}")
+    return DISTRIBUICOES[nome]
+
+
+@instrumentar()
+def densidade(nome: str, x, **parametros) -> np.ndarray:
+    """f(x) (contínuas) ou P(X = x) (discretas)."""
+    return _distribuicao(nome)[0](x, **parametros)
+
+
+@instrumentar()
+def acumulada(nome: str, x, **parametros) -> np.ndarray:
+    """F(x) = P(X <= x)."""
+    return _distribuicao(nome)[1](x, **parametros)
+
+
+@instrumentar()
+def probabilidade_intervalo(nome: str, x1, x2, **parametros) -> np.ndarray:
+    """
+    P(x1 <= X <= x2) para arrays de limites (x1 e x2 combinam por broadcasting).
+    Discretas: F(⌊x2⌋) - F(⌈x1⌉ - 1). Contínuas: F(x2) - F(x1).
+    """
+    _, cdf, discreta, _ = _distribuicao(nome)
+    x1 = np.asarray(x1, dtype=float)
+    x2 = np.asarray(x2, dtype=float)
+    if discreta:
+        p = cdf(np.floor(x2), **parametros) - cdf(np.ceil(x1) - 1, **parametros)
+    else:
+        p = cdf(x2, **parametros) - cdf(x1, **parametros)
+    return np.where(x2 >= x1, np.clip(p, 0.0, 1.0), 0.0)
+
+
+@instrumentar()
+def quantil(nome: str, q, **parametros) -> np.ndarray:
+    """
+    Inversa da CDF: menor x com P(X <= x) >= q, para q em [0, 1] (aceita arrays).
+    Binomial/Poisson: busca binária na tabela acumulada em cache (bissecção na CDF por quadratura
+    quando o suporte passa de _LIMITE_TABELA inteiros).
+    Normal: busca na grade padronizada em cache, refinada por Newton.
+    Uniforme/exponencial: fórmula fechada (exata e mais rápida que qualquer tabela).
+    """
+    _distribuicao(nome)
+    q = np.asarray(q, dtype=float)
+    if np.any((q < 0) | (q > 1)):
+        raise ValueError("A probabilidade do quantil deve estar entre 0 e 1.")
+    if nome == "binomial":
+        n, p = parametros["n"], parametros["p"]
+        _validar_binomial(n, p)
+        media, desvio = n * p, math.sqrt(n * p * (1 - p))
+        if 0 < p < 1 and _suporte_grande(media, desvio, n):
+            return _quantil_por_bisseccao(q, lambda k: binomial_cdf(k, n, p), *_suporte_efetivo(media, desvio, n))
+        return _quantil_pela_tabela(q, tabela_binomial(n, p))
+    if nome == "poisson":
+        lam = parametros["lam"]
+        _validar_poisson(lam)
+        if _suporte_grande(lam, math.sqrt(lam)):
+            return _quantil_por_bisseccao(q, lambda k: poisson_cdf(k, lam),
+                                          *_suporte_efetivo(lam, math.sqrt(lam), None))
+        return _quantil_pela_tabela(q, tabela_poisson(lam))
+    if nome == "normal":
+        return normal_quantil(q, **parametros)
+    if nome == "uniforme":
+        _validar_uniforme(parametros["a"], parametros["b"])
+        return parametros["a"] + q * (parametros["b"] - parametros["a"])
+    lam = parametros["lam"]
+    _validar_exponencial(lam)
+    with np.errstate(divide="ignore"):
+        return -np.log1p(-q) / lam
+
+
+@instrumentar()
+def media_variancia(nome: str, **parametros):
+    """Média e variância teóricas (E[X], Var[X])."""
+    return _distribuicao(nome)[3](**parametros)
@@ -0,0 +1,223 @@
+# quantis.py
+"""
+Quantis aproximados com memória fixa (esboço KLL), para fluxos de valores brutos
+grandes demais para contar ou ordenar (texto enorme, arquivos enviados, sensores).
+
+O esboço guarda no máximo ~3·k valores, em níveis: um item do nível h representa
+2^h valores originais. Quando o total passa da soma das capacidades, o nível mais
+baixo que estiver cheio é ordenado e metade dos itens (posições pares ou ímpares,
+por sorteio) sobe para o nível seguinte.
+O erro é medido em posto: o quantil q estimado fica entre os quantis exatos
+q - ε e q + ε, com ε ≈ 2,296 / k^0,9723 (ex.: k = 200 -> ε ≈ 1,33%) com ~99% de
+confiança (Karnin, Lang e Liberty, 2016; constantes da implementação do Apache DataSketches).
+"""
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from ferramentas.diagnostico import instrumentar
+
+K_PADRAO = 200
+
+# Fator de redução da capacidade de um nível para o de baixo
+_FATOR = 2 / 3
+
+
+def erro_posto(k: int) -> float:
+    """
+    Erro de posto normalizado (fração de n) garantido com ~99% de confiança para o parâmetro k.
+    """
+    return 2.296 / k ** 0.9723
+
+
+class EsbocoQuantis:
+    """
+    Esboço KLL de quantis. 'k' controla precisão e memória; 'semente' torna
+    o sorteio das compactações reprodutível.
+    Esboços com o mesmo k podem ser mesclados (ex.: um por arquivo ou processo).
+    """
+
+    def __init__(self, k: int = K_PADRAO, semente: Optional[int] = None):
+        if k < 8:
+            raise ValueError("O parâmetro k do esboço deve ser ao menos 8.")
+        self.k = k
+        self.n = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.niveis = [np.empty(0)]
+        self._rng = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel: int) -> int:
+        altura = len(self.niveis) - 1 - nivel
+        return max(2, math.ceil(self.k * _FATOR ** altura))
+
+    def adicionar(self, valores):
+        """
+        Acrescenta um bloco de valores (NaN é ignorado).
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        self.n += valores.size
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        return self
+
+    def adicionar_ponderado(self, valores, pesos):
+        """
+        Acrescenta valores com pesos inteiros (frequências), sem repetir os valores:
+        cada bit h do peso vira um item no nível h, que já representa 2^h valores.
+        Pesos < 1 são ignorados.
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        pesos = np.asarray(pesos, dtype=np.int64).ravel()
+        validos = ~np.isnan(valores) & (pesos > 0)
+        valores, pesos = valores[validos], pesos[validos]
+        if valores.size == 0:
+            return self
+        self.n += int(pesos.sum())
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        for nivel in range(int(pesos.max()).bit_length()):
+            itens = valores[(pesos >> nivel) & 1 == 1]
+            if nivel == len(self.niveis):
+                self.niveis.append(np.empty(0))
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        # Compactação preguiçosa: só age quando o total passa da soma das capacidades,
+        # e então compacta o nível mais baixo que estiver cheio (usa melhor a memória)
+        while True:
+            capacidades = [self._capacidade(h) for h in range(len(self.niveis))]
+            if sum(v.size for v in self.niveis) <= sum(capacidades):
+                return
+            nivel = next(h for h, v in enumerate(self.niveis) if v.size >= capacidades[h])
+            itens = np.sort(self.niveis[nivel])
+            # Nº ímpar: o último item fica no nível; metade dos demais sobe
+            par = itens.size - itens.size % 2
+            self.niveis[nivel] = itens[par:]
+            if nivel + 1 == len(self.niveis):
+                self.niveis.append(np.empty(0))
+            sobem = itens[self._rng.integers(2):par:2]
+            self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], sobem])
+
+    def mesclar(self, outro: "EsbocoQuantis") -> "EsbocoQuantis":
+        """
+        Acrescenta os itens de 'outro' a este esboço (mesmo k). Devolve self.
+        """
+        if outro.k != self.k:
+            raise ValueError("Só é possível mesclar esboços com o mesmo k.")
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._compactar()
+        return self
+
+    def _itens_ponderados(self):
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(v.size, 2.0 ** h) for h, v in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind="stable")
+        return itens[ordem], np.cumsum(pesos[ordem])
+
+    def quantil(self, q):
+        """
+        Quantil(is) aproximado(s) para q em [0, 1] (escalar ou array).
+        q = 0 e q = 1 devolvem o mínimo e o máximo exatos.
+        """
+        if self.n == 0:
+            raise ValueError("O esboço está vazio.")
+        q = np.asarray(q, dtype=float)
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("Os quantis devem estar entre 0 e 1.")
+        itens, acumulado = self._itens_ponderados()
+        # Primeiro item cujo peso acumulado cobre o posto q·(soma dos pesos)
+        pos = np.searchsorted(acumulado, q * acumulado[-1], side="left")
+        resultado = itens[np.minimum(pos, itens.size - 1)]
+        resultado = np.where(q == 0, self.minimo, np.where(q == 1, self.maximo, resultado))
+        return float(resultado) if resultado.ndim == 0 else resultado
+
+    def posto(self, x) -> float:
+        """
+        Fração aproximada dos valores <= x (função de distribuição empírica).
+        """
+        if self.n == 0:
+            raise ValueError("O esboço está vazio.")
+        itens, acumulado = self._itens_ponderados()
+        pos = np.searchsorted(itens, x, side="right")
+        return float(acumulado[pos - 1] / acumulado[-1]) if pos else 0.0
+
+    @property
+    def erro(self) -> float:
+        return erro_posto(self.k)
+
+    @property
+    def itens_guardados(self) -> int:
+        return sum(v.size for v in self.niveis)
+
+
+class DescricaoAproximada(NamedTuple):
+    """
+    Resultado de descrever_aproximado. Média e variância usam todos os valores, sem aproximação
+    de esboço (momentos em float mesclados bloco a bloco, como np.mean/np.var);
+    mediana, quartis e percentis vêm do esboço, com erro de posto 'erro_posto'.
+    """
+    n: int
+    media: float
+    variancia: Optional[float]          # None se n < 2
+    desvio_padrao: Optional[float]
+    coeficiente_variacao: Optional[float]  # None quando a média é zero
+    mediana: float
+    quartis: tuple                      # (Q1, Q2, Q3)
+    percentis: dict                     # {p: valor} para p em 0..100
+    erro_posto: float
+    itens_guardados: int
+
+
+@instrumentar()
+def descrever_aproximado(blocos, k: int = K_PADRAO, percentis=(), semente: Optional[int] = 0) -> DescricaoAproximada:
+    """
+    Percorre os blocos de valores (ex.: iterar_blocos_numeros ou arquivos.iterar_valores)
+    uma única vez, com memória fixa: esboço KLL para os quantis e (n, média, M2)
+    mesclados bloco a bloco (Chan et al.) para média e variância.
+    Valores sem arredondamento; a página arredonda na exibição.
+    """
+    esboco = EsbocoQuantis(k, semente)
+    n, media, m2 = 0, 0.0, 0.0
+    for bloco in blocos:
+        bloco = np.asarray(bloco, dtype=float).ravel()
+        bloco = bloco[~np.isnan(bloco)]
+        if bloco.size == 0:
+            continue
+        esboco.adicionar(bloco)
+        nb, mb = bloco.size, float(bloco.mean())
+        m2b = float(((bloco - mb) ** 2).sum())
+        total = n + nb
+        delta = mb - media
+        media += delta * nb / total
+        m2 += m2b + delta * delta * n * nb / total
+        n = total
+
+    if n == 0:
+        raise ValueError("Nenhum número encontrado.")
+    variancia = m2 / (n - 1) if n > 1 else None
+    desvio = math.sqrt(variancia) if variancia is not None else None
+    cv = 100 * desvio / media if desvio is not None and media != 0 else None
+
+    percentis = tuple(percentis)
+    valores = esboco.quantil(np.array([0.25, 0.5, 0.75] + [p / 100 for p in percentis]))
+    return DescricaoAproximada(
+        n, media, variancia, desvio, cv,
+        float(valores[1]), tuple(float(v) for v in valores[:3]),
+        {p: float(v) for p, v in zip(percentis, valores[3:])},
+        esboco.erro, esboco.itens_guardados,
+    )
@@ -0,0 +1,200 @@
+# regressao.py
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from ferramentas.diagnostico import instrumentar
+
+
+class AjusteRegressao(NamedTuple):
+    """
+    Resultado de um ajuste por mínimos quadrados: y = a + b·x (+ c·x²).
+    """
+    grau: int
+    coeficientes: tuple          # (a, b) ou (a, b, c)
+    n: int
+    r2: float                    # coeficiente de determinação
+    r2_ajustado: float
+    correlacao: Optional[float]  # r de Pearson (apenas no grau 1)
+    sqr: float                   # soma dos quadrados dos resíduos
+    erro_padrao: float           # desvio padrão dos resíduos: sqrt(SQR/(n - grau - 1))
+    # Forma centrada (estável para x de grande magnitude), usada em prever():
+    # y = y_medio + β0 + β1·t + β2·t², com t = (x - x_medio)/escala e x_medio, y_medio
+    # as médias arredondadas (β0 absorve a diferença para as médias exatas)
+    x_medio: float
+    y_medio: float
+    escala: float
+    beta: tuple
+
+    def prever(self, x) -> np.ndarray:
+        t = (np.asarray(x, dtype=float) - self.x_medio) / self.escala
+        return self.y_medio + sum(b * t**k for k, b in enumerate(self.beta))
+
+
+class AcumuladorRegressao:
+    """
+    Estatísticas suficientes para regressão linear e quadrática, atualizadas em blocos
+    (memória constante, qualquer quantidade de pontos).
+
+    Guarda n, um centro (x_centro, y_centro) igual à média arredondada e as somas
+    deslocadas para ele, com u = x - x_centro e v = y - y_centro: Σu¹..Σu⁴, Σv, Σv²,
+    Σu·v e Σu²·v. Cada bloco é deslocado pela própria média e mesclado ao acumulado
+    movendo as somas das duas partes para o centro combinado (atualização par a par de
+    Chan/Pébay), então não há cancelamento catastrófico mesmo quando x tem grande
+    magnitude (anos, timestamps) ou quando os blocos estão em escalas muito diferentes.
+    Σu e Σv não são descartados: o centro em float não é a média exata, e o resíduo
+    entra nas equações normais.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.x_centro = 0.0
+        self.y_centro = 0.0
+        self.su = np.zeros(5)  # su[k] = Σ u^k, k = 0..4 (su[0] = n)
+        self.sv = 0.0
+        self.svv = 0.0
+        self.suv = 0.0
+        self.suuv = 0.0
+        self.x_min = math.inf
+        self.x_max = -math.inf
+
+    def _mover(self, a: float, b: float):
+        # Somas em torno de (x_centro - a, y_centro - b): Σ(u + a)^k pelo binômio, idem v
+        S0, S1, S2, S3, S4 = self.su
+        sv, suv = self.sv, self.suv
+        self.su = np.array([S0, S1 + S0 * a, S2 + 2 * a * S1 + S0 * a * a,
+                            S3 + 3 * a * S2 + 3 * a * a * S1 + S0 * a**3,
+                            S4 + 4 * a * S3 + 6 * a * a * S2 + 4 * a**3 * S1 + S0 * a**4])
+        self.sv = sv + S0 * b
+        self.svv += 2 * b * sv + S0 * b * b
+        self.suv = suv + a * sv + b * S1 + S0 * a * b
+        self.suuv += b * S2 + 2 * a * suv + 2 * a * b * S1 + a * a * sv + S0 * a * a * b
+        self.x_centro -= a
+        self.y_centro -= b
+
+    def mesclar(self, outro: "AcumuladorRegressao") -> "AcumuladorRegressao":
+        """
+        Incorpora as somas de outro acumulador (de outro bloco, arquivo ou processo).
+        """
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update({k: (v.copy() if isinstance(v, np.ndarray) else v)
+                                  for k, v in outro.__dict__.items()})
+            return self
+        n = self.n + outro.n
+        x_centro = self.x_centro + outro.n / n * (outro.x_centro - self.x_centro)
+        y_centro = self.y_centro + outro.n / n * (outro.y_centro - self.y_centro)
+        for parte in (self, outro):
+            parte._mover(parte.x_centro - x_centro, parte.y_centro - y_centro)
+        self.n = n
+        self.su += outro.su
+        self.sv += outro.sv
+        self.svv += outro.svv
+        self.suv += outro.suv
+        self.suuv += outro.suuv
+        self.x_min = min(self.x_min, outro.x_min)
+        self.x_max = max(self.x_max, outro.x_max)
+        return self
+
+    def adicionar(self, x, y):
+        """
+        Acrescenta um bloco de pontos; pares com x ou y vazio (NaN) são ignorados.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.shape != y.shape:
+            raise ValueError("x e y devem ter a mesma quantidade de valores.")
+        validos = np.isfinite(x) & np.isfinite(y)
+        x, y = x[validos], y[validos]
+        if x.size == 0:
+            return self
+
+        bloco = AcumuladorRegressao()
+        bloco.n = x.size
+        bloco.x_centro = float(x.mean())
+        bloco.y_centro = float(y.mean())
+        u = x - bloco.x_centro
+        v = y - bloco.y_centro
+        u2 = u * u
+        bloco.su = np.array([x.size, u.sum(), u2.sum(), (u2 * u).sum(), (u2 * u2).sum()])
+        bloco.sv = float(v.sum())
+        bloco.svv = float((v * v).sum())
+        bloco.suv = float((u * v).sum())
+        bloco.suuv = float((u2 * v).sum())
+        bloco.x_min = float(x.min())
+        bloco.x_max = float(x.max())
+        return self.mesclar(bloco)
+
+    def _momentos_centrais(self):
+        """
+        Converte as somas deslocadas em somas centradas na média de x e de y:
+        Σu², Σu³, Σu⁴, Σu·v, Σu²·v e Σv². O centro já está na média arredondada, então
+        a correção m = Σu/n é da ordem do arredondamento e não há cancelamento.
+        """
+        n = self.n
+        S0, S1, S2, S3, S4 = self.su
+        m = S1 / n
+        my = self.sv / n
+        suu = S2 - n * m * m
+        suuu = S3 - 3 * m * S2 + 2 * n * m**3
+        suuuu = S4 - 4 * m * S3 + 6 * m * m * S2 - 3 * n * m**4
+        suv = self.suv - n * m * my
+        suuv = (self.suuv - 2 * m * self.suv + m * m * self.sv) - my * suu
+        svv = self.svv - n * my * my
+        return max(suu, 0.0), suuu, max(suuuu, 0.0), suv, suuv, max(svv, 0.0)
+
+    @instrumentar("regressao.ajustar")
+    def ajustar(self, grau: int = 1) -> AjusteRegressao:
+        """
+        Ajusta y = a + b·x (grau 1) ou y = a + b·x + c·x² (grau 2).
+        As equações são resolvidas na variável deslocada e escalada t = (x - x_centro)/s,
+        com mínimos quadrados por SVD (np.linalg.lstsq) no sistema 2x2 ou 3x3.
+        """
+        if grau not in (1, 2):
+            raise ValueError("O grau do ajuste deve ser 1 (reta) ou 2 (parábola).")
+        n = self.n
+        if n < grau + 1:
+            raise ValueError(f"São necessários ao menos {grau + 1} pontos para o ajuste de grau {grau}.")
+
+        suu, suuu, suuuu, suv, suuv, svv = self._momentos_centrais()
+        if suu == 0:
+            raise ValueError("Todos os valores de x são iguais: não é possível ajustar a curva.")
+
+        x_medio, y_medio = self.x_centro, self.y_centro
+        s = math.sqrt(suu / n)
+
+        # Somas em t = u/s (Σt ≈ 0, Σt² ≈ n) e em v
+        st = self.su / s ** np.arange(5)
+        G = np.array([st[:3], st[1:4], st[2:5]])[:grau + 1, :grau + 1]
+        h = np.array([self.sv, self.suv / s, self.suuv / s**2])[:grau + 1]
+        beta = tuple(float(b) for b in np.linalg.lstsq(G, h, rcond=None)[0])
+
+        sqr = max(self.svv - float(np.dot(beta, h)), 0.0)
+        r2 = 1 - sqr / svv if svv > 0 else 1.0
+        gl = n - grau - 1
+        r2_ajustado = 1 - (1 - r2) * (n - 1) / gl if gl > 0 else float("nan")
+        erro_padrao = math.sqrt(sqr / gl) if gl > 0 else float("nan")
+        correlacao = suv / math.sqrt(suu * svv) if grau == 1 and svv > 0 else None
+
+        # Coeficientes na variável original x
+        if grau == 1:
+            b = beta[1] / s
+            coeficientes = (y_medio + beta[0] - b * x_medio, b)
+        else:
+            c = beta[2] / s**2
+            b = beta[1] / s - 2 * c * x_medio
+            a = y_medio + beta[0] - beta[1] * x_medio / s + c * x_medio**2
+            coeficientes = (a, b, c)
+
+        return AjusteRegressao(grau, tuple(float(c) for c in coeficientes), n, float(r2), float(r2_ajustado),
+                               None if correlacao is None else float(correlacao), float(sqr), erro_padrao,
+                               float(x_medio), float(y_medio), s, beta)
+
+
+def ajustar_regressao(x, y, grau: int = 1) -> AjusteRegressao:
+    """
+    Atalho para um único bloco de pontos.
+    """
+    return AcumuladorRegressao().adicionar(x, y).ajustar(grau)
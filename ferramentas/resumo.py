@@ -0,0 +1,218 @@
+# resumo.py
+"""
+Resumos de dados discretos que podem ser calculados por partes e mesclados.
+
+Cada parte (arquivo, lote, processo ou máquina) gera um ResumoDiscreto; os resumos
+são combinados com mesclar(), em qualquer ordem e agrupamento (operação associativa
+e comutativa), e o resultado é o de media_ponderada_df / variancia_df / mediana_df /
+moda_df no modo numérico "exato" sobre todos os dados concatenados.
+
+Conteúdo do resumo (todas as somas são racionais exatos, inclusive os produtos, então
+mesclar é só somar e o resultado não depende de como os dados foram divididos):
+- Σfi e Σxi·fi das linhas como digitadas (fi sem truncar, como media_ponderada_df);
+- n = Σc, Σc·xi e Σc·xi², com c = fi truncado para inteiro, para a variância;
+- contagem por valor distinto, para mediana e moda exatas (mesclar soma as contagens).
+
+A memória é limitada: acima de LIMITE_VALORES valores distintos, as contagens passam
+para um esboço KLL ponderado (quantis.EsbocoQuantis), de onde sai a mediana com erro
+de posto erro_posto(K_PADRAO), e o dicionário vira um resumo de Misra-Gries com no
+máximo LIMITE_VALORES contadores, de onde sai a moda (Agarwal et al., 2012: mesclar
+soma os contadores e desconta de todos o (LIMITE_VALORES + 1)-ésimo maior). Cada
+contagem fica subestimada em no máximo 'descontado'. Média e variância continuam exatas.
+
+Média e variância são calculadas só no fim, a partir das somas, e arredondadas uma
+única vez (precisao.variancia_exata, a mesma fórmula do modo exato de variancia_df).
+"""
+import copy
+import math
+from fractions import Fraction
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from ferramentas.precisao import somas_exatas, variancia_exata
+from ferramentas.funcoes import (
+    DEPENDENCIAS_DISCRETO, DescricaoDiscreta, arredondar, planejar_medidas,
+    _mediana_ponderada, _moda_ponderada
+)
+from ferramentas.quantis import K_PADRAO, EsbocoQuantis
+
+# Valores distintos guardados com contagem exata antes de passar ao esboço
+LIMITE_VALORES = 10_000
+
+
+def _reduzir(contagens: dict):
+    """
+    Mantém no máximo LIMITE_VALORES contadores (Misra-Gries): desconta de todos o
+    (LIMITE_VALORES + 1)-ésimo maior e remove os que zeram. Devolve (contagens, desconto).
+    """
+    if len(contagens) <= LIMITE_VALORES:
+        return contagens, 0
+    valores = np.fromiter(contagens.values(), dtype=np.int64, count=len(contagens))
+    desconto = int(np.partition(valores, -(LIMITE_VALORES + 1))[-(LIMITE_VALORES + 1)])
+    return {v: c - desconto for v, c in contagens.items() if c > desconto}, desconto
+
+
+class ResumoDiscreto:
+    """
+    Resumo mesclável de uma tabela (xi, fi). ResumoDiscreto() vazio é o elemento neutro.
+    """
+    __slots__ = ("soma_f", "soma_xf", "n", "soma_cx", "soma_cx2", "contagens", "esboco", "descontado")
+
+    def __init__(self):
+        self.soma_f = Fraction(0)    # Σfi (fi como digitado)
+        self.soma_xf = Fraction(0)   # Σxi·fi
+        self.n = 0                   # Σc, c = fi truncado
+        self.soma_cx = Fraction(0)   # Σc·xi
+        self.soma_cx2 = Fraction(0)  # Σc·xi²
+        self.contagens = {}          # valor -> contagem inteira (Misra-Gries se aproximado)
+        self.esboco = None           # EsbocoQuantis ponderado, acima de LIMITE_VALORES
+        self.descontado = 0          # subestimação máxima de cada contagem
+
+    @classmethod
+    def de_tabela(cls, df: pd.DataFrame) -> "ResumoDiscreto":
+        """
+        Resume uma parte dos dados. Linhas vazias são ignoradas; uma parte sem linhas
+        válidas gera o resumo vazio (a validação de "frequências > 0" é feita no total).
+        """
+        df = df[["xi", "fi"]].dropna()
+        xi = df["xi"].to_numpy(dtype=float)
+        fi = df["fi"].to_numpy(dtype=float)
+        if (fi < 0).any():
+            raise ValueError("As frequências (fi) não podem ser negativas.")
+
+        r = cls()
+        r.soma_f, r.soma_xf, _ = somas_exatas(xi, fi)
+
+        c = fi.astype(np.int64)
+        positivos = c > 0
+        if positivos.any():
+            contagem = pd.Series(c[positivos]).groupby(xi[positivos]).sum()
+            valores, contagens = contagem.index.to_numpy(dtype=float), contagem.to_numpy()
+            r.n = int(contagens.sum())
+            _, r.soma_cx, r.soma_cx2 = somas_exatas(valores, contagens)
+            r.contagens = dict(zip(valores.tolist(), contagens.tolist()))
+            if len(r.contagens) > LIMITE_VALORES:
+                r.esboco = EsbocoQuantis(K_PADRAO, semente=0).adicionar_ponderado(valores, contagens)
+                r.contagens, r.descontado = _reduzir(r.contagens)
+        return r
+
+    @property
+    def aproximado(self) -> bool:
+        """
+        True quando mediana e moda vêm do esboço e dos contadores de Misra-Gries.
+        """
+        return self.esboco is not None
+
+    def _esboco(self) -> EsbocoQuantis:
+        # Cópia: mesclar não altera os originais
+        if self.esboco is not None:
+            return copy.deepcopy(self.esboco)
+        esboco = EsbocoQuantis(K_PADRAO, semente=0)
+        if self.contagens:
+            esboco.adicionar_ponderado(np.fromiter(self.contagens.keys(), dtype=float, count=len(self.contagens)),
+                                       np.fromiter(self.contagens.values(), dtype=np.int64,
+                                                   count=len(self.contagens)))
+        return esboco
+
+    @classmethod
+    def de_valores(cls, valores) -> "ResumoDiscreto":
+        """
+        Resume valores brutos (cada valor com frequência 1).
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        return cls.de_tabela(pd.DataFrame({"xi": valores, "fi": np.ones(valores.size)}))
+
+    def mesclar(self, outro: "ResumoDiscreto") -> "ResumoDiscreto":
+        """
+        Combina dois resumos somando as somas exatas e as contagens. Não altera os originais.
+        Passando de LIMITE_VALORES valores distintos, o resultado fica aproximado.
+        """
+        r = ResumoDiscreto()
+        r.soma_f = self.soma_f + outro.soma_f
+        r.soma_xf = self.soma_xf + outro.soma_xf
+        r.n = self.n + outro.n
+        r.soma_cx = self.soma_cx + outro.soma_cx
+        r.soma_cx2 = self.soma_cx2 + outro.soma_cx2
+
+        maior, menor = (self.contagens, outro.contagens)
+        if len(menor) > len(maior):
+            maior, menor = menor, maior
+        r.contagens = dict(maior)
+        for valor, c in menor.items():
+            r.contagens[valor] = r.contagens.get(valor, 0) + c
+        if self.aproximado or outro.aproximado or len(r.contagens) > LIMITE_VALORES:
+            r.esboco = self._esboco().mesclar(outro._esboco())
+            r.contagens, desconto = _reduzir(r.contagens)
+            r.descontado = self.descontado + outro.descontado + desconto
+        return r
+
+    __add__ = mesclar
+
+    def _validar(self):
+        if self.soma_f == 0:
+            raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
+
+    def _arrays(self):
+        self._validar()
+        if not self.contagens:
+            raise ValueError("Inclua ao menos uma linha válida e frequências > 0.")
+        return (np.fromiter(self.contagens.keys(), dtype=float, count=len(self.contagens)),
+                np.fromiter(self.contagens.values(), dtype=np.int64, count=len(self.contagens)))
+
+    def media(self) -> float:
+        self._validar()
+        return float(self.soma_xf / self.soma_f)
+
+    def variancia(self) -> float:
+        self._validar()
+        if self.n < 2:
+            raise ValueError("A amostra precisa ter mais de um elemento para calcular a variância.")
+        return variancia_exata(Fraction(self.n), self.soma_cx, self.soma_cx2)
+
+    def mediana(self) -> float:
+        if self.aproximado:
+            self._validar()
+            return self.esboco.quantil(0.5)
+        return _mediana_ponderada(*self._arrays())
+
+    def moda(self):
+        return _moda_ponderada(*self._arrays())
+
+    def descrever(self, medidas=None, casas: int = 2) -> DescricaoDiscreta:
+        """
+        Mesmas medidas e arredondamento de descrever_discreto, a partir do resumo
+        (mediana e moda aproximadas quando 'aproximado').
+        """
+        plano = planejar_medidas(DEPENDENCIAS_DISCRETO if medidas is None else medidas, DEPENDENCIAS_DISCRETO)
+        self._validar()
+        r = {}
+        for medida in plano:
+            if medida == "media":
+                r["media"] = arredondar(self.media(), casas)
+            elif medida == "mediana":
+                r["mediana"] = arredondar(self.mediana(), casas)
+            elif medida == "moda":
+                modas, r["tipo_moda"] = self.moda()
+                r["modas"] = tuple(sorted(modas))
+            elif medida == "variancia":
+                r["variancia"] = arredondar(self.variancia(), casas)
+            elif medida == "desvio_padrao":
+                r["desvio_padrao"] = arredondar(math.sqrt(r["variancia"]), casas)
+            elif medida == "coeficiente_variacao":
+                if r["media"] != 0:
+                    r["coeficiente_variacao"] = arredondar((100 * r["desvio_padrao"]) / r["media"], casas)
+        return DescricaoDiscreta(**r)
+
+    def __repr__(self):
+        media = f"{float(self.soma_cx / self.n):.6g}" if self.n else None
+        return (f"ResumoDiscreto(n={self.n}, media={media}, contadores={len(self.contagens)}, "
+                f"aproximado={self.aproximado})")
+
+
+def mesclar_resumos(resumos) -> ResumoDiscreto:
+    """
+    Mescla uma sequência de resumos (vazia -> resumo vazio).
+    """
+    return reduce(ResumoDiscreto.mesclar, resumos, ResumoDiscreto())
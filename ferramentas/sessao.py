@@ -0,0 +1,318 @@
+# sessao.py
+"""
+Armazenamento enxuto das tabelas que as páginas guardam na sessão (para sobreviver
+à troca de página).
+
+- TabelaCompacta: cada coluna vira um array numérico (float64, ou int64 quando a coluna
+  já é inteira) somente leitura, em vez de um DataFrame de objetos. Os arrays são da tabela
+  (copiados quando seriam views do DataFrame recebido). A tabela devolvida
+  por para_df() aponta para esses arrays sem copiar; quem precisar alterar faz .copy()
+  (cópia na escrita). Texto não numérico vira NaN, como no pd.to_numeric das páginas.
+- ArmazemSessao: as tabelas de uma sessão, com orçamento de memória. Guardar a mesma
+  tabela de novo (rerun sem edição) só compara com a guardada, direto nas colunas do
+  DataFrame (float64/int64 sem cópia; texto é convertido para comparar), e não copia
+  nada. Passando do orçamento, as tabelas
+  usadas há mais tempo vão para o disco (um .npy por coluna, lido de volta por memmap)
+  ou, com disco=False, são descartadas. Objetos derivados das tabelas (os agregados de
+  ferramentas.incremental) também contam no orçamento; esses não vão para o disco: são
+  descartados e recriados vazios, reconstruindo-se da tabela no próximo cálculo.
+- uso() mostra o que a sessão ocupa; uso_sessoes() resume todas as sessões do processo.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Orçamento padrão por sessão (MiB), ajustável pela variável STATAPP_SESSAO_MB
+ORCAMENTO_PADRAO = int(float(os.environ.get("STATAPP_SESSAO_MB", 32)) * 2**20)
+
+_armazens = weakref.WeakSet()
+_trava_armazens = threading.Lock()
+
+
+def _coluna(serie: pd.Series) -> np.ndarray:
+    if pd.api.types.is_integer_dtype(serie.dtype) and not pd.api.types.is_extension_array_dtype(serie.dtype):
+        return serie.to_numpy(dtype=np.int64)
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _somente_leitura(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+def _arrays_iguais(a: np.ndarray, b: np.ndarray) -> bool:
+    if a.dtype != b.dtype:
+        return False
+    if a.dtype.kind == "f":
+        return bool(((a == b) | (np.isnan(a) & np.isnan(b))).all())
+    return np.array_equal(a, b)
+
+
+def _propria(a: np.ndarray, origem) -> np.ndarray:
+    # to_numpy devolve uma view quando o dtype já confere: copia, senão alterar o DataFrame
+    # de origem mudaria a tabela guardada (e travaria a escrita no array dele)
+    return a.copy() if np.shares_memory(a, np.asarray(origem)) else a
+
+
+class TabelaCompacta:
+    """
+    Tabela numérica guardada coluna a coluna em arrays somente leitura.
+    O índice é mantido (RangeIndex não ocupa memória; os agregados usam os rótulos das linhas).
+    """
+    __slots__ = ("colunas", "arrays", "indice", "pasta")
+
+    def __init__(self, colunas, arrays, indice, pasta=None):
+        self.colunas = list(colunas)
+        self.arrays = arrays
+        self.indice = indice
+        self.pasta = pasta  # diretório dos .npy quando a tabela está no disco
+
+    @classmethod
+    def de_df(cls, df: pd.DataFrame) -> "TabelaCompacta":
+        arrays = [_somente_leitura(_propria(_coluna(df[c]), df[c])) for c in df.columns]
+        indice = df.index
+        if not isinstance(indice, pd.RangeIndex):
+            if pd.api.types.is_integer_dtype(indice.dtype):
+                indice = pd.Index(_somente_leitura(_propria(indice.to_numpy(dtype=np.int64), indice)), copy=False)
+            else:
+                indice = indice.copy()
+        return cls(df.columns, arrays, indice)
+
+    def para_df(self) -> pd.DataFrame:
+        """
+        DataFrame sobre os arrays guardados, sem cópia (somente leitura).
+        """
+        return pd.DataFrame(dict(zip(self.colunas, self.arrays)), index=self.indice, copy=False)
+
+    def igual(self, outra: "TabelaCompacta") -> bool:
+        if self.colunas != outra.colunas or not self.indice.equals(outra.indice):
+            return False
+        return all(_arrays_iguais(a, b) for a, b in zip(self.arrays, outra.arrays))
+
+    def igual_df(self, df: pd.DataFrame) -> bool:
+        """
+        Mesmo conteúdo que de_df(df) guardaria, sem montar outra tabela: colunas já
+        float64/int64 são comparadas pelas views do DataFrame, sem cópia.
+        """
+        if self.colunas != list(df.columns) or not self.indice.equals(df.index):
+            return False
+        return all(_arrays_iguais(a, _coluna(df[c])) for a, c in zip(self.arrays, df.columns))
+
+    @property
+    def linhas(self) -> int:
+        return len(self.indice)
+
+    @property
+    def nbytes(self) -> int:
+        indice = 0 if isinstance(self.indice, pd.RangeIndex) else self.indice.nbytes
+        return sum(a.nbytes for a in self.arrays) + indice
+
+    @property
+    def em_disco(self) -> bool:
+        return self.pasta is not None
+
+    def despejar(self, pasta: str):
+        """
+        Grava as colunas em 'pasta' e passa a lê-las por memmap (libera a memória dos arrays).
+        Índices não numéricos continuam em memória.
+        """
+        os.makedirs(pasta, exist_ok=True)
+        arrays = []
+        for i, a in enumerate(self.arrays):
+            caminho = os.path.join(pasta, f"{i}.npy")
+            np.save(caminho, a, allow_pickle=False)
+            arrays.append(np.load(caminho, mmap_mode="r"))
+        if not isinstance(self.indice, pd.RangeIndex) and self.indice.dtype == np.int64:
+            caminho = os.path.join(pasta, "indice.npy")
+            np.save(caminho, self.indice.to_numpy(), allow_pickle=False)
+            self.indice = pd.Index(np.load(caminho, mmap_mode="r"), copy=False)
+        self.arrays = arrays
+        self.pasta = pasta
+
+    def apagar(self):
+        if self.pasta is not None:
+            self.arrays = []
+            shutil.rmtree(self.pasta, ignore_errors=True)
+            self.pasta = None
+
+
+class ArmazemSessao:
+    """
+    Tabelas de uma sessão, por nome, com orçamento de memória (bytes), e os agregados
+    derivados delas (ver agregado()). A tabela e o agregado mais recentes sempre ficam em
+    memória, mesmo que sozinhos passem do orçamento.
+    """
+
+    def __init__(self, orcamento: int = ORCAMENTO_PADRAO, disco: bool = True):
+        self.orcamento = orcamento
+        self.disco = disco
+        self.identificador = uuid.uuid4().hex[:8]
+        self.despejos = 0
+        self.descartes = 0
+        self._tabelas = OrderedDict()
+        self._agregados = OrderedDict()
+        self._versoes = {}
+        self._ultima_versao = 0
+        self._pasta = None
+        with _trava_armazens:
+            _armazens.add(self)
+
+    def _pasta_sessao(self) -> str:
+        if self._pasta is None:
+            self._pasta = tempfile.mkdtemp(prefix=f"statapp_sessao_{self.identificador}_")
+            # Apaga os arquivos quando a sessão (e o armazém) deixar de existir
+            weakref.finalize(self, shutil.rmtree, self._pasta, True)
+        return self._pasta
+
+    def guardar(self, nome: str, df: pd.DataFrame) -> bool:
+        """
+        Guarda 'df' como 'nome'. Devolve False (e não copia nada) se o conteúdo não mudou:
+        a comparação é feita antes de converter (ver TabelaCompacta.igual_df).
+        """
+        antiga = self._tabelas.get(nome)
+        if antiga is not None and antiga.igual_df(df):
+            self._tabelas.move_to_end(nome)
+            return False
+        nova = TabelaCompacta.de_df(df)
+        if antiga is not None:
+            antiga.apagar()
+        self._tabelas[nome] = nova
+        self._tabelas.move_to_end(nome)
+        self._ultima_versao += 1
+        self._versoes[nome] = self._ultima_versao
+        self._respeitar_orcamento()
+        return True
+
+    def versao(self, nome: str):
+        """
+        Número que muda a cada vez que o conteúdo de 'nome' muda (None se não existir).
+        Serve para saber se um agregado ainda corresponde à tabela guardada.
+        """
+        return self._versoes.get(nome) if nome in self._tabelas else None
+
+    def obter(self, nome: str, padrao=None):
+        """
+        DataFrame somente leitura de 'nome' (ou 'padrao' se não existir ou foi descartado).
+        Tabelas no disco são lidas por memmap, sem voltar para o orçamento de memória.
+        """
+        tabela = self._tabelas.get(nome)
+        if tabela is None:
+            return padrao
+        self._tabelas.move_to_end(nome)
+        return tabela.para_df()
+
+    def agregado(self, nome: str, criar):
+        """
+        Objeto derivado das tabelas guardado como 'nome' (ex.: AgregadoDiscreto), criado com
+        criar() na primeira chamada ou depois de descartado. Entra no orçamento pelo atributo
+        nbytes, medido a cada guardar() ou agregado(), então o crescimento de uma atualização
+        conta a partir da chamada seguinte.
+        """
+        objeto = self._agregados.get(nome)
+        if objeto is None:
+            objeto = self._agregados[nome] = criar()
+        self._agregados.move_to_end(nome)
+        self._respeitar_orcamento()
+        return objeto
+
+    def __contains__(self, nome) -> bool:
+        return nome in self._tabelas
+
+    def remover(self, nome: str):
+        self._versoes.pop(nome, None)
+        tabela = self._tabelas.pop(nome, None)
+        if tabela is not None:
+            tabela.apagar()
+        self._agregados.pop(nome, None)
+
+    @property
+    def bytes_memoria(self) -> int:
+        return (sum(t.nbytes for t in self._tabelas.values() if not t.em_disco)
+                + sum(a.nbytes for a in self._agregados.values()))
+
+    @property
+    def bytes_disco(self) -> int:
+        return sum(t.nbytes for t in self._tabelas.values() if t.em_disco)
+
+    def _respeitar_orcamento(self):
+        em_memoria = [nome for nome, t in self._tabelas.items() if not t.em_disco]
+        # A mais recente (última) nunca sai
+        for nome in em_memoria[:-1]:
+            if self.bytes_memoria <= self.orcamento:
+                break
+            tabela = self._tabelas[nome]
+            if self.disco:
+                try:
+                    tabela.despejar(os.path.join(self._pasta_sessao(), uuid.uuid4().hex[:8]))
+                    self.despejos += 1
+                    continue
+                except OSError:
+                    pass  # sem espaço ou sem permissão: descarta
+            del self._tabelas[nome]
+            self._versoes.pop(nome, None)
+            self.descartes += 1
+        # Agregados não vão para o disco: os usados há mais tempo (menos o mais recente) são descartados
+        for nome in list(self._agregados)[:-1]:
+            if self.bytes_memoria <= self.orcamento:
+                break
+            del self._agregados[nome]
+            self.descartes += 1
+
+    def uso(self) -> pd.DataFrame:
+        """
+        Uma linha por tabela guardada (da usada há mais tempo para a mais recente), depois os agregados.
+        """
+        linhas = [{
+            "Tabela": nome,
+            "Linhas": t.linhas,
+            "Colunas": len(t.colunas),
+            "Tamanho (KiB)": round(t.nbytes / 1024, 1),
+            "Local": "disco" if t.em_disco else "memória",
+        } for nome, t in self._tabelas.items()] + [{
+            "Tabela": nome,
+            "Linhas": a.linhas,
+            "Colunas": len(a.colunas),
+            "Tamanho (KiB)": round(a.nbytes / 1024, 1),
+            "Local": "memória (agregado)",
+        } for nome, a in self._agregados.items()]
+        return pd.DataFrame(linhas, columns=["Tabela", "Linhas", "Colunas", "Tamanho (KiB)", "Local"])
+
+    def resumo(self) -> dict:
+        return {
+            "sessao": self.identificador,
+            "tabelas": len(self._tabelas),
+            "agregados": len(self._agregados),
+            "memoria_kib": round(self.bytes_memoria / 1024, 1),
+            "disco_kib": round(self.bytes_disco / 1024, 1),
+            "orcamento_kib": round(self.orcamento / 1024, 1),
+            "despejos": self.despejos,
+            "descartes": self.descartes,
+        }
+
+
+def armazem_da_sessao(estado, chave: str = "armazem_dados") -> ArmazemSessao:
+    """
+    Armazém guardado no estado da sessão (ex.: st.session_state), criado na primeira chamada.
+    """
+    if chave not in estado:
+        estado[chave] = ArmazemSessao()
+    return estado[chave]
+
+
+def uso_sessoes() -> pd.DataFrame:
+    """
+    Resumo de todas as sessões vivas do processo (uma linha por sessão).
+    """
+    with _trava_armazens:
+        resumos = [a.resumo() for a in list(_armazens)]
+    nomes = {"sessao": "Sessão", "tabelas": "Tabelas", "agregados": "Agregados", "memoria_kib": "Memória (KiB)", "disco_kib": "Disco (KiB)",
+             "orcamento_kib": "Orçamento (KiB)", "despejos": "Despejos", "descartes": "Descartes"}
+    tabela = pd.DataFrame(resumos, columns=list(nomes)).sort_values("memoria_kib", ascending=False, ignore_index=True)
+    return tabela.rename(columns=nomes)
@@ -0,0 +1,193 @@
+# simulacao.py
+"""
+Simulação de Monte Carlo das distribuições de ferramentas.probabilidade, para conferir
+os valores analíticos empiricamente.
+
+- As amostras são sorteadas em lotes de TAMANHO_LOTE valores (NumPy, Generator PCG64)
+  e cada lote é reduzido na hora a um ResumoSimulacao: n, média, M2 (Welford/Chan) e a
+  contagem de amostras em cada intervalo pedido. A memória não depende do nº de amostras.
+- O total é dividido em partes de TAMANHO_PARTE amostras; a parte i usa o fluxo
+  aleatório SeedSequence(semente, spawn_key=(i,)), o mesmo que SeedSequence(semente).spawn()
+  daria ao i-ésimo filho. Os fluxos são independentes e o resultado depende só da
+  semente e de n, não de quantos processos participaram.
+- simular() gera a estimativa acumulada depois de cada parte (estimativas parciais
+  para mostrar enquanto a simulação avança); com processos=True as partes rodam no
+  pool de tarefas.mapear.
+- comparar() põe lado a lado simulado, analítico e o erro padrão da estimativa.
+"""
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from ferramentas import probabilidade
+from ferramentas.diagnostico import instrumentar
+from ferramentas.tarefas import mapear
+
+SEMENTE_PADRAO = 20240601
+
+# Amostras sorteadas por vez (~8 MiB em float64) e por parte (unidade de paralelismo)
+TAMANHO_LOTE = 1 << 20
+TAMANHO_PARTE = 1 << 22
+
+
+def _sortear(gerador: np.random.Generator, nome: str, parametros: dict, n: int) -> np.ndarray:
+    if nome == "uniforme":
+        return gerador.uniform(parametros["a"], parametros["b"], n)
+    if nome == "exponencial":
+        return gerador.exponential(1 / parametros["lam"], n)
+    if nome == "normal":
+        return gerador.normal(parametros.get("mu", 0.0), parametros.get("sigma", 1.0), n)
+    if nome == "binomial":
+        return gerador.binomial(int(parametros["n"]), parametros["p"], n).astype(np.float64)
+    if nome == "poisson":
+        return gerador.poisson(parametros["lam"], n).astype(np.float64)
+    raise ValueError(f"Distribuição desconhecida: {nome}")
+
+
+class ResumoSimulacao:
+    """
+    Estatísticas de uma amostra, mescláveis em qualquer ordem (mesclar()).
+    'contagens[i]' é o nº de amostras em [x1, x2] do i-ésimo intervalo.
+    """
+    __slots__ = ("n", "media", "m2", "contagens")
+
+    def __init__(self, n: int = 0, media: float = 0.0, m2: float = 0.0, contagens=()):
+        self.n = n
+        self.media = media
+        self.m2 = m2
+        self.contagens = tuple(contagens)
+
+    @classmethod
+    def de_amostra(cls, x: np.ndarray, intervalos) -> "ResumoSimulacao":
+        if len(x) == 0:
+            return cls(contagens=[0] * len(intervalos))
+        media = float(x.mean())
+        desvios = x - media
+        m2 = float(np.dot(desvios, desvios))
+        contagens = [int(np.count_nonzero((x >= x1) & (x <= x2))) for x1, x2 in intervalos]
+        return cls(len(x), media, m2, contagens)
+
+    def mesclar(self, outro: "ResumoSimulacao") -> "ResumoSimulacao":
+        """
+        Resumo das duas amostras juntas (fórmula de Chan para média e M2).
+        """
+        if self.n == 0:
+            return outro
+        if outro.n == 0:
+            return self
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        media = self.media + delta * outro.n / n
+        m2 = self.m2 + outro.m2 + delta * delta * self.n * outro.n / n
+        return ResumoSimulacao(n, media, m2, [a + b for a, b in zip(self.contagens, outro.contagens)])
+
+    @property
+    def variancia(self) -> Optional[float]:
+        """Variância amostral (divisor n - 1); None com menos de 2 amostras."""
+        return self.m2 / (self.n - 1) if self.n > 1 else None
+
+    @property
+    def proporcoes(self) -> tuple:
+        return tuple(c / self.n for c in self.contagens) if self.n else ()
+
+    def __repr__(self):
+        return f"ResumoSimulacao(n={self.n}, media={self.media:.6g}, variancia={self.variancia})"
+
+
+def _simular_parte(parte, nome: str, parametros: dict, intervalos, semente: int) -> ResumoSimulacao:
+    """
+    Sorteia a parte (índice, tamanho) em lotes e devolve o resumo (executado também
+    em outros processos: precisa ser de nível de módulo).
+    """
+    indice, tamanho = parte
+    gerador = np.random.Generator(np.random.PCG64(np.random.SeedSequence(semente, spawn_key=(indice,))))
+    resumo = ResumoSimulacao(contagens=[0] * len(intervalos))
+    for inicio in range(0, tamanho, TAMANHO_LOTE):
+        lote = _sortear(gerador, nome, parametros, min(TAMANHO_LOTE, tamanho - inicio))
+        resumo = resumo.mesclar(ResumoSimulacao.de_amostra(lote, intervalos))
+    return resumo
+
+
+def _partes(n: int):
+    for indice, inicio in enumerate(range(0, n, TAMANHO_PARTE)):
+        yield indice, min(TAMANHO_PARTE, n - inicio)
+
+
+def simular(nome: str, parametros: dict, n: int, intervalos=(), semente: int = SEMENTE_PADRAO,
+            processos: bool = False, progresso=None):
+    """
+    Gera o ResumoSimulacao acumulado depois de cada parte de TAMANHO_PARTE amostras
+    (o último é o de todas as n). 'intervalos' são pares (x1, x2), contados como
+    x1 <= X <= x2 (use -inf/inf para caudas). Com processos=True e mais de uma parte,
+    as partes são sorteadas no pool de processos. 'progresso(feito, total)' recebe o
+    nº de amostras já resumidas.
+    """
+    if not (isinstance(n, (int, np.integer)) and n > 0):
+        raise ValueError("O número de amostras deve ser um inteiro positivo.")
+    probabilidade.densidade(nome, 0.0, **parametros)  # valida a distribuição e os parâmetros
+    intervalos = [(float(x1), float(x2)) for x1, x2 in intervalos]
+
+    if processos and n > TAMANHO_PARTE:
+        resumos = mapear(_simular_parte, _partes(n), nome, parametros, intervalos, semente)
+    else:
+        resumos = (_simular_parte(parte, nome, parametros, intervalos, semente) for parte in _partes(n))
+
+    acumulado = ResumoSimulacao(contagens=[0] * len(intervalos))
+    for resumo in resumos:
+        acumulado = acumulado.mesclar(resumo)
+        if progresso is not None:
+            progresso(acumulado.n, n)
+        yield acumulado
+
+
+@instrumentar()
+def simular_tudo(nome: str, parametros: dict, n: int, intervalos=(), semente: int = SEMENTE_PADRAO,
+                 processos: bool = False, progresso=None) -> ResumoSimulacao:
+    """
+    Resumo final de simular() (sem as estimativas parciais).
+    """
+    resumo = None
+    for resumo in simular(nome, parametros, n, intervalos, semente, processos, progresso):
+        pass
+    return resumo
+
+
+class Comparacao(NamedTuple):
+    """
+    Uma linha de comparar(): valor simulado, analítico e erro padrão da estimativa
+    (None quando não há fórmula simples, como na variância).
+    """
+    medida: str
+    simulado: float
+    analitico: float
+    erro_padrao: Optional[float]
+
+    @property
+    def desvios(self) -> Optional[float]:
+        """Diferença em erros padrão (|z| > 3 é improvável se a simulação e a fórmula concordam)."""
+        if not self.erro_padrao:
+            return None
+        return (self.simulado - self.analitico) / self.erro_padrao
+
+
+def _probabilidade_analitica(nome: str, parametros: dict, x1: float, x2: float) -> float:
+    if x1 == -math.inf:
+        return float(probabilidade.acumulada(nome, x2, **parametros))
+    return float(probabilidade.probabilidade_intervalo(nome, x1, x2, **parametros))
+
+
+def comparar(nome: str, parametros: dict, resumo: ResumoSimulacao, intervalos=()) -> list:
+    """
+    Lista de Comparacao: uma por intervalo (P(x1 ≤ X ≤ x2)), média e variância.
+    """
+    linhas = []
+    for (x1, x2), p in zip(intervalos, resumo.proporcoes):
+        analitico = _probabilidade_analitica(nome, parametros, x1, x2)
+        rotulo = f"P(X ≤ {x2:g})" if x1 == -math.inf else f"P({x1:g} ≤ X ≤ {x2:g})"
+        linhas.append(Comparacao(rotulo, p, analitico, math.sqrt(analitico * (1 - analitico) / resumo.n)))
+    media, variancia = probabilidade.media_variancia(nome, **parametros)
+    linhas.append(Comparacao("Média", resumo.media, media, math.sqrt(variancia / resumo.n)))
+    if resumo.variancia is not None:
+        linhas.append(Comparacao("Variância", resumo.variancia, variancia, None))
+    return linhas
@@ -0,0 +1,146 @@
+# tarefas.py
+"""
+Cálculos longos fora da thread do script do Streamlit, com progresso e cancelamento.
+
+- submeter(estado, chave, funcao, ...) roda funcao(*args, progresso=..., **kwargs) em um
+  pool de threads e guarda a Tarefa em estado[chave] (ex.: st.session_state). Um novo
+  envio com a mesma chave cancela a tarefa anterior e não espera por ela.
+- A função informa o avanço chamando progresso(feito, total) a cada bloco concluído;
+  é nessa chamada que o cancelamento é verificado (levanta Cancelada).
+- Threads servem quando o trabalho pesado libera o GIL (NumPy, leitor de CSV do pandas,
+  ordenação). Para trabalho que segura o GIL (ex.: regex sobre texto), a tarefa usa
+  mapear(), que distribui os blocos entre processos.
+
+Tamanho dos pools: STATAPP_TAREFAS_THREADS e STATAPP_TAREFAS_PROCESSOS (padrão: até 4).
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_TRABALHADORES = min(4, os.cpu_count() or 1)
+_N_THREADS = int(os.environ.get("STATAPP_TAREFAS_THREADS", _TRABALHADORES))
+_N_PROCESSOS = int(os.environ.get("STATAPP_TAREFAS_PROCESSOS", _TRABALHADORES))
+_threads = ThreadPoolExecutor(max_workers=_N_THREADS, thread_name_prefix="statapp-tarefa")
+_processos = None
+_trava_processos = threading.Lock()
+
+
+class Cancelada(Exception):
+    """
+    A tarefa foi cancelada ou substituída por um envio mais novo.
+    """
+
+
+class Tarefa:
+    """
+    Uma execução em segundo plano. 'feito'/'total' vêm das chamadas de progresso.
+    """
+
+    def __init__(self, descricao: str = ""):
+        self.descricao = descricao
+        self.feito = 0
+        self.total = None
+        self.inicio = time.perf_counter()
+        self._cancelamento = threading.Event()
+        self._futuro = None
+
+    def progresso(self, feito: int, total: Optional[int] = None):
+        if self._cancelamento.is_set():
+            raise Cancelada()
+        self.feito = feito
+        if total is not None:
+            self.total = total
+
+    def cancelar(self):
+        self._cancelamento.set()
+        if self._futuro is not None:
+            self._futuro.cancel()  # ainda na fila: nem começa
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelamento.is_set()
+
+    @property
+    def terminada(self) -> bool:
+        return self._futuro is not None and self._futuro.done()
+
+    @property
+    def fracao(self) -> Optional[float]:
+        if self.terminada:
+            return 1.0
+        if not self.total:
+            return None
+        return min(self.feito / self.total, 1.0)
+
+    @property
+    def segundos(self) -> float:
+        return time.perf_counter() - self.inicio
+
+    def resultado(self, espera: Optional[float] = None):
+        """
+        Valor devolvido pela função (relança a exceção dela). Se foi cancelada, levanta
+        Cancelada na hora, sem esperar a função chegar à próxima chamada de progresso.
+        """
+        if self.cancelada:
+            raise Cancelada()
+        return self._futuro.result(espera)
+
+
+def submeter(estado, chave: str, funcao, *args, descricao: str = "", **kwargs) -> Tarefa:
+    """
+    Agenda funcao(*args, progresso=tarefa.progresso, **kwargs) e guarda a tarefa em estado[chave],
+    cancelando a anterior da mesma chave. Roda no contexto atual (ContextVars), então as
+    medições de diagnostico.medir/instrumentar continuam indo para a sessão que enviou.
+    """
+    anterior = estado.get(chave)
+    if anterior is not None:
+        anterior.cancelar()
+    tarefa = Tarefa(descricao)
+    contexto = contextvars.copy_context()
+    tarefa._futuro = _threads.submit(contexto.run, funcao, *args, progresso=tarefa.progresso, **kwargs)
+    estado[chave] = tarefa
+    return tarefa
+
+
+def _pool_processos():
+    global _processos
+    with _trava_processos:
+        if _processos is None:
+            # Importados só aqui: páginas que nunca usam processos não pagam por eles
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: o servidor do Streamlit tem várias threads, e fork com threads é inseguro
+            _processos = ProcessPoolExecutor(
+                max_workers=_N_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _processos
+
+
+def mapear(funcao, itens, *args):
+    """
+    Gera funcao(item, *args) para cada item, na ordem, calculados no pool de processos
+    (para trabalho que segura o GIL), com no máximo 2 blocos por processo em andamento
+    (limita a memória). Se quem consome parar (ex.: Cancelada no progresso), os blocos
+    ainda na fila são cancelados sem esperar os que já rodam.
+    'funcao' precisa ser de nível de módulo (é enviada aos processos por pickle).
+    """
+    pool = _pool_processos()
+    limite = 2 * _N_PROCESSOS
+    pendentes = deque()
+    try:
+        for item in itens:
+            pendentes.append(pool.submit(funcao, item, *args))
+            if len(pendentes) >= limite:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+    finally:
+        for futuro in pendentes:
+            futuro.cancel()
+
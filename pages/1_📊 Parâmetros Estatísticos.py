@@ -1,14 +1,30 @@
 # pages/1_📊 Parâmetros Estatísticos.py
+import time
+from functools import partial
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import math
-from collections import Counter
 
 from ferramentas.funcoes import (
-    arredondar, parse_numeros,
-    media_ponderada_df, mediana_df, moda_df, variancia_df,
-    media_agrupada, mediana_agrupada, moda_agrupada, variancia_agrupada
+    REGRAS_CLASSES, arredondar, construir_classes, contar_numeros,
+    descrever_colunas_contagens, descrever_discreto, iterar_blocos_numeros, parse_numeros,
+    tabela_frequencias_classes, tabela_frequencias_discreta
+)
+from ferramentas.arquivos import (
+    colunas_arquivo, iterar_valores, ler_colunas, ler_valores_brutos, ler_tabela_discreta, ler_tabela_classes, reabrir
 )
+from ferramentas.quantis import K_PADRAO, descrever_aproximado, erro_posto
+from ferramentas.precisao import LIMITE_EXATO, MODOS_NUMERICOS
+from ferramentas.cache import cache_resultados
+from ferramentas.diagnostico import iniciar_coleta, medir, tabela_registros
+from ferramentas.incremental import AgregadoDiscreto, AgregadoClasses
+from ferramentas.sessao import armazem_da_sessao, uso_sessoes
+from ferramentas.tarefas import Cancelada, submeter
+from ferramentas.aquecimento import iniciar as iniciar_aquecimento, tempos as tempos_aquecimento
+
+# Aquecimento do servidor, caso esta seja a primeira página aberta (ver ferramentas.aquecimento)
+iniciar_aquecimento()
 
 # --- Session state inicial ---
 if "editor_discreto_seed" not in st.session_state:
@@ -17,11 +33,227 @@ if "editor_discreto_seed" not in st.session_state:
 if "text_area1_seed" not in st.session_state:
     st.session_state.text_area1_seed = 0
 
-if "df_discreto" not in st.session_state:
-    st.session_state.df_discreto = pd.DataFrame({"xi": [None], "fi": [None]})
+# Tabelas digitadas: arrays numéricos somente leitura, com orçamento de memória por sessão
+armazem = armazem_da_sessao(st.session_state)
+
+if "df_discreto" not in armazem:
+    armazem.guardar("df_discreto", pd.DataFrame({"xi": [None], "fi": [None]}))
 
-if "df_classes" not in st.session_state:
-    st.session_state.df_classes = pd.DataFrame([{"Li": None, "Ls": None, "fi": None}])
+if "df_classes" not in armazem:
+    armazem.guardar("df_classes", pd.DataFrame([{"Li": None, "Ls": None, "fi": None}]))
+
+
+# Medidas que cada aba oferece (nome em descrever_* -> rótulo da caixa), na ordem das caixas
+NOMES_MEDIDAS = {
+    "media": "Média", "mediana": "Mediana", "moda": "Moda", "variancia": "Variância",
+    "desvio_padrao": "Desvio Padrão", "coeficiente_variacao": "Coeficiente de Variação",
+}
+NOMES_MEDIDAS_CLASSES = {
+    "media": "Média", "mediana": "Mediana", "moda_bruta": "Moda Bruta", "moda_czuber": "Moda de Czuber",
+    "variancia": "Variância", "desvio_padrao": "Desvio Padrão", "coeficiente_variacao": "Coeficiente de Variação",
+}
+
+
+def caixas_medidas(nomes: dict) -> dict:
+    """
+    Uma caixa de seleção por medida de 'nomes'; devolve {medida: marcada}.
+    """
+    return {medida: st.checkbox(rotulo) for medida, rotulo in nomes.items()}
+
+
+def medidas_marcadas(marcadas: dict) -> list:
+    """
+    Medidas marcadas em caixas_medidas, na ordem das caixas (o 'medidas' de descrever_*).
+    """
+    return [medida for medida, marcada in marcadas.items() if marcada]
+
+
+def _cartoes_comuns(r, marcadas: dict) -> list:
+    # Média, mediana, variância, desvio e CV: iguais nas descrições discreta e agrupada
+    cards = []
+    if marcadas["media"]:         cards.append(("Média", f"{r.media:.2f}"))
+    if marcadas["mediana"]:       cards.append(("Mediana", f"{r.mediana:.2f}"))
+    if marcadas["variancia"]:     cards.append(("Variância", f"{r.variancia:.2f}"))
+    if marcadas["desvio_padrao"]: cards.append(("Desvio Padrão", f"{r.desvio_padrao:.2f}"))
+    if marcadas["coeficiente_variacao"]: cards.append(("Coeficiente de Variação", f"{r.coeficiente_variacao:.2f}%" if r.coeficiente_variacao is not None else "Indefinido"))
+    return cards
+
+
+def cartoes_discretos(r, marcadas: dict) -> list:
+    """
+    Cartões (título, valor) das medidas marcadas, a partir de uma DescricaoDiscreta.
+    """
+    cards = _cartoes_comuns(r, marcadas)
+    if marcadas["moda"]:          cards.append((f"Moda ({r.tipo_moda})", ", ".join(f"{x:.2f}" for x in r.modas)))
+    return cards
+
+
+def cartoes_classes(r, marcadas: dict) -> list:
+    """
+    Cartões (título, valor) das medidas marcadas, a partir de uma DescricaoAgrupada.
+    """
+    cards = _cartoes_comuns(r, marcadas)
+    if marcadas["moda_bruta"]:    cards.append((f"Moda Bruta ({r.tipo_moda})", ", ".join(f"{m:.2f}" for m in r.modas_brutas)))
+    # Para Czuber, valores None aparecem como "N/A"
+    if marcadas["moda_czuber"]:   cards.append(("Moda de Czuber", ", ".join("N/A" if m is None else f"{m:.2f}" for m in r.modas_czuber)))
+    return cards
+
+
+def mostrar_cartoes(cards: list):
+    """
+    Impressão em 2 colunas (st.success para não truncar o texto).
+    """
+    with medir("render: cartões", cartoes=len(cards)):
+        cols = st.columns(2)
+        for i, (titulo, valor) in enumerate(cards):
+            with cols[i % 2]:
+                st.success(f"**{titulo}:** {valor}")
+
+
+def atualizar_agregado(nome: str, classe, tabela: str, versao_base, editado: pd.DataFrame, chave_editor: str):
+    """
+    Leva o agregado 'nome' (criado com 'classe') à tabela 'editado' e a guarda como 'tabela'.
+    Se o agregado foi atualizado por último com a tabela passada ao editor (versao_base,
+    de armazem.versao antes do editor), só as linhas do estado do editor são aplicadas;
+    senão (tabela trocada por arquivo, Limpar, agregado descartado), compara tudo.
+    """
+    agregado = armazem.agregado(nome, classe)
+    sincronizado = versao_base is not None and agregado.origem == versao_base
+    agregado.atualizar(editado, st.session_state.get(chave_editor) if sincronizado else None)
+    armazem.guardar(tabela, editado)
+    agregado.origem = armazem.versao(tabela)
+    return agregado
+
+
+def opcoes_aproximado(chave: str):
+    """
+    Controles do modo aproximado (dentro do form): liga/desliga, k do esboço e percentis extras.
+    """
+    aproximado = st.toggle("Modo aproximado para entradas muito grandes (memória fixa)", key=f"aprox_{chave}")
+    col_k, col_p = st.columns(2)
+    k = col_k.select_slider("Precisão do esboço (k)", [50, 100, 200, 400, 800, 1600], value=K_PADRAO,
+                            format_func=lambda k: f"{k} (±{100 * erro_posto(k):.2f}%)", key=f"k_{chave}")
+    percentis = col_p.text_input("Percentis extras (ex.: 10 90 99)", key=f"percentis_{chave}")
+    return aproximado, k, percentis
+
+
+def acompanhar_tarefa(chave: str):
+    """
+    Mostra o progresso da tarefa em segundo plano guardada em st.session_state[chave] e devolve
+    o resultado quando ela termina (None se não há tarefa). Um novo "Calcular" reinicia o script
+    e substitui a tarefa (submeter cancela a anterior sem esperar); "Cancelar" interrompe.
+    Levanta Cancelada, ou a exceção do cálculo.
+    """
+    tarefa = st.session_state.get(chave)
+    if tarefa is None:
+        return None
+    if not tarefa.terminada:
+        barra = st.progress(0.0, text=f"{tarefa.descricao}…")
+        if st.button("Cancelar", key=f"cancelar_{chave}"):
+            tarefa.cancelar()
+        while not tarefa.terminada and not tarefa.cancelada:
+            fracao = tarefa.fracao
+            texto = f"{tarefa.descricao}: {tarefa.segundos:.1f} s"
+            barra.progress(fracao or 0.0, text=texto if fracao is None else f"{texto} ({fracao:.0%})")
+            time.sleep(0.1)
+        barra.empty()
+    del st.session_state[chave]
+    return tarefa.resultado()
+
+
+def calcular_discreto(ler, medidas: list, modo: str, tabela: bool = False, progresso=None):
+    """
+    Tarefa da entrada por texto e por arquivo: ler(progresso=...) monta a tabela (xi, fi)
+    e em seguida as medidas são calculadas (na thread da tarefa), junto com a tabela de
+    frequências completa se 'tabela' (senão None).
+    """
+    df_freq = ler(progresso=progresso)
+    if df_freq.empty:
+        raise ValueError("Nenhum número encontrado.")
+    r = descrever_discreto(df_freq, medidas, modo=modo)
+    return df_freq, r, tabela_frequencias_discreta(df_freq, modo) if tabela else None
+
+
+def calcular_aproximado(blocos, k: int, texto_percentis: str, progresso=None):
+    """
+    Tarefa do modo aproximado: blocos(progresso=...) gera os valores, consumidos em uma
+    passada com memória fixa.
+    """
+    percentis = parse_numeros(texto_percentis)
+    if any(not 0 <= p <= 100 for p in percentis):
+        raise ValueError("Os percentis devem estar entre 0 e 100.")
+    return descrever_aproximado(blocos(progresso=progresso), k, percentis)
+
+
+def calcular_matriz(ler, medidas: list, progresso=None):
+    """
+    Tarefa da aba "Várias colunas": lê as colunas (já reduzidas a contagens, lote a lote)
+    e monta a matriz de resultados.
+    """
+    return descrever_colunas_contagens(ler(progresso=progresso), medidas)
+
+
+def mostrar_aproximado(r, k: int, marcadas: dict):
+    """
+    Mostra os cartões do modo aproximado.
+    Média, variância, desvio e CV usam todos os valores (sem aproximação de esboço); mediana,
+    quartis e percentis são estimados pelo esboço KLL e marcados com ≈. Moda não está disponível.
+    """
+
+    cards = []
+    if marcadas["media"]:        cards.append(("Média", f"{arredondar(r.media):.2f}"))
+    if marcadas["variancia"]:    cards.append(("Variância", f"{arredondar(r.variancia):.2f}" if r.variancia is not None else "Indefinida"))
+    if marcadas["desvio_padrao"]: cards.append(("Desvio Padrão", f"{arredondar(r.desvio_padrao):.2f}" if r.desvio_padrao is not None else "Indefinido"))
+    if marcadas["coeficiente_variacao"]: cards.append(("Coeficiente de Variação", f"{arredondar(r.coeficiente_variacao):.2f}%" if r.coeficiente_variacao is not None else "Indefinido"))
+    if marcadas["mediana"]:      cards.append(("Mediana (≈ aproximada)", f"{arredondar(r.mediana):.2f}"))
+    cards.append(("Quartis Q1 | Q2 | Q3 (≈ aproximados)", " | ".join(f"{arredondar(q):.2f}" for q in r.quartis)))
+    for p, valor in r.percentis.items():
+        cards.append((f"Percentil {p:g} (≈ aproximado)", f"{arredondar(valor):.2f}"))
+    if marcadas["moda"]:         cards.append(("Moda", "indisponível no modo aproximado"))
+
+    mostrar_cartoes(cards)
+    st.info(f"**Resultados aproximados** (N = {r.n}): mediana, quartis e percentis têm erro de posto de "
+            f"até ±{100 * r.erro_posto:.2f}% (≈99% de confiança), usando {r.itens_guardados} valores guardados "
+            f"com k = {k}. Média, variância, desvio padrão e CV usam todos os valores, sem aproximação de esboço.")
+
+
+# Formato das colunas das tabelas de frequências (fri e Fri são proporções)
+FORMATOS_FREQUENCIAS = {
+    "fri": st.column_config.NumberColumn("fri", format="%.4f"),
+    "Fri": st.column_config.NumberColumn("Fri", format="%.4f"),
+}
+
+
+def mostrar_tabela_frequencias(nome: str):
+    """
+    Mostra a tabela de frequências guardada no armazém da sessão como 'nome' (ela sobrevive
+    aos reruns, inclusive no disco, se passar do orçamento). Só as linhas da página atual
+    vão para o navegador: tabelas com dezenas de milhares de linhas não reenviam a grade
+    inteira a cada interação. Os totais são somados sobre a tabela inteira.
+    """
+    tabela = armazem.obter(nome)
+    if tabela is None:
+        return
+    st.markdown("### Tabela de frequências")
+    total = len(tabela)
+    inicio, fim = 0, total
+    if total > 50:
+        col_linhas, col_pagina = st.columns(2)
+        por_pagina = col_linhas.selectbox("Linhas por página", [50, 100, 250, 500], key=f"linhas_{nome}")
+        paginas = -(-total // por_pagina)
+        # Página guardada fora do intervalo atual (tabela nova ou mais linhas por página) não chega ao widget
+        if st.session_state.get(f"pagina_{nome}", 1) > paginas:
+            st.session_state[f"pagina_{nome}"] = paginas
+        pagina = col_pagina.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1,
+                                         key=f"pagina_{nome}")
+        inicio = (pagina - 1) * por_pagina
+        fim = min(inicio + por_pagina, total)
+    with medir("render: tabela de frequências", linhas=fim - inicio, total=total):
+        st.dataframe(tabela.iloc[inicio:fim], column_config=FORMATOS_FREQUENCIAS,
+                     hide_index=True, use_container_width=True)
+        somas = tabela.iloc[:, -2:].sum()
+        st.caption(f"Linhas {inicio + 1}–{fim} de {total}. N = Σfi = {tabela['fi'].sum():g}; "
+                   + "; ".join(f"Σ {coluna} = {arredondar(valor, 4):g}" for coluna, valor in somas.items()))
 
 
 # CSS para aumentar fonte de células, cabeçalhos e checkboxes
@@ -50,10 +282,19 @@ st.title("📊Parâmetros Estatísticos")
 
 st.divider()
 st.markdown("## Selecione o tipo de agrupamento desejado:")
-aba_principal1, aba_principal2 = st.tabs(["Agrupamento Discreto", "Agrupamento por Classes"])
+aba_principal1, aba_principal2, aba_principal3 = st.tabs(
+    ["Agrupamento Discreto", "Agrupamento por Classes", "Várias colunas"])
 
 st.sidebar.header("Navegação")
 st.sidebar.write("Escolha uma página na barra lateral 👈")
+# Diagnóstico: tempo e memória de cada etapa desta execução (painel no fim da página)
+registros_diagnostico = iniciar_coleta(st.sidebar.toggle("Diagnóstico de desempenho", key="diagnostico"))
+# Modo das somas de média e variância nas entradas por texto e por arquivo
+# (as tabelas editáveis já usam somas exatas incrementais)
+modo_numerico = st.sidebar.selectbox(
+    "Modo numérico", list(MODOS_NUMERICOS), format_func=MODOS_NUMERICOS.get, key="modo_numerico",
+    help=f"Automático: frações exatas até {LIMITE_EXATO} valores distintos, soma compensada acima disso."
+)
 # =====================================================================================
 # ABA 1: Agrupamento Discreto
 # =====================================================================================
@@ -69,7 +310,7 @@ with aba_principal1:
     """, unsafe_allow_html=True)
 
     st.caption("## Selecione o método de entrada:")
-    tab1, tab2 = st.tabs(["Tabela (xᵢ, fᵢ)", "Lista de valores"])
+    tab1, tab2, tab3 = st.tabs(["Tabela (xᵢ, fᵢ)", "Lista de valores", "Arquivo (CSV/XLSX)"])
 
     # CSS para o rótulo das subtabs (menor)
     st.markdown("""
@@ -89,8 +330,9 @@ with aba_principal1:
         with st.form("form_tabela"):
             st.markdown("### Insira os valores `xᵢ` e `fᵢ` a serem calculados na tabela.")
             st.markdown("#### Para adicionar mais linhas, **clique no `+` abaixo da tabela**.")
+            versao_discreto = armazem.versao("df_discreto")  # tabela que o editor recebe
             edited = st.data_editor(
-                st.session_state.df_discreto,
+                armazem.obter("df_discreto"),
                 num_rows="dynamic",          # permite adicionar/remover linhas
                 use_container_width=True,
                 column_config={
@@ -105,57 +347,46 @@ with aba_principal1:
             
             # Seleção de medidas a serem calculadas
             st.markdown("### Selecione o que deseja calcular: ")
-            mediacbx = st.checkbox("Média") 
-            medianacbx = st.checkbox("Mediana")
-            modacbx = st.checkbox("Moda")
-            varianciacbx = st.checkbox("Variância")
-            desviopadraocbx = st.checkbox("Desvio Padrão")
-            coeficientecbx = st.checkbox("Coeficiente de Variação")
+            marcadas = caixas_medidas(NOMES_MEDIDAS)
+            tabelacbx = st.checkbox("Tabela de frequências")
             
             # Botão Calcular sozinho
             sub = st.form_submit_button("Calcular", use_container_width=True)
         st.markdown("## Resultados:")
         # [Limpar] reset do editor após o form (recria o widget e zera o DF)
         if clear_tab1:
-            st.session_state.df_discreto = base.copy()
+            armazem.guardar("df_discreto", base)
             st.session_state["editor_discreto_seed"] += 1
             st.rerun()
 
-        # Atualiza DF persistente com o que está na tela
-        st.session_state.df_discreto = edited.copy()
+        # Atualiza a tabela persistente com o que está na tela (só compara, sem copiar, se nada mudou)
+        armazem.guardar("df_discreto", edited)
 
         # Processamento ao clicar em "Calcular"
         if sub:
             try:
-                # Limpa linhas vazias e força numérico
-                edited_num = edited.dropna().astype(float)
-
-                # Cálculos principais
-                m = arredondar(media_ponderada_df(edited_num), 2)
-                me = arredondar(mediana_df(edited_num), 2)
-                modais, tipo = moda_df(edited_num)
-                variance = arredondar(variancia_df(edited_num), 2)
-                desvio_padrao = arredondar(math.sqrt(variance), 2)
-                cv = (100 * desvio_padrao) / m
-                coeficiente_variacao = arredondar(cv, 2)
+                medidas = medidas_marcadas(marcadas)
+
+                # Cálculos principais: só as linhas editadas desde o último cálculo entram nas somas,
+                # lidas do estado do editor (o agregado fica no armazém, dentro do orçamento da sessão)
+                agregado = atualizar_agregado("agregado_discreto", AgregadoDiscreto, "df_discreto", versao_discreto,
+                                              edited, f"editor_discreto_{st.session_state['editor_discreto_seed']}")
+                r = agregado.descrever(medidas)
                 
-                # Impressão em 2 colunas (usa st.success para não truncar texto)
-                cards = []
-                if mediacbx:        cards.append(("Média", f"{m:.2f}"))
-                if medianacbx:      cards.append(("Mediana", f"{me:.2f}"))
-                if varianciacbx:    cards.append(("Variância", f"{variance:.2f}"))
-                if desviopadraocbx: cards.append(("Desvio Padrão", f"{desvio_padrao:.2f}"))
-                if coeficientecbx:  cards.append(("Coeficiente de Variação", f"{coeficiente_variacao:.2f}%"))
-                if modacbx:         cards.append((f"Moda ({tipo})", ", ".join(f"{x:.2f}" for x in modais)))
-
-                cols = st.columns(2)
-                for i, (titulo, valor) in enumerate(cards):
-                    with cols[i % 2]:
-                        st.success(f"**{titulo}:** {valor}")
+                mostrar_cartoes(cartoes_discretos(r, marcadas))
+
+                # Tabela de frequências: guardada na sessão para a paginação não recalcular
+                if tabelacbx:
+                    armazem.guardar("freq_tabela", tabela_frequencias_discreta(edited, modo_numerico))
+                else:
+                    armazem.remover("freq_tabela")
                     
             except Exception as e:
                 # Mostra aviso amigável (sem stacktrace)
+                armazem.remover("freq_tabela")
                 st.warning(str(e))
+
+        mostrar_tabela_frequencias("freq_tabela")
     
 
     # ---------------------------
@@ -177,19 +408,24 @@ with aba_principal1:
             st.subheader("Digite os valores a serem calculados separados por espaço na tabela abaixo:")
             # Usa seed na key para recriar o widget ao limpar (evita modificar uma key já instanciada)
             s = st.text_area(label=' ', key=f'text_area1_{st.session_state["text_area1_seed"]}')
-            st.caption(f"### Números a serem calculados: {s}")
+            # Mostra só o início de entradas muito grandes (evita reenviar o texto inteiro)
+            st.caption(f"### Números a serem calculados: {s if len(s) <= 500 else s[:500] + ' …'}")
+            separador_milhar = st.selectbox(
+                "Separador de milhar",
+                [None, ".", ","],
+                format_func=lambda sep: {None: "Nenhum (vírgula ou ponto é decimal)",
+                                         ".": "Ponto (1.234,56)", ",": "Vírgula (1,234.56)"}[sep],
+            )
+
+            aproximado_texto, k_texto, percentis_texto = opcoes_aproximado("texto")
 
             # [LIMPAR] botão logo abaixo da área de texto
             clear_text = st.form_submit_button("Limpar entrada", type="secondary", use_container_width=True)
             
             # Seleção de medidas
             st.markdown("### Selecione o que deseja calcular: ")
-            mediacbx = st.checkbox("Média") 
-            medianacbx = st.checkbox("Mediana")
-            modacbx = st.checkbox("Moda")
-            varianciacbx = st.checkbox("Variância")
-            desviopadraocbx = st.checkbox("Desvio Padrão")
-            coeficientecbx = st.checkbox("Coeficiente de Variação")
+            marcadas = caixas_medidas(NOMES_MEDIDAS)
+            tabelacbx = st.checkbox("Tabela de frequências")
             
             # Botão Calcular sozinho
             sub2 = st.form_submit_button("Calcular", use_container_width=True)
@@ -199,43 +435,121 @@ with aba_principal1:
             st.session_state["text_area1_seed"] += 1
             st.rerun()
 
+        # Cálculo em segundo plano: um novo envio substitui o anterior (ver acompanhar_tarefa)
         if sub2:
+            armazem.remover("freq_texto")
+        if sub2 and aproximado_texto:
+            submeter(st.session_state, "tarefa_texto", calcular_aproximado,
+                     partial(iterar_blocos_numeros, s, separador_milhar), k_texto, percentis_texto,
+                     descricao="Lendo os valores (aproximado)")
+        elif sub2:
+            medidas = medidas_marcadas(marcadas)
+            # Converte o texto direto em frequências (xi, fi) ordenadas, em blocos; a extração
+            # com regex segura o GIL, então os blocos vão para o pool de processos
+            submeter(st.session_state, "tarefa_texto", calcular_discreto,
+                     partial(contar_numeros, s, separador_milhar, processos=True), medidas, modo_numerico,
+                     tabelacbx, descricao="Lendo os valores")
+
+        try:
+            resultado = acompanhar_tarefa("tarefa_texto")
+        except Cancelada:
+            st.info("Cálculo cancelado.")
+        except Exception as e:
+            st.error(f"Entrada inválida: {e}")
+        else:
+            # Os controles estão no form: aproximado_texto é o do envio que gerou a tarefa
+            if resultado is not None and aproximado_texto:
+                mostrar_aproximado(resultado, k_texto, marcadas)
+            elif resultado is not None:
+                _, r, tabela = resultado
+                if tabela is not None:
+                    armazem.guardar("freq_texto", tabela)
+                mostrar_cartoes(cartoes_discretos(r, marcadas))
+
+        mostrar_tabela_frequencias("freq_texto")
+
+    # ---------------------------
+    # Tab 3: entrada por arquivo
+    # ---------------------------
+    with tab3:
+        st.subheader("Envie um arquivo CSV ou XLSX com cabeçalho:")
+        arquivo = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_discreto")
+        col_sep, col_dec = st.columns(2)
+        sep_arquivo = col_sep.selectbox("Separador de colunas (CSV)", [",", ";", "\t"],
+                                        format_func=lambda c: "Tab" if c == "\t" else c, key="sep_discreto")
+        dec_arquivo = col_dec.selectbox("Separador decimal (CSV)", [".", ","], key="dec_discreto")
+        formato = st.radio("Conteúdo do arquivo", ["Valores brutos (uma coluna)", "Tabela (xᵢ, fᵢ)"],
+                           horizontal=True, key="formato_discreto")
+
+        if arquivo is not None:
             try:
-                # Converte string para lista de floats (aceita vírgula/ponto)
-                nums = parse_numeros(s)
-                if not nums:
-                    raise ValueError("Nenhum número encontrado.")
-
-                # Constrói frequência e ordena (xi, fi)
-                freq = Counter(nums)
-                df_freq = pd.DataFrame(sorted(freq.items()), columns=["xi", "fi"])
-                
-                # Cálculos
-                m = arredondar(media_ponderada_df(df_freq), 2)
-                me = arredondar(mediana_df(df_freq), 2)
-                modais, tipo = moda_df(df_freq)
-                variance = arredondar(variancia_df(df_freq), 2)
-                desvio_padrao = arredondar(math.sqrt(variance), 2)
-                cv = (100 * desvio_padrao) / m
-                coeficiente_variacao = arredondar(cv, 2)
-                
-                # Impressão em 2 colunas (sem truncar)
-                cards = []
-                if mediacbx:        cards.append(("Média", f"{m:.2f}"))
-                if medianacbx:      cards.append(("Mediana", f"{me:.2f}"))
-                if varianciacbx:    cards.append(("Variância", f"{variance:.2f}"))
-                if desviopadraocbx: cards.append(("Desvio Padrão", f"{desvio_padrao:.2f}"))
-                if coeficientecbx:  cards.append(("Coeficiente de Variação", f"{coeficiente_variacao:.2f}%"))
-                if modacbx:         cards.append((f"Moda ({tipo})", ", ".join(f"{x:.2f}" for x in modais)))
-
-                cols = st.columns(2)
-                for i, (titulo, valor) in enumerate(cards):
-                    with cols[i % 2]:
-                        st.success(f"**{titulo}:** {valor}")
-                
+                colunas = colunas_arquivo(arquivo, sep_arquivo)
+                if formato.startswith("Valores"):
+                    col_valores = st.selectbox("Coluna com os valores", colunas, key="col_valores")
+                else:
+                    col_a, col_b = st.columns(2)
+                    col_xi = col_a.selectbox("Coluna xᵢ", colunas, key="col_xi")
+                    col_fi = col_b.selectbox("Coluna fᵢ", colunas, index=min(1, len(colunas) - 1), key="col_fi")
+            except Exception as e:
+                st.error(f"Não foi possível ler o cabeçalho do arquivo: {e}")
+                arquivo = None
+
+        with st.form("form_arquivo"):
+            st.markdown("### Selecione o que deseja calcular: ")
+            marcadas = caixas_medidas(NOMES_MEDIDAS)
+            tabelacbx = st.checkbox("Tabela de frequências")
+            # Só para valores brutos: tabelas (xᵢ, fᵢ) já são compactas
+            aproximado_arquivo, k_arquivo, percentis_arquivo = opcoes_aproximado("arquivo")
+
+            sub3 = st.form_submit_button("Calcular", use_container_width=True)
+        st.markdown("## Resultados:")
+
+        if sub3:
+            armazem.remover("freq_arquivo")
+            try:
+                if arquivo is None:
+                    raise ValueError("Envie um arquivo para calcular.")
+                # A tarefa lê por um leitor próprio: a página segue relendo o cabeçalho a cada rerun
+                origem = reabrir(arquivo)
+
+                if aproximado_arquivo:
+                    if not formato.startswith("Valores"):
+                        raise ValueError("O modo aproximado vale para arquivos de valores brutos (uma coluna).")
+                    submeter(st.session_state, "tarefa_arquivo", calcular_aproximado,
+                             partial(iterar_valores, origem, col_valores, sep_arquivo, dec_arquivo),
+                             k_arquivo, percentis_arquivo, descricao="Lendo o arquivo (aproximado)")
+                else:
+                    # Leitura em lotes, só das colunas escolhidas, já como float64
+                    # (o leitor de CSV do pandas libera o GIL: a tarefa fica no pool de threads)
+                    if formato.startswith("Valores"):
+                        ler = partial(ler_valores_brutos, origem, col_valores, sep_arquivo, dec_arquivo)
+                    else:
+                        ler = partial(ler_tabela_discreta, origem, col_xi, col_fi, sep_arquivo, dec_arquivo)
+
+                    medidas = medidas_marcadas(marcadas)
+                    submeter(st.session_state, "tarefa_arquivo", calcular_discreto, ler, medidas, modo_numerico,
+                             tabelacbx, descricao="Lendo o arquivo")
             except Exception as e:
                 st.error(f"Entrada inválida: {e}")
 
+        try:
+            resultado = acompanhar_tarefa("tarefa_arquivo")
+        except Cancelada:
+            st.info("Cálculo cancelado.")
+        except Exception as e:
+            st.error(f"Entrada inválida: {e}")
+        else:
+            if resultado is not None and aproximado_arquivo:
+                mostrar_aproximado(resultado, k_arquivo, marcadas)
+            elif resultado is not None:
+                df_arquivo, r, tabela = resultado
+                if tabela is not None:
+                    armazem.guardar("freq_arquivo", tabela)
+                st.caption(f"{len(df_arquivo)} valores distintos, N = {int(df_arquivo['fi'].sum())}")
+                mostrar_cartoes(cartoes_discretos(r, marcadas))
+
+        mostrar_tabela_frequencias("freq_arquivo")
+
 
 # =====================================================================================
 # ABA 2: Agrupamento por Classes
@@ -248,16 +562,68 @@ with aba_principal2:
         "Clique em **Adicionar classe (+)** para criar a próxima (preenchimento automático).]"
     )
 
-    # DataFrame da sessão para persistir a tabela entre reruns
-    if 'df_classes' not in st.session_state:
-        st.session_state.df_classes = pd.DataFrame([{"Li": None, "Ls": None, "fi": None}])
+    # Carregar a tabela de classes a partir de um arquivo (substitui a tabela abaixo)
+    with st.expander("Carregar classes de um arquivo (CSV/XLSX com colunas Li, Ls, fi)"):
+        arquivo_classes = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_classes")
+        col_sep, col_dec = st.columns(2)
+        sep_classes = col_sep.selectbox("Separador de colunas (CSV)", [",", ";", "\t"],
+                                        format_func=lambda c: "Tab" if c == "\t" else c, key="sep_classes")
+        dec_classes = col_dec.selectbox("Separador decimal (CSV)", [".", ","], key="dec_classes")
+        if st.button("Carregar na tabela", disabled=arquivo_classes is None, use_container_width=True):
+            try:
+                armazem.guardar("df_classes", ler_tabela_classes(arquivo_classes, sep=sep_classes, decimal=dec_classes))
+                if "editor_classes" in st.session_state:
+                    del st.session_state["editor_classes"]  # recria o editor com a nova tabela
+                st.rerun()
+            except Exception as e:
+                st.error(f"Erro: {e}")
+
+    # Construir as classes a partir de valores brutos (um histograma, sem adicionar linha a linha)
+    with st.expander("Construir classes automaticamente a partir de valores brutos"):
+        origem_brutos = st.radio("Origem dos valores", ["Texto", "Arquivo (CSV/XLSX)"], horizontal=True,
+                                 key="origem_brutos")
+        if origem_brutos == "Texto":
+            texto_brutos = st.text_area("Valores separados por espaço", key="texto_brutos")
+        else:
+            arquivo_brutos = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_brutos")
+            col_sep, col_dec, col_col = st.columns(3)
+            sep_brutos = col_sep.selectbox("Separador de colunas (CSV)", [",", ";", "\t"],
+                                           format_func=lambda c: "Tab" if c == "\t" else c, key="sep_brutos")
+            dec_brutos = col_dec.selectbox("Separador decimal (CSV)", [".", ","], key="dec_brutos")
+            coluna_brutos = None
+            if arquivo_brutos is not None:
+                try:
+                    coluna_brutos = col_col.selectbox("Coluna com os valores", colunas_arquivo(arquivo_brutos, sep_brutos),
+                                                      key="coluna_brutos")
+                except Exception as e:
+                    st.error(f"Não foi possível ler o cabeçalho do arquivo: {e}")
+        col_regra, col_largura = st.columns(2)
+        regra = col_regra.selectbox("Regra", list(REGRAS_CLASSES), format_func=REGRAS_CLASSES.get, key="regra_classes")
+        largura = col_largura.number_input("Largura h (só para largura fixa)", min_value=0.0, value=1.0,
+                                           disabled=regra != "largura", key="largura_classes")
+        if st.button("Gerar classes", use_container_width=True):
+            try:
+                if origem_brutos == "Texto":
+                    blocos = list(iterar_blocos_numeros(texto_brutos))
+                else:
+                    if arquivo_brutos is None or coluna_brutos is None:
+                        raise ValueError("Envie um arquivo para gerar as classes.")
+                    blocos = list(iterar_valores(arquivo_brutos, coluna_brutos, sep_brutos, dec_brutos))
+                valores = np.concatenate(blocos) if blocos else np.empty(0)
+                armazem.guardar("df_classes", construir_classes(valores, regra, largura))
+                if "editor_classes" in st.session_state:
+                    del st.session_state["editor_classes"]  # recria o editor com a nova tabela
+                st.rerun()
+            except Exception as e:
+                st.error(f"Erro: {e}")
 
     clear_classes = False  # [Limpar] default
 
     # Um único form combina: editor + botão adicionar + checkboxes + calcular
     with st.form("form_classes_all", clear_on_submit=False):
+        versao_classes = armazem.versao("df_classes")  # tabela que o editor recebe
         edited_df = st.data_editor(
-            st.session_state.df_classes,
+            armazem.obter("df_classes"),
             num_rows="fixed",                # sem '+' nativo do editor (vamos controlar pelo botão)
             use_container_width=True,
             column_config={
@@ -275,13 +641,8 @@ with aba_principal2:
 
         # Checkboxes para escolher o que calcular
         st.markdown("### Selecione o que deseja calcular: ")
-        mediacbx        = st.checkbox("Média")
-        medianacbx      = st.checkbox("Mediana")
-        modabrutacbx    = st.checkbox("Moda Bruta")
-        modaczubercbx   = st.checkbox("Moda de Czuber")
-        varianciacbx    = st.checkbox("Variância")
-        desviopadraocbx = st.checkbox("Desvio Padrão")
-        coeficientecbx  = st.checkbox("Coeficiente de Variação")
+        marcadas  = caixas_medidas(NOMES_MEDIDAS_CLASSES)
+        tabelacbx = st.checkbox("Tabela de frequências")
 
         # Botão Calcular sozinho
         calc_clicked = st.form_submit_button("Calcular", use_container_width=True)
@@ -291,7 +652,7 @@ with aba_principal2:
     # ---------------------------
     
     if clear_classes:
-        st.session_state.df_classes = pd.DataFrame([{"Li": None, "Ls": None, "fi": None}])
+        armazem.guardar("df_classes", pd.DataFrame([{"Li": None, "Ls": None, "fi": None}]))
         if "editor_classes" in st.session_state:
             del st.session_state["editor_classes"]  # limpa estado do widget
         st.rerun()
@@ -326,8 +687,8 @@ with aba_principal2:
             # Se não houver nenhuma linha completa, adiciona linha vazia
             new_row = {"Li": None, "Ls": None, "fi": None}
 
-        # Persiste a nova linha no session_state e força rerun para atualizar a UI
-        st.session_state.df_classes = pd.concat([base_cls, pd.DataFrame([new_row])], ignore_index=True)
+        # Persiste a nova linha no armazém da sessão e força rerun para atualizar a UI
+        armazem.guardar("df_classes", pd.concat([base_cls, pd.DataFrame([new_row])], ignore_index=True))
         st.rerun()
 
     # ---------------------------
@@ -335,41 +696,114 @@ with aba_principal2:
     # ---------------------------
     if calc_clicked:
         try:
-            # Copia os dados do editor e força para numérico
-            tabela_classes = edited_df.copy()
-            tabela_classes["Li"] = pd.to_numeric(tabela_classes["Li"], errors="coerce")
-            tabela_classes["Ls"] = pd.to_numeric(tabela_classes["Ls"], errors="coerce")
-            tabela_classes["fi"] = pd.to_numeric(tabela_classes["fi"], errors="coerce")
-
-            # Mantém apenas linhas com Li, Ls e fi preenchidos
-            tabela_classes = tabela_classes.dropna(subset=["Li", "Ls", "fi"]).astype(float)
-
-            if tabela_classes.empty:
-                raise ValueError("A tabela está vazia ou contém dados inválidos.")
-
-            # Cálculos principais
-            media = media_agrupada(tabela_classes)
-            mediana = mediana_agrupada(tabela_classes)
-            modas_brutas, modas_czuber, tipo_moda = moda_agrupada(tabela_classes)
-            variancia = variancia_agrupada(tabela_classes, media)
-            desvio_padrao = arredondar(math.sqrt(variancia))
-            coeficiente_variacao = arredondar((100 * desvio_padrao) / media, 2) if media != 0 else None
-
-            # Impressão em 2 colunas (st.success evita truncar)
-            cards = []
-            if mediacbx:        cards.append(("Média", f"{media:.2f}"))
-            if medianacbx:      cards.append(("Mediana", f"{mediana:.2f}"))
-            if varianciacbx:    cards.append(("Variância", f"{variancia:.2f}"))
-            if desviopadraocbx: cards.append(("Desvio Padrão", f"{desvio_padrao:.2f}"))
-            if coeficientecbx:  cards.append(("Coeficiente de Variação", f"{coeficiente_variacao:.2f}%" if coeficiente_variacao is not None else "Indefinido"))
-            if modabrutacbx:    cards.append((f"Moda Bruta ({tipo_moda})", ", ".join(f"{m:.2f}" for m in modas_brutas)))
-            # Para Czuber, valores None aparecem como "N/A"
-            if modaczubercbx:   cards.append(("Moda de Czuber", ", ".join("N/A" if m is None else f"{m:.2f}" for m in modas_czuber)))
-
-            cols = st.columns(2)
-            for i, (titulo, valor) in enumerate(cards):
-                with cols[i % 2]:
-                    st.success(f"**{titulo}:** {valor}")
+            # Cálculos principais (apenas o que os cartões marcados precisam)
+            medidas = medidas_marcadas(marcadas)
+            # Linhas incompletas (Li, Ls ou fi vazios) são ignoradas; só as linhas
+            # alteradas desde o último cálculo entram nas somas
+            agregado = atualizar_agregado("agregado_classes", AgregadoClasses, "df_classes", versao_classes,
+                                          edited_df, "editor_classes")
+            r = agregado.descrever(medidas)
+
+            mostrar_cartoes(cartoes_classes(r, marcadas))
+
+            # Tabela de frequências: guardada na sessão para a paginação não recalcular
+            if tabelacbx:
+                armazem.guardar("freq_classes", tabela_frequencias_classes(edited_df, modo_numerico))
+            else:
+                armazem.remover("freq_classes")
+
+        except Exception as e:
+            armazem.remover("freq_classes")
+            st.error(f"Erro: {e}")
+
+    mostrar_tabela_frequencias("freq_classes")
+
+
+# =====================================================================================
+# ABA 3: Várias colunas (e grupos) de uma vez
+# =====================================================================================
+NOMES_MATRIZ = {
+    "n": "N", "media": "Média", "mediana": "Mediana", "modas": "Moda(s)", "tipo_moda": "Tipo de moda",
+    "variancia": "Variância", "desvio_padrao": "Desvio Padrão", "coeficiente_variacao": "CV (%)",
+}
+
+with aba_principal3:
+    st.markdown("### Envie um arquivo com várias colunas numéricas")
+    st.markdown("##### :gray[Todas as medidas de todas as colunas (e de cada grupo, se houver uma coluna "
+                "de categoria como escola ou mês) saem de uma vez, em uma matriz de resultados.]")
+    arquivo_largo = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_largo")
+    col_sep, col_dec = st.columns(2)
+    sep_largo = col_sep.selectbox("Separador de colunas (CSV)", [",", ";", "\t"],
+                                  format_func=lambda c: "Tab" if c == "\t" else c, key="sep_largo")
+    dec_largo = col_dec.selectbox("Separador decimal (CSV)", [".", ","], key="dec_largo")
+    colunas_largo = []
+    if arquivo_largo is not None:
+        try:
+            colunas_largo = colunas_arquivo(arquivo_largo, sep_largo)
+        except Exception as e:
+            st.error(f"Não foi possível ler o cabeçalho do arquivo: {e}")
+
+    with st.form("form_largo"):
+        grupo_largo = st.selectbox("Coluna de grupo (opcional)", [None] + colunas_largo,
+                                   format_func=lambda c: "(nenhuma)" if c is None else c, key="grupo_largo")
+        numericas_largo = st.multiselect("Colunas numéricas (vazio = todas as outras)", colunas_largo,
+                                         key="numericas_largo")
+        medidas_largo = st.multiselect("Medidas", list(NOMES_MEDIDAS), default=list(NOMES_MEDIDAS),
+                                       format_func=NOMES_MEDIDAS.get, key="medidas_largo")
+        sub_largo = st.form_submit_button("Calcular", use_container_width=True)
+    st.markdown("## Resultados:")
 
+    if sub_largo:
+        try:
+            if arquivo_largo is None:
+                raise ValueError("Envie um arquivo para calcular.")
+            if not medidas_largo:
+                raise ValueError("Escolha ao menos uma medida.")
+            colunas = numericas_largo or [c for c in colunas_largo if c != grupo_largo]
+            submeter(st.session_state, "tarefa_largo", calcular_matriz,
+                     partial(ler_colunas, reabrir(arquivo_largo), colunas, grupo_largo, sep_largo, dec_largo),
+                     medidas_largo, descricao="Lendo o arquivo")
         except Exception as e:
             st.error(f"Erro: {e}")
+
+    try:
+        matriz = acompanhar_tarefa("tarefa_largo")
+    except Cancelada:
+        st.info("Cálculo cancelado.")
+    except Exception as e:
+        st.error(f"Erro: {e}")
+    else:
+        if matriz is not None:
+            if "modas" in matriz:
+                matriz["modas"] = matriz["modas"].map(
+                    lambda modas: ", ".join(f"{m:.2f}" for m in modas) if isinstance(modas, tuple) else "")
+            matriz = matriz.rename(columns=NOMES_MATRIZ).rename_axis(
+                index={"coluna": "Coluna"}).reset_index()
+            with medir("render: matriz", linhas=len(matriz)):
+                st.dataframe(matriz, hide_index=True, use_container_width=True)
+            st.download_button("Baixar resultados (CSV)", matriz.to_csv(index=False).encode("utf-8"),
+                               file_name="resultados.csv", mime="text/csv", use_container_width=True)
+
+
+# Estatísticas do cache de resultados (compartilhado entre as sessões do servidor)
+estat_cache = cache_resultados.estatisticas()
+st.sidebar.caption(
+    f"Cache de resultados: {estat_cache['acertos']} acertos, {estat_cache['falhas']} falhas "
+    f"({estat_cache['itens']}/{estat_cache['tamanho_maximo']} itens)"
+)
+st.sidebar.caption(
+    f"Dados desta sessão: {armazem.bytes_memoria / 1024:.1f} KiB em memória, "
+    f"{armazem.bytes_disco / 1024:.1f} KiB em disco"
+)
+
+if registros_diagnostico is not None:
+    with st.expander("Diagnóstico: tempo e memória por etapa", expanded=True):
+        st.dataframe(tabela_registros(registros_diagnostico), hide_index=True, use_container_width=True)
+        st.markdown("**Tabelas e agregados guardados nesta sessão**")
+        st.dataframe(armazem.uso(), hide_index=True, use_container_width=True)
+        st.markdown("**Todas as sessões do servidor**")
+        st.dataframe(uso_sessoes(), hide_index=True, use_container_width=True)
+        st.markdown("**Aquecimento do servidor**")
+        st.dataframe(pd.DataFrame({"Etapa": list(tempos_aquecimento()),
+                                   "Tempo (ms)": [round(s * 1e3, 1) for s in tempos_aquecimento().values()]}),
+                     hide_index=True, use_container_width=True)
@@ -1,4 +1,22 @@
+import math
+import time
+
 import streamlit as st
+import numpy as np
+import pandas as pd
+
+from ferramentas.funcoes import arredondar
+from ferramentas.probabilidade import (
+    densidade, probabilidade_intervalo, quantil, media_variancia, cache_tabelas
+)
+from ferramentas.simulacao import SEMENTE_PADRAO, comparar, simular
+from ferramentas.tarefas import Cancelada, submeter
+from ferramentas.diagnostico import iniciar_coleta, medir, tabela_registros
+from ferramentas.aquecimento import iniciar as iniciar_aquecimento
+
+# Aquecimento do servidor, caso esta seja a primeira página aberta (ver ferramentas.aquecimento)
+iniciar_aquecimento()
+
 st.set_page_config(page_title="Probabilidade", page_icon="🎲", layout="wide")
 
 # CSS para aumentar fonte de células, cabeçalhos e checkboxes
@@ -20,12 +38,131 @@ div[data-testid="stCheckbox"] label {
 </style>
 """, unsafe_allow_html=True)
 
+# Limites das entradas: n e λ até 1e15 (inteiros ainda exatos em float) e no máximo
+# MAXIMO_BARRAS barras no gráfico da PMF, agrupando inteiros vizinhos quando o suporte é maior
+MAXIMO_N = 10**15
+MAXIMO_LAMBDA = 1e15
+MAXIMO_BARRAS = 400
+
+
+def grafico_pmf(nome: str, parametros: dict, inicio: float, fim: float):
+    """
+    Barras da PMF entre 'inicio' e 'fim'. Com mais de MAXIMO_BARRAS inteiros, cada barra soma a
+    massa de um bloco de inteiros consecutivos (P(k ≤ X ≤ k + largura - 1), pela CDF), em vez de
+    desenhar uma barra por inteiro.
+    """
+    inicio, fim = math.floor(inicio), math.ceil(fim)
+    largura = max(1, math.ceil((fim - inicio + 1) / MAXIMO_BARRAS))
+    k = np.arange(inicio, fim + 1, largura, dtype=float)
+    if largura == 1:
+        titulo, valores = "P(X = k)", densidade(nome, k, **parametros)
+    else:
+        titulo = f"P(k ≤ X ≤ k + {largura - 1})"
+        valores = probabilidade_intervalo(nome, k, k + largura - 1, **parametros)
+    st.bar_chart(pd.DataFrame({titulo: valores}, index=pd.Index(k.astype(np.int64), name="k")))
+
+
+def mostrar_distribuicao(nome: str, parametros: dict, x1: float, x2: float, q: float, faixa: tuple):
+    """
+    Cartões com P(x1 ≤ X ≤ x2), o quantil de q, média, variância e desvio padrão, e o gráfico
+    da densidade/PMF na 'faixa' (uma única chamada vetorizada para a curva inteira).
+    As tabelas acumuladas ficam em cache, então repetir perguntas com os mesmos parâmetros não recalcula.
+    """
+    try:
+        prob = float(probabilidade_intervalo(nome, x1, x2, **parametros))
+        x_q = float(quantil(nome, q, **parametros))
+        media, variancia = media_variancia(nome, **parametros)
+
+        cards = [
+            (f"P({x1:g} ≤ X ≤ {x2:g})", f"{arredondar(prob, 4):.4f} ({arredondar(100 * prob, 2):.2f}%)"),
+            (f"Quantil (P(X ≤ x) = {q:g})", f"x = {arredondar(x_q, 4):.4f}" if np.isfinite(x_q) else f"x = {x_q}"),
+            ("Média", f"{arredondar(media, 4):.4f}"),
+            ("Variância", f"{arredondar(variancia, 4):.4f}"),
+            ("Desvio Padrão", f"{arredondar(variancia ** 0.5, 4):.4f}"),
+        ]
+        with medir("render: cartões", cartoes=len(cards)):
+            cols = st.columns(2)
+            for i, (titulo, valor) in enumerate(cards):
+                with cols[i % 2]:
+                    st.success(f"**{titulo}:** {valor}")
+
+        inicio, fim = faixa
+        with medir("render: gráfico", distribuicao=nome):
+            if nome in ("binomial", "poisson"):
+                grafico_pmf(nome, parametros, inicio, fim)
+            else:
+                x = np.linspace(inicio, fim, 400)
+                st.line_chart(pd.DataFrame({"f(x)": densidade(nome, x, **parametros)}, index=pd.Index(x, name="x")))
+    except Exception as e:
+        st.error(f"Erro: {e}")
+
+
+def simular_distribuicao(nome: str, parametros: dict, n: int, intervalos: list, semente: int,
+                         parciais: list, progresso=None):
+    """
+    Tarefa da simulação: acrescenta a 'parciais' o resumo acumulado a cada parte concluída
+    (lido pela página enquanto a tarefa roda) e devolve o resumo final. As partes vão para
+    o pool de processos, cada uma com seu fluxo aleatório (ver ferramentas.simulacao).
+    """
+    for resumo in simular(nome, parametros, n, intervalos, semente, processos=True, progresso=progresso):
+        parciais.append(resumo)
+    return parciais[-1]
+
+
+def tabela_comparacao(nome: str, parametros: dict, resumo, intervalos: list) -> pd.DataFrame:
+    linhas = comparar(nome, parametros, resumo, intervalos)
+    return pd.DataFrame({
+        "Medida": [c.medida for c in linhas],
+        "Simulado": [c.simulado for c in linhas],
+        "Analítico": [c.analitico for c in linhas],
+        "Diferença": [c.simulado - c.analitico for c in linhas],
+        "Erro padrão": [c.erro_padrao for c in linhas],
+        "Diferença / erro padrão": [c.desvios for c in linhas],
+    })
+
+
+def acompanhar_simulacao(chave: str):
+    """
+    Enquanto a tarefa em st.session_state[chave] roda, mostra o progresso e as estimativas
+    acumuladas da última parte concluída, com botão "Cancelar". Devolve (nome, parametros,
+    intervalos, parciais) quando termina, ou None se não há tarefa. Levanta Cancelada, ou a
+    exceção da simulação.
+    """
+    tarefa = st.session_state.get(chave)
+    if tarefa is None:
+        return None
+    nome, parametros, intervalos, parciais = st.session_state[f"{chave}_dados"]
+    if not tarefa.terminada:
+        barra = st.progress(0.0, text=f"{tarefa.descricao}…")
+        if st.button("Cancelar", key=f"cancelar_{chave}"):
+            tarefa.cancelar()
+        parcial = st.empty()
+        mostradas = 0
+        while not tarefa.terminada and not tarefa.cancelada:
+            fracao = tarefa.fracao or 0.0
+            barra.progress(fracao, text=f"{tarefa.descricao}: {tarefa.feito:,} amostras, {tarefa.segundos:.1f} s ({fracao:.0%})")
+            if len(parciais) > mostradas:
+                mostradas = len(parciais)
+                parcial.dataframe(tabela_comparacao(nome, parametros, parciais[-1], intervalos),
+                                  hide_index=True, use_container_width=True)
+            time.sleep(0.1)
+        barra.empty()
+        parcial.empty()
+    del st.session_state[chave], st.session_state[f"{chave}_dados"]
+    tarefa.resultado()
+    return nome, parametros, intervalos, parciais
+
+
 st.title("🎲 Probabilidade")
 st.sidebar.header("Navegação")
 st.sidebar.write("Escolha uma página na barra lateral 👈")
+# Diagnóstico: tempo e memória de cada etapa desta execução (painel no fim da página)
+registros_diagnostico = iniciar_coleta(st.sidebar.toggle("Diagnóstico de desempenho", key="diagnostico"))
 
 st.markdown("## Selecione o tipo desejado:")
-aba_principal1, aba_principal2 = st.tabs(["Variável aleatória contínua", "Variável aleatória discreta"])
+aba_principal1, aba_principal2, aba_principal3 = st.tabs(
+    ["Variável aleatória contínua", "Variável aleatória discreta", "Simulação (Monte Carlo)"]
+)
 
 with aba_principal1:
     # CSS para o título das subtabs
@@ -49,9 +186,160 @@ with aba_principal1:
     }
     </style>
     """, unsafe_allow_html=True)
+
+    with tab1:
+        with st.form("form_uniforme"):
+            c1, c2 = st.columns(2)
+            a = c1.number_input("Limite inferior (a)", value=0.0)
+            b = c2.number_input("Limite superior (b)", value=1.0)
+            c1, c2 = st.columns(2)
+            x1 = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=0.25, key="x1_uniforme")
+            x2 = c2.number_input("x₂", value=0.75, key="x2_uniforme")
+            q = st.number_input("Quantil: valor x tal que P(X ≤ x) = q, com q =", value=0.5,
+                                min_value=0.0, max_value=1.0, key="q_uniforme")
+            sub_uniforme = st.form_submit_button("Calcular", use_container_width=True)
+        if sub_uniforme:
+            mostrar_distribuicao("uniforme", {"a": a, "b": b}, x1, x2, q, (a - 0.1 * (b - a), b + 0.1 * (b - a)))
+
+    with tab2:
+        with st.form("form_exponencial"):
+            lam = st.number_input("Taxa (λ)", value=1.0, min_value=0.0, key="lam_exponencial")
+            c1, c2 = st.columns(2)
+            x1 = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=0.0, key="x1_exponencial")
+            x2 = c2.number_input("x₂", value=1.0, key="x2_exponencial")
+            q = st.number_input("Quantil: valor x tal que P(X ≤ x) = q, com q =", value=0.5,
+                                min_value=0.0, max_value=1.0, key="q_exponencial")
+            sub_exponencial = st.form_submit_button("Calcular", use_container_width=True)
+        if sub_exponencial:
+            mostrar_distribuicao("exponencial", {"lam": lam}, x1, x2, q, (0.0, 8 / lam if lam > 0 else 1.0))
+
+    with tab3:
+        with st.form("form_normal"):
+            c1, c2 = st.columns(2)
+            mu = c1.number_input("Média (μ)", value=0.0)
+            sigma = c2.number_input("Desvio padrão (σ)", value=1.0, min_value=0.0)
+            c1, c2 = st.columns(2)
+            x1 = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=-1.0, key="x1_normal")
+            x2 = c2.number_input("x₂", value=1.0, key="x2_normal")
+            q = st.number_input("Quantil: valor x tal que P(X ≤ x) = q, com q =", value=0.5,
+                                min_value=0.0, max_value=1.0, key="q_normal")
+            sub_normal = st.form_submit_button("Calcular", use_container_width=True)
+        if sub_normal:
+            mostrar_distribuicao("normal", {"mu": mu, "sigma": sigma}, x1, x2, q, (mu - 4 * sigma, mu + 4 * sigma))
     
 with aba_principal2:
     st.caption("## Selecione o método de entrada:")
     tab1, tab2 = st.tabs(["Distribuição binomial", "Distribuição de Poisson"])
-    
-        
\ No newline at end of file
+
+    with tab1:
+        with st.form("form_binomial"):
+            c1, c2 = st.columns(2)
+            n = c1.number_input("Nº de ensaios (n)", value=10, min_value=0, max_value=MAXIMO_N, step=1)
+            p = c2.number_input("Probabilidade de sucesso (p)", value=0.5, min_value=0.0, max_value=1.0)
+            c1, c2 = st.columns(2)
+            x1 = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=0, step=1, key="x1_binomial")
+            x2 = c2.number_input("x₂", value=5, step=1, key="x2_binomial")
+            q = st.number_input("Quantil: valor x tal que P(X ≤ x) = q, com q =", value=0.5,
+                                min_value=0.0, max_value=1.0, key="q_binomial")
+            sub_binomial = st.form_submit_button("Calcular", use_container_width=True)
+        if sub_binomial:
+            desvio = (n * p * (1 - p)) ** 0.5
+            mostrar_distribuicao("binomial", {"n": n, "p": p}, x1, x2, q,
+                                 (max(0, n * p - 5 * desvio - 2), min(n, n * p + 5 * desvio + 2)))
+
+    with tab2:
+        with st.form("form_poisson"):
+            lam = st.number_input("Média de ocorrências (λ)", value=3.0, min_value=0.0, max_value=MAXIMO_LAMBDA,
+                                  key="lam_poisson")
+            c1, c2 = st.columns(2)
+            x1 = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=0, step=1, key="x1_poisson")
+            x2 = c2.number_input("x₂", value=3, step=1, key="x2_poisson")
+            q = st.number_input("Quantil: valor x tal que P(X ≤ x) = q, com q =", value=0.5,
+                                min_value=0.0, max_value=1.0, key="q_poisson")
+            sub_poisson = st.form_submit_button("Calcular", use_container_width=True)
+        if sub_poisson:
+            mostrar_distribuicao("poisson", {"lam": lam}, x1, x2, q,
+                                 (max(0, lam - 5 * lam ** 0.5 - 2), lam + 5 * lam ** 0.5 + 2))
+
+with aba_principal3:
+    st.caption("Sorteia amostras da distribuição e compara as estimativas com os valores analíticos. "
+               "A mesma semente e o mesmo nº de amostras reproduzem o mesmo resultado.")
+    nome_sim = st.selectbox("Distribuição", ["uniforme", "exponencial", "normal", "binomial", "poisson"],
+                            key="distribuicao_simulacao")
+    with st.form("form_simulacao"):
+        c1, c2 = st.columns(2)
+        if nome_sim == "uniforme":
+            parametros_sim = {"a": c1.number_input("Limite inferior (a)", value=0.0, key="a_sim"),
+                              "b": c2.number_input("Limite superior (b)", value=1.0, key="b_sim")}
+            padrao_x1, padrao_x2, padrao_c = 0.25, 0.75, 0.5
+        elif nome_sim == "exponencial":
+            parametros_sim = {"lam": c1.number_input("Taxa (λ)", value=1.0, min_value=0.0, key="lam_exponencial_sim")}
+            padrao_x1, padrao_x2, padrao_c = 0.0, 1.0, 2.0
+        elif nome_sim == "normal":
+            parametros_sim = {"mu": c1.number_input("Média (μ)", value=0.0, key="mu_sim"),
+                              "sigma": c2.number_input("Desvio padrão (σ)", value=1.0, min_value=0.0, key="sigma_sim")}
+            padrao_x1, padrao_x2, padrao_c = -1.0, 1.0, 1.96
+        elif nome_sim == "binomial":
+            parametros_sim = {"n": c1.number_input("Nº de ensaios (n)", value=10, min_value=0, max_value=MAXIMO_N,
+                                                   step=1, key="n_binomial_sim"),
+                              "p": c2.number_input("Probabilidade de sucesso (p)", value=0.5, min_value=0.0,
+                                                   max_value=1.0, key="p_sim")}
+            padrao_x1, padrao_x2, padrao_c = 0.0, 5.0, 3.0
+        else:
+            parametros_sim = {"lam": c1.number_input("Média de ocorrências (λ)", value=3.0, min_value=0.0,
+                                                     max_value=MAXIMO_LAMBDA, key="lam_poisson_sim")}
+            padrao_x1, padrao_x2, padrao_c = 0.0, 3.0, 1.0
+        c1, c2, c3 = st.columns(3)
+        x1_sim = c1.number_input("P(x₁ ≤ X ≤ x₂): x₁", value=padrao_x1, key=f"x1_{nome_sim}_sim")
+        x2_sim = c2.number_input("x₂", value=padrao_x2, key=f"x2_{nome_sim}_sim")
+        c_sim = c3.number_input("Cauda: P(X ≤ c), com c =", value=padrao_c, key=f"c_{nome_sim}_sim")
+        c1, c2 = st.columns(2)
+        n_sim = c1.number_input("Nº de amostras", value=10_000_000, min_value=1_000, max_value=500_000_000,
+                                step=1_000_000, key="n_sim")
+        semente_sim = c2.number_input("Semente", value=SEMENTE_PADRAO, min_value=0, step=1, key="semente_sim")
+        sub_simulacao = st.form_submit_button("Simular", use_container_width=True)
+
+    # Simulação em segundo plano: um novo envio substitui a anterior (ver acompanhar_simulacao)
+    if sub_simulacao:
+        intervalos_sim = [(x1_sim, x2_sim), (-math.inf, c_sim)]
+        parciais_sim = []
+        st.session_state["tarefa_simulacao_dados"] = (nome_sim, parametros_sim, intervalos_sim, parciais_sim)
+        submeter(st.session_state, "tarefa_simulacao", simular_distribuicao, nome_sim, parametros_sim,
+                 int(n_sim), intervalos_sim, int(semente_sim), parciais_sim, descricao="Simulando")
+
+    try:
+        simulacao = acompanhar_simulacao("tarefa_simulacao")
+    except Cancelada:
+        st.info("Simulação cancelada.")
+    except Exception as e:
+        st.error(f"Erro: {e}")
+    else:
+        if simulacao is not None:
+            nome_feito, parametros_feitos, intervalos_feitos, parciais_feitos = simulacao
+            final = parciais_feitos[-1]
+            with medir("render: simulação", amostras=final.n, partes=len(parciais_feitos)):
+                st.success(f"**{final.n:,} amostras** ({len(parciais_feitos)} partes)")
+                st.dataframe(tabela_comparacao(nome_feito, parametros_feitos, final, intervalos_feitos),
+                             hide_index=True, use_container_width=True)
+                # Convergência: estimativa acumulada depois de cada parte, contra o valor analítico
+                media_analitica, _ = media_variancia(nome_feito, **parametros_feitos)
+                indice = pd.Index([r.n for r in parciais_feitos], name="amostras")
+                c1, c2 = st.columns(2)
+                c1.line_chart(pd.DataFrame({"Média simulada": [r.media for r in parciais_feitos],
+                                            "Média analítica": media_analitica}, index=indice))
+                (x1_feito, x2_feito), _ = intervalos_feitos
+                p_analitica = float(probabilidade_intervalo(nome_feito, x1_feito, x2_feito, **parametros_feitos))
+                c2.line_chart(pd.DataFrame({"P simulada": [r.proporcoes[0] for r in parciais_feitos],
+                                            "P analítica": p_analitica}, index=indice))
+
+
+# Estatísticas do cache de tabelas acumuladas (compartilhado entre as sessões do servidor)
+estat_cache = cache_tabelas.estatisticas()
+st.sidebar.caption(
+    f"Cache de tabelas: {estat_cache['acertos']} acertos, {estat_cache['falhas']} falhas "
+    f"({estat_cache['itens']} tabelas, {estat_cache['peso_total'] / 2**20:.1f} MiB)"
+)
+
+if registros_diagnostico is not None:
+    with st.expander("Diagnóstico: tempo e memória por etapa", expanded=True):
+        st.dataframe(tabela_registros(registros_diagnostico), hide_index=True, use_container_width=True)
@@ -1,9 +1,25 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
+
+from ferramentas.arquivos import colunas_arquivo, ler_pares
+from ferramentas.regressao import AcumuladorRegressao
+from ferramentas.diagnostico import iniciar_coleta, medir, tabela_registros
+from ferramentas.sessao import armazem_da_sessao, uso_sessoes
+from ferramentas.aquecimento import iniciar as iniciar_aquecimento
+
+# Aquecimento do servidor, caso esta seja a primeira página aberta (ver ferramentas.aquecimento)
+iniciar_aquecimento()
+
 st.set_page_config(page_title="Regressão Linear", page_icon="📈", layout="wide")
 
 st.title("📈 Regressão Linear")
 st.sidebar.header("Navegação")
 st.sidebar.write("Escolha uma página na barra lateral 👈")
+# Diagnóstico: tempo e memória de cada etapa desta execução (painel no fim da página)
+registros_diagnostico = iniciar_coleta(st.sidebar.toggle("Diagnóstico de desempenho", key="diagnostico"))
+# Pontos digitados: arrays numéricos somente leitura, com orçamento de memória por sessão
+armazem = armazem_da_sessao(st.session_state)
 
 # CSS para o título das subtabs
 st.markdown("""
@@ -23,4 +39,112 @@ tab1, tab2 = st.tabs(["Equação da reta", "Equação do 2° grau"])
 st.markdown("""
 <style>
 button[data-baseweb="tab"] > div[data-testid="stMarkdownContainer"] > p {font-size: 25px;}</style>""", unsafe_allow_html=True)
-        
\ No newline at end of file
+        
+
+def formatar_equacao(coeficientes) -> str:
+    termos = [f"{coeficientes[0]:.4f}"]
+    for potencia, c in zip(["x", "x²"], coeficientes[1:]):
+        termos.append(f"{'-' if c < 0 else '+'} {abs(c):.4f}{potencia}")
+    return "y = " + " ".join(termos)
+
+
+def aba_regressao(grau: int, chave: str):
+    """
+    Entrada dos pontos (tabela ou arquivo), ajuste de grau 'grau' e resultados.
+    Os pontos vão para um AcumuladorRegressao; arquivos são lidos em lotes.
+    """
+    origem = st.radio("Origem dos pontos", ["Tabela", "Arquivo (CSV/XLSX)"], horizontal=True, key=f"origem_{chave}")
+    pontos = None
+    arquivo = None
+
+    if origem == "Tabela":
+        if f"df_{chave}" not in armazem:
+            armazem.guardar(f"df_{chave}", pd.DataFrame({"x": [None], "y": [None]}, dtype=float))
+        with st.form(f"form_{chave}"):
+            st.markdown("### Insira os pontos `x` e `y`.")
+            st.markdown("#### Para adicionar mais linhas, **clique no `+` abaixo da tabela**.")
+            editado = st.data_editor(
+                armazem.obter(f"df_{chave}"),
+                num_rows="dynamic",
+                use_container_width=True,
+                column_config={"x": st.column_config.NumberColumn("x"), "y": st.column_config.NumberColumn("y")},
+                key=f"editor_{chave}",
+            )
+            sub = st.form_submit_button("Calcular", use_container_width=True)
+        armazem.guardar(f"df_{chave}", editado)
+        pontos = editado
+    else:
+        arquivo = st.file_uploader("Arquivo", type=["csv", "xlsx"], key=f"arquivo_{chave}")
+        col_sep, col_dec = st.columns(2)
+        sep = col_sep.selectbox("Separador de colunas (CSV)", [",", ";", "\t"],
+                                format_func=lambda c: "Tab" if c == "\t" else c, key=f"sep_{chave}")
+        dec = col_dec.selectbox("Separador decimal (CSV)", [".", ","], key=f"dec_{chave}")
+        if arquivo is not None:
+            try:
+                colunas = colunas_arquivo(arquivo, sep)
+                col_a, col_b = st.columns(2)
+                col_x = col_a.selectbox("Coluna x", colunas, key=f"col_x_{chave}")
+                col_y = col_b.selectbox("Coluna y", colunas, index=min(1, len(colunas) - 1), key=f"col_y_{chave}")
+            except Exception as e:
+                st.error(f"Não foi possível ler o cabeçalho do arquivo: {e}")
+                arquivo = None
+        with st.form(f"form_arquivo_{chave}"):
+            sub = st.form_submit_button("Calcular", use_container_width=True)
+
+    st.markdown("## Resultados:")
+    if not sub:
+        return
+    try:
+        acumulador = AcumuladorRegressao()
+        if pontos is not None:
+            pontos = pontos.dropna().astype(float)
+            acumulador.adicionar(pontos["x"], pontos["y"])
+        else:
+            if arquivo is None:
+                raise ValueError("Envie um arquivo para calcular.")
+            # Memória constante: cada lote só atualiza as somas do acumulador
+            with medir("arquivo: leitura e somas", arquivo=arquivo.name):
+                for x, y in ler_pares(arquivo, col_x, col_y, sep, dec):
+                    acumulador.adicionar(x, y)
+        ajuste = acumulador.ajustar(grau)
+
+        cards = [("Equação", formatar_equacao(ajuste.coeficientes)),
+                 ("Coeficiente de determinação (R²)", f"{ajuste.r2:.4f}"),
+                 ("R² ajustado", f"{ajuste.r2_ajustado:.4f}" if ajuste.n > grau + 1 else "Indefinido")]
+        if ajuste.correlacao is not None:
+            cards.append(("Coeficiente de correlação (r)", f"{ajuste.correlacao:.4f}"))
+        cards.append(("Erro padrão dos resíduos", f"{ajuste.erro_padrao:.4f}" if ajuste.n > grau + 1 else "Indefinido"))
+        cards.append(("Soma dos quadrados dos resíduos", f"{ajuste.sqr:.4f}"))
+        cards.append(("Nº de pontos", str(ajuste.n)))
+
+        with medir("render: cartões", cartoes=len(cards)):
+            cols = st.columns(2)
+            for i, (titulo, valor) in enumerate(cards):
+                with cols[i % 2]:
+                    st.success(f"**{titulo}:** {valor}")
+
+        # Curva ajustada sobre a faixa de x; pontos digitados aparecem junto
+        x_curva = np.linspace(acumulador.x_min, acumulador.x_max, 200)
+        grafico = pd.DataFrame({"x": x_curva, "Ajuste": ajuste.prever(x_curva)})
+        if pontos is not None:
+            grafico = pd.concat([grafico, pd.DataFrame({"x": pontos["x"], "Pontos": pontos["y"]})],
+                                ignore_index=True)
+        with medir("render: gráfico", pontos=len(grafico)):
+            st.scatter_chart(grafico, x="x", y=[c for c in ("Pontos", "Ajuste") if c in grafico])
+    except Exception as e:
+        st.warning(str(e))
+
+
+with tab1:
+    aba_regressao(1, "reta")
+
+with tab2:
+    aba_regressao(2, "parabola")
+
+if registros_diagnostico is not None:
+    with st.expander("Diagnóstico: tempo e memória por etapa", expanded=True):
+        st.dataframe(tabela_registros(registros_diagnostico), hide_index=True, use_container_width=True)
+        st.markdown("**Tabelas guardadas nesta sessão**")
+        st.dataframe(armazem.uso(), hide_index=True, use_container_width=True)
+        st.markdown("**Todas as sessões do servidor**")
+        st.dataframe(uso_sessoes(), hide_index=True, use_container_width=True)
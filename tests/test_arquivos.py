@@ -0,0 +1,74 @@
+# test_arquivos.py
+"""
+descrever_colunas (e ler_colunas, que reduz o arquivo lote a lote às contagens) deve
+dar, para cada (grupo, coluna), o mesmo resultado de descrever_discreto no modo exato
+sobre os valores daquela coluna; texto em coluna numérica vira vazio.
+"""
+import io
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ferramentas.arquivos import ler_colunas
+from ferramentas.funcoes import descrever_colunas, descrever_colunas_contagens, descrever_discreto
+
+
+def _tabela(semente: int) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    linhas = int(rng.integers(1, 300))
+    df = pd.DataFrame({
+        "escola": rng.choice(["b", "a", "c"], linhas),
+        "nota": rng.integers(0, 40, linhas) / rng.choice([1, 2, 4, 10], linhas),
+        "faltas": rng.integers(0, 5, linhas).astype(float),
+        "idade": np.where(rng.random(linhas) < 0.3, np.nan, rng.integers(10, 13, linhas)),
+    })
+    df["idade"] = df["idade"].astype(object)
+    df.loc[df.index[: linhas // 10], "idade"] = "não informado"
+    return df
+
+
+def _conferir(matriz: pd.DataFrame, df: pd.DataFrame, grupo):
+    for chave, linha in matriz.iterrows():
+        sub, coluna = (df, chave) if grupo is None else (df[df[grupo] == chave[0]], chave[1])
+        valores = pd.to_numeric(sub[coluna], errors="coerce").dropna()
+        assert linha["n"] == len(valores)
+        if len(valores) < 2:
+            continue
+        contagem = valores.value_counts().sort_index()
+        esperado = descrever_discreto(pd.DataFrame({"xi": contagem.index, "fi": contagem.to_numpy(float)}),
+                                      modo="exato")
+        for medida in ("media", "mediana", "variancia", "desvio_padrao", "tipo_moda"):
+            obtido, certo = linha[medida], getattr(esperado, medida)
+            assert obtido == certo or (certo is None and math.isnan(obtido)), (chave, medida, obtido, certo)
+        assert tuple(linha["modas"]) == tuple(esperado.modas or ())
+
+
+@pytest.mark.parametrize("semente", range(20))
+@pytest.mark.parametrize("grupo", [None, "escola"])
+def test_descrever_colunas_igual_descrever_discreto(semente, grupo):
+    df = _tabela(semente)
+    colunas = ["nota", "faltas", "idade"]
+    matriz = descrever_colunas(df, grupo, colunas)
+    assert list(matriz.index.get_level_values("coluna").unique()) == colunas
+    _conferir(matriz, df, grupo)
+
+
+@pytest.mark.parametrize("semente", range(5))
+@pytest.mark.parametrize("grupo", [None, "escola"])
+def test_ler_colunas_em_lotes(semente, grupo):
+    df = _tabela(semente)
+    colunas = ["nota", "faltas", "idade"]
+    csv = df.to_csv(sep=";", decimal=",", index=False).encode()
+    matriz = descrever_colunas(df, grupo, colunas)
+    for tamanho_lote in (1, 7, 10_000):
+        contagens = ler_colunas(io.BytesIO(csv), colunas, grupo, sep=";", decimal=",", tamanho_lote=tamanho_lote)
+        pd.testing.assert_frame_equal(descrever_colunas_contagens(contagens), matriz)
+
+
+def test_texto_em_coluna_numerica_vira_vazio():
+    csv = b"x;y\n1,5;a\nabc;2\n;3\n2,5;4\n"
+    matriz = descrever_colunas_contagens(ler_colunas(io.BytesIO(csv), ["x", "y"], sep=";", decimal=","))
+    assert matriz["n"].tolist() == [2, 3]
+    assert matriz["media"].tolist() == [2.0, 3.0]
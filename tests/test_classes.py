@@ -0,0 +1,74 @@
+# test_classes.py
+"""
+construir_classes deve cobrir todos os valores com classes contíguas de mesma amplitude,
+inclusive nos casos de borda: todos os valores iguais, IQR zero e o limite de classes.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ferramentas.funcoes import MAXIMO_CLASSES, construir_classes
+
+
+def _conferir_cobertura(tabela: pd.DataFrame, valores: np.ndarray):
+    li, ls, fi = (tabela[c].to_numpy() for c in ("Li", "Ls", "fi"))
+    assert fi.sum() == valores.size
+    assert li[0] <= valores.min() and valores.max() <= ls[-1]
+    np.testing.assert_array_equal(ls[:-1], li[1:])
+    np.testing.assert_allclose(ls - li, ls[0] - li[0], rtol=1e-9)
+
+
+@pytest.mark.parametrize("regra, largura", [("sturges", None), ("fd", None), ("largura", 2.5)])
+@pytest.mark.parametrize("semente", range(5))
+def test_cobre_todos_os_valores(regra, largura, semente):
+    valores = np.random.default_rng(semente).lognormal(3.0, 0.7, size=777)
+    tabela = construir_classes(valores, regra, largura)
+    _conferir_cobertura(tabela, valores)
+    if regra == "sturges":
+        assert len(tabela) == math.ceil(math.log2(valores.size)) + 1
+        assert tabela["Ls"].iloc[-1] == valores.max()  # o máximo entra na última classe
+    elif regra == "largura":
+        assert tabela["Li"].iloc[0] == valores.min()
+        assert tabela["Ls"].iloc[0] - tabela["Li"].iloc[0] == pytest.approx(2.5, rel=1e-12)
+
+
+@pytest.mark.parametrize("regra, largura", [("sturges", None), ("fd", None)])
+def test_todos_iguais_uma_classe_em_torno_do_valor(regra, largura):
+    tabela = construir_classes([7.0] * 12, regra, largura)
+    assert tabela.to_dict("list") == {"Li": [6.5], "Ls": [7.5], "fi": [12.0]}
+
+
+def test_todos_iguais_com_largura():
+    tabela = construir_classes([7.0] * 12, "largura", 0.5)
+    assert tabela.to_dict("list") == {"Li": [7.0], "Ls": [7.5], "fi": [12.0]}
+
+
+def test_fd_com_iqr_zero_usa_sturges():
+    # Mais da metade dos valores iguais: Q1 = Q3 e a largura de Freedman–Diaconis seria zero
+    valores = np.array([5.0] * 90 + [1.0, 100.0])
+    assert np.subtract(*np.percentile(valores, [75, 25])) == 0
+    pd.testing.assert_frame_equal(construir_classes(valores, "fd"), construir_classes(valores, "sturges"))
+
+
+def test_limite_de_classes():
+    valores = np.arange(MAXIMO_CLASSES, dtype=float)  # 0..999 com largura 1: exatamente o máximo
+    assert len(construir_classes(valores, "largura", 1.0)) == MAXIMO_CLASSES
+    with pytest.raises(ValueError, match="máximo"):
+        construir_classes(np.append(valores, MAXIMO_CLASSES), "largura", 1.0)
+    # Freedman–Diaconis com um valor extremo: IQR pequeno e amplitude enorme
+    with pytest.raises(ValueError, match="máximo"):
+        construir_classes(np.append(np.random.default_rng(0).normal(size=1000), 1e9), "fd")
+
+
+@pytest.mark.parametrize("valores, regra, largura, mensagem", [
+    ([], "sturges", None, "Nenhum número"),
+    ([np.nan, np.inf], "sturges", None, "Nenhum número"),
+    ([1.0, 2.0], "raiz", None, "desconhecida"),
+    ([1.0, 2.0], "largura", None, "largura"),
+    ([1.0, 2.0], "largura", -1.0, "largura"),
+])
+def test_entradas_invalidas(valores, regra, largura, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        construir_classes(valores, regra, largura)
@@ -0,0 +1,89 @@
+# test_funcoes.py
+"""
+arredondar_array deve dar, valor a valor, o mesmo resultado de arredondar (HALF_UP com
+Decimal), inclusive nos empates, no sinal do zero e nos valores não finitos.
+"""
+import io
+import math
+from decimal import InvalidOperation
+
+import numpy as np
+import pytest
+
+from ferramentas.funcoes import _blocos_texto, arredondar, arredondar_array, contar_numeros
+
+
+def _referencia(valor: float, casas: int) -> float:
+    # arredondar não aceita inf/NaN nem valores além da precisão do Decimal:
+    # nesses casos arredondar_array devolve o valor como veio
+    if not math.isfinite(valor):
+        return valor
+    try:
+        return arredondar(valor, casas)
+    except InvalidOperation:
+        return valor
+
+
+def _conferir(valores, casas: int):
+    valores = np.asarray(valores, dtype=np.float64)
+    obtido = arredondar_array(valores, casas)
+    esperado = np.array([_referencia(float(v), casas) for v in valores])
+    iguais = (obtido == esperado) & (np.signbit(obtido) == np.signbit(esperado))
+    iguais |= np.isnan(obtido) & np.isnan(esperado)
+    diferentes = [(float(v), float(o), float(e)) for v, o, e in zip(valores[~iguais], obtido[~iguais], esperado[~iguais])]
+    assert not diferentes, diferentes[:10]
+
+
+CASAS = range(7)
+
+
+@pytest.mark.parametrize("casas", CASAS)
+def test_valores_aleatorios(casas):
+    rng = np.random.default_rng(casas)
+    valores = np.concatenate([
+        rng.normal(0, 1, 5_000),
+        rng.normal(0, 1e4, 5_000),
+        rng.uniform(-1, 1, 5_000) * 10.0 ** rng.integers(-8, 12, 5_000),
+        np.round(rng.uniform(-1000, 1000, 5_000), casas + 1),  # muitos com dígito final 5
+    ])
+    _conferir(valores, casas)
+
+
+@pytest.mark.parametrize("casas", CASAS)
+def test_empates(casas):
+    # k + 0.5 na última casa: os empates exatos e os que o binário deixa um ulp abaixo/acima
+    k = np.arange(-2_000, 2_000, dtype=np.float64)
+    empates = (k + 0.5) / 10.0 ** casas
+    valores = np.concatenate([empates, np.nextafter(empates, np.inf), np.nextafter(empates, -np.inf)])
+    _conferir(valores, casas)
+
+
+@pytest.mark.parametrize("casas", CASAS)
+def test_casos_especiais(casas):
+    valores = [1.005, 2.675, -1.005, -2.675, 0.125, 0.0, -0.0, -1e-12, 1e-12,
+               np.nan, np.inf, -np.inf, 2.0 ** 52, 2.0 ** 53 + 1, 1e15 + 0.5, 1e300, -1e300, 1.7976931348623157e308,
+               5e-324, 123456789.0125]
+    _conferir(valores, casas)
+
+
+def test_formato_preservado():
+    tabela = np.array([[1.005, 2.675], [np.nan, -0.0]])
+    obtido = arredondar_array(tabela)
+    assert obtido.shape == tabela.shape
+    assert obtido[0].tolist() == [1.01, 2.68]
+
+
+@pytest.mark.parametrize("tamanho_bloco", [1, 2, 3, 5, 64])
+def test_blocos_nao_cortam_caracteres_multibyte(tamanho_bloco):
+    texto = "1€2 ç 3,5 — 10 ção 7"
+    dados = texto.encode()
+    for fonte in (dados, io.BytesIO(dados), [dados[i:i + tamanho_bloco] for i in range(0, len(dados), tamanho_bloco)]):
+        assert "".join(_blocos_texto(fonte, tamanho_bloco)) == texto
+    frequencias = contar_numeros(dados, tamanho_bloco=tamanho_bloco)
+    assert frequencias["xi"].tolist() == [1.0, 2.0, 3.5, 7.0, 10.0]
+
+
+@pytest.mark.parametrize("dados", [b"12 \xff 3", b"12 \xe2\x82", b"ab\xe2A"])
+def test_bytes_invalidos_sao_informados(dados):
+    with pytest.raises(ValueError, match="UTF-8"):
+        list(_blocos_texto(dados, 2))
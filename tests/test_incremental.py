@@ -0,0 +1,136 @@
+# test_incremental.py
+"""
+Os agregados incrementais devem dar, depois de qualquer sequência de edições, o mesmo
+resultado de descrever_discreto / descrever_agrupado no modo exato sobre a tabela final.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ferramentas.funcoes import descrever_agrupado, descrever_discreto
+from ferramentas.incremental import AgregadoClasses, AgregadoDiscreto
+
+
+def _editar(df: pd.DataFrame, rng, gerar_linha) -> pd.DataFrame:
+    # Uma edição como as do st.data_editor: altera uma linha, acrescenta ou remove
+    df = df.copy()
+    acao = rng.integers(3)
+    if acao == 0 and len(df):
+        df.loc[df.index[rng.integers(len(df))]] = gerar_linha()
+    elif acao == 1 or len(df) < 2:
+        df.loc[df.index.max() + 1 if len(df) else 0] = gerar_linha()
+    else:
+        df = df.drop(df.index[rng.integers(len(df))])
+    return df
+
+
+def test_discreto_empate_apos_edicoes():
+    # Contagens {2: 8, 3: 4, 4: 2, 5: 3}: variância exata 1.375 (cartão 1.38)
+    agregado = AgregadoDiscreto()
+    agregado.atualizar(pd.DataFrame({"xi": [2.0, 3.0, 4.0, 5.0], "fi": [8.0, 1.0, 2.0, 3.0]}))
+    agregado.atualizar(pd.DataFrame({"xi": [2.0, 3.0, 4.0, 5.0], "fi": [8.0, 4.0, 2.0, 3.0]}))
+    assert agregado.reconstrucoes == 1
+    assert agregado.variancia() == 1.375
+    assert agregado.descrever(["variancia"]).variancia == 1.38
+
+
+def test_classes_empates_apos_edicoes():
+    # Média 10.025 (cartão 10.03) e variância exata 0.015 (cartão 0.01)
+    agregado = AgregadoClasses()
+    agregado.atualizar(pd.DataFrame({"Li": [9.9, 10.0], "Ls": [10.1, 10.2], "fi": [1.0, 1.0]}))
+    final = pd.DataFrame({"Li": [9.9, 10.0], "Ls": [10.1, 10.2], "fi": [3.0, 1.0]})
+    agregado.atualizar(final)
+    assert agregado.descrever() == descrever_agrupado(final, modo="exato")
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_discreto_edicoes_igual_descrever(semente):
+    rng = np.random.default_rng(semente)
+
+    def linha():
+        # Poucas casas decimais e valores repetidos: empates de arredondamento são comuns
+        return [float(rng.integers(0, 12)) / rng.choice([1, 2, 4, 10]), float(rng.integers(0, 6))]
+
+    df = pd.DataFrame([linha() for _ in range(rng.integers(2, 30))], columns=["xi", "fi"])
+    agregado = AgregadoDiscreto()
+    agregado.atualizar(df)
+    for _ in range(25):
+        df = _editar(df, rng, linha)
+        agregado.atualizar(df)
+        if (df["fi"].astype(np.int64) > 0).sum() < 2 or df["fi"].astype(np.int64).sum() < 2:
+            continue
+        esperado = descrever_discreto(df, modo="exato")
+        assert agregado.descrever() == esperado
+        novo = AgregadoDiscreto()
+        novo.atualizar(df)
+        assert agregado.variancia() == novo.variancia()
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_classes_edicoes_igual_descrever(semente):
+    rng = np.random.default_rng(semente)
+
+    def linha():
+        li = float(rng.integers(0, 400)) / rng.choice([1, 10, 100])
+        return [li, li + float(rng.integers(1, 30)) / rng.choice([1, 10, 100]), float(rng.integers(1, 8))]
+
+    df = pd.DataFrame([linha() for _ in range(rng.integers(2, 12))], columns=["Li", "Ls", "fi"])
+    agregado = AgregadoClasses()
+    agregado.atualizar(df)
+    for _ in range(25):
+        df = _editar(df, rng, linha)
+        agregado.atualizar(df)
+        if df["fi"].sum() < 2:
+            continue
+        assert agregado.descrever() == descrever_agrupado(df, modo="exato")
+
+
+def _editar_no_editor(df: pd.DataFrame, rng, gerar_linha):
+    # Estado como o de st.session_state[key] do st.data_editor e a tabela que ele devolve:
+    # edições e remoções por posição na tabela recebida, linhas novas no fim
+    editadas = {int(p): dict(zip(df.columns, gerar_linha())) for p in rng.choice(len(df), 2)}
+    apagadas = sorted({int(p) for p in rng.choice(len(df), rng.integers(0, 2))})
+    novas = [dict(zip(df.columns, gerar_linha())) for _ in range(rng.integers(0, 3))]
+    editado = df.copy()
+    for pos, valores in editadas.items():
+        editado.iloc[pos] = list(valores.values())
+    editado = editado.drop(df.index[apagadas])
+    if novas:
+        inicio = int(df.index.max()) + 1
+        editado = pd.concat([editado, pd.DataFrame(novas, index=range(inicio, inicio + len(novas)))])
+    estado = {"edited_rows": {str(p): v for p, v in editadas.items()}, "added_rows": novas,
+              "deleted_rows": apagadas}
+    return editado, estado
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_discreto_estado_do_editor_sem_comparar_tudo(semente, monkeypatch):
+    rng = np.random.default_rng(semente)
+
+    def linha():
+        return [float(rng.integers(0, 12)) / rng.choice([1, 2, 4]), float(rng.integers(1, 6))]
+
+    df = pd.DataFrame([linha() for _ in range(200)], columns=["xi", "fi"])
+    agregado = AgregadoDiscreto()
+    agregado.atualizar(df)
+
+    def comparar_tudo(*_):
+        raise AssertionError("comparou a tabela inteira")
+
+    monkeypatch.setattr(AgregadoDiscreto, "_diferencas", staticmethod(comparar_tudo))
+    for _ in range(15):
+        df, estado = _editar_no_editor(df, rng, linha)
+        agregado.atualizar(df, estado)
+        assert agregado.reconstrucoes == 1
+        assert agregado.descrever() == descrever_discreto(df, modo="exato")
+
+
+def test_estado_que_nao_fecha_compara_tudo():
+    # Estado de outra tabela (ex.: o agregado não viu a tabela passada ao editor)
+    df = pd.DataFrame({"Li": [0.0, 2.0, 4.0], "Ls": [2.0, 4.0, 6.0], "fi": [1.0, 3.0, 2.0]})
+    agregado = AgregadoClasses()
+    agregado.atualizar(df)
+    final = pd.DataFrame({"Li": [0.0, 2.0], "Ls": [2.0, 4.0], "fi": [5.0, 3.0]})
+    estado = {"edited_rows": {"0": {"fi": 5.0}}, "added_rows": [], "deleted_rows": []}
+    assert agregado.atualizar(final, estado) == 2
+    assert agregado.descrever() == descrever_agrupado(final, modo="exato")
@@ -0,0 +1,112 @@
+# test_probabilidade.py
+"""
+PMFs discretas contra referências em Decimal (60 dígitos): ln k! exato para k pequeno e
+série de Stirling acima, suficiente para n e λ até 1e15. CDFs e quantis com suporte grande
+demais para tabelar contra somas exatas (math.fsum) da PMF.
+"""
+import math
+import tracemalloc
+from decimal import Decimal, localcontext
+
+import numpy as np
+import pytest
+
+from ferramentas.probabilidade import (
+    _LIMITE_TABELA, acumulada, binomial_pmf, densidade, poisson_pmf, quantil, tabela_poisson
+)
+
+
+def _ln_fatorial(k: int) -> Decimal:
+    if k < 200:
+        return Decimal(math.factorial(k)).ln()
+    k = Decimal(k)
+    k2 = k * k
+    return ((k + Decimal("0.5")) * k.ln() - k + (2 * Decimal(math.pi)).ln() / 2
+            + 1 / (12 * k) - 1 / (360 * k * k2) + 1 / (1260 * k * k2 * k2))
+
+
+def _binomial_referencia(k: int, n: int, p: float) -> float:
+    with localcontext() as ctx:
+        ctx.prec = 60
+        p = Decimal(p)
+        return float((_ln_fatorial(n) - _ln_fatorial(k) - _ln_fatorial(n - k)
+                      + k * p.ln() + (n - k) * (1 - p).ln()).exp())
+
+
+def _poisson_referencia(k: int, lam: float) -> float:
+    with localcontext() as ctx:
+        ctx.prec = 60
+        lam = Decimal(lam)
+        return float((k * lam.ln() - lam - _ln_fatorial(k)).exp())
+
+
+@pytest.mark.parametrize("n, p", [(1, 0.5), (7, 0.3), (50, 0.01), (1000, 0.5), (10**6, 0.3),
+                                  (10**9, 0.5), (10**12, 1e-9), (10**15, 0.2)])
+def test_binomial_pmf_precisa(n, p):
+    media, desvio = n * p, math.sqrt(n * p * (1 - p))
+    ks = {0, n} | {int(min(n, max(0, round(media + z * desvio)))) for z in np.linspace(-8, 8, 17)}
+    for k in sorted(ks):
+        referencia = _binomial_referencia(k, n, p)
+        if referencia > 1e-300:
+            assert binomial_pmf(k, n, p) == pytest.approx(referencia, rel=1e-12)
+
+
+@pytest.mark.parametrize("lam", [0.1, 3.0, 40.0, 1e4, 1e9, 1e12, 1e15])
+def test_poisson_pmf_precisa(lam):
+    ks = {0} | {int(max(0, round(lam + z * math.sqrt(lam)))) for z in np.linspace(-8, 8, 17)}
+    for k in sorted(ks):
+        referencia = _poisson_referencia(k, lam)
+        if referencia > 1e-300:
+            assert poisson_pmf(k, lam) == pytest.approx(referencia, rel=1e-12)
+
+
+@pytest.mark.parametrize("n, p", [(10**8, 0.3), (10**9, 0.5)])
+def test_binomial_massa_total(n, p):
+    # Com diferenças de ln k! a massa já perdia 5e-7 em n = 1e9 (e 0.3% em n = 1e12)
+    media, desvio = n * p, math.sqrt(n * p * (1 - p))
+    ks = np.arange(math.floor(media - 40 * desvio), math.ceil(media + 40 * desvio) + 1, dtype=float)
+    assert math.fsum(binomial_pmf(ks, n, p)) == pytest.approx(1.0, abs=1e-12)
+
+
+@pytest.mark.parametrize("nome, parametros, media, desvio", [
+    ("poisson", {"lam": 1e9}, 1e9, math.sqrt(1e9)),
+    ("binomial", {"n": 4 * 10**9, "p": 0.5}, 2e9, math.sqrt(1e9)),
+])
+def test_cdf_sem_tabela_igual_soma(nome, parametros, media, desvio):
+    # Suporte de ~2.5M inteiros: acima de _LIMITE_TABELA, a CDF sai da quadratura
+    assert 80 * desvio > _LIMITE_TABELA
+    inicio = math.floor(media - 40 * desvio)
+    ks = [round(media + z * desvio) for z in (-8.0, -3.0, -0.5, 0.0, 2.0)]
+    pmf = densidade(nome, np.arange(inicio, ks[-1] + 1, dtype=float), **parametros).tolist()
+    somas, anterior = [], 0
+    for k in ks:
+        somas.append(math.fsum(pmf[anterior:k - inicio + 1]))
+        anterior = k - inicio + 1
+        assert acumulada(nome, k, **parametros) == pytest.approx(math.fsum(somas), rel=1e-12)
+
+
+@pytest.mark.parametrize("nome, parametros, media, desvio", [
+    ("binomial", {"n": 10**15, "p": 0.2}, 2e14, math.sqrt(1.6e14)),
+    ("poisson", {"lam": 1e15}, 1e15, math.sqrt(1e15)),
+])
+def test_suporte_enorme_sem_alocar(nome, parametros, media, desvio):
+    # A tabela teria ~1e9 pontos (8 GiB); CDF e quantis saem em memória constante
+    tracemalloc.start()
+    try:
+        k = np.round(media + desvio * np.linspace(-5, 5, 21))
+        passo = acumulada(nome, k, **parametros) - acumulada(nome, k - 1, **parametros)
+        q = np.array([1e-9, 0.025, 0.5, 0.975])
+        x_q = quantil(nome, q, **parametros)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert pico < 16 * 2**20
+    np.testing.assert_allclose(passo, densidade(nome, k, **parametros), rtol=0, atol=1e-14)
+    assert np.all(acumulada(nome, x_q, **parametros) >= q)
+    assert np.all(acumulada(nome, x_q - 1, **parametros) < q)
+    np.testing.assert_allclose((x_q[1:] - media) / desvio, [-1.959964, 0.0, 1.959964], atol=1e-5)
+
+
+def test_tabela_recusa_suporte_grande():
+    with pytest.raises(ValueError, match="grande demais"):
+        tabela_poisson(1e15)
@@ -0,0 +1,83 @@
+# test_quantis.py
+"""
+O esboço KLL deve respeitar o erro de posto erro_posto(k), também depois de mesclar
+esboços de partes diferentes; mínimo, máximo e n continuam exatos.
+"""
+import numpy as np
+import pytest
+
+from ferramentas.quantis import EsbocoQuantis, descrever_aproximado, erro_posto
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def _erro_de_posto(ordenados: np.ndarray, q: np.ndarray, estimados: np.ndarray) -> float:
+    # Distância entre q e o intervalo de postos [esquerda, direita] que o valor estimado ocupa
+    # nos dados (com valores repetidos, qualquer posto dentro do intervalo é correto)
+    n = ordenados.size
+    esquerda = np.searchsorted(ordenados, estimados, side="left") / n
+    direita = np.searchsorted(ordenados, estimados, side="right") / n
+    return float(np.max(np.maximum(esquerda - q, 0) + np.maximum(q - direita, 0)))
+
+
+def _dados(semente: int, n: int) -> np.ndarray:
+    rng = np.random.default_rng(semente)
+    tipo = semente % 3
+    if tipo == 0:
+        return rng.normal(size=n)
+    if tipo == 1:
+        return rng.lognormal(sigma=2.0, size=n)
+    return rng.integers(0, 50, size=n).astype(float)  # muitos empates
+
+
+@pytest.mark.parametrize("semente", range(6))
+@pytest.mark.parametrize("k", [50, 200])
+def test_erro_de_posto_dentro_do_limite(semente, k):
+    dados = _dados(semente, 200_000)
+    esboco = EsbocoQuantis(k, semente=semente)
+    for bloco in np.array_split(dados, 37):
+        esboco.adicionar(bloco)
+    ordenados = np.sort(dados)
+    assert esboco.n == dados.size
+    assert esboco.itens_guardados <= 3 * k + 20
+    assert _erro_de_posto(ordenados, QS, esboco.quantil(QS)) <= erro_posto(k)
+    postos = np.array([esboco.posto(x) for x in ordenados[::5000]])
+    reais = np.searchsorted(ordenados, ordenados[::5000], side="right") / dados.size
+    assert np.max(np.abs(postos - reais)) <= erro_posto(k)
+
+
+@pytest.mark.parametrize("semente", range(6))
+def test_mesclar_partes_dentro_do_limite(semente):
+    # Um esboço por parte (como um por arquivo ou processo), de tamanhos bem diferentes
+    dados = _dados(semente, 150_000)
+    cortes = np.sort(np.random.default_rng(semente).choice(dados.size, 7, replace=False))
+    partes = np.split(dados, cortes)
+    esbocos = [EsbocoQuantis(200, semente=semente + i).adicionar(p) for i, p in enumerate(partes)]
+    mesclado = esbocos[0]
+    for outro in esbocos[1:]:
+        mesclado.mesclar(outro)
+    assert mesclado.n == dados.size
+    assert (mesclado.minimo, mesclado.maximo) == (dados.min(), dados.max())
+    assert mesclado.quantil(0.0) == dados.min() and mesclado.quantil(1.0) == dados.max()
+    assert mesclado.itens_guardados <= 3 * 200 + 20
+    assert _erro_de_posto(np.sort(dados), QS, mesclado.quantil(QS)) <= erro_posto(200)
+
+
+def test_mesclar_exige_mesmo_k_e_aceita_vazio():
+    esboco = EsbocoQuantis(200, semente=0).adicionar(np.arange(1000.0))
+    with pytest.raises(ValueError):
+        esboco.mesclar(EsbocoQuantis(100))
+    esboco.mesclar(EsbocoQuantis(200))
+    assert esboco.n == 1000
+    assert EsbocoQuantis(200).mesclar(esboco).quantil(0.5) == pytest.approx(500, abs=1000 * erro_posto(200))
+
+
+def test_descrever_aproximado_momentos_sem_esboco():
+    # Média e variância vêm de todos os valores, não do esboço
+    dados = np.random.default_rng(7).normal(1e6, 3.0, size=300_000)
+    r = descrever_aproximado(np.array_split(dados, 11), percentis=(90,))
+    assert r.n == dados.size
+    assert r.media == pytest.approx(dados.mean(), rel=1e-14)
+    assert r.variancia == pytest.approx(dados.var(ddof=1), rel=1e-9)
+    assert _erro_de_posto(np.sort(dados), np.array([0.25, 0.5, 0.75, 0.9]),
+                          np.array([*r.quartis, r.percentis[90]])) <= r.erro_posto
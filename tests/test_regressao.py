@@ -0,0 +1,82 @@
+# test_regressao.py
+"""
+O ajuste em blocos deve coincidir com np.polynomial.Polynomial.fit no mesmo conjunto de
+pontos, qualquer que seja a divisão em blocos, inclusive com blocos em escalas distintas.
+"""
+import numpy as np
+import pytest
+
+from ferramentas.regressao import AcumuladorRegressao, ajustar_regressao
+
+
+def _referencia(x: np.ndarray, y: np.ndarray, grau: int, origem: float):
+    # Ajuste do numpy em t = x - origem (subtração exata nos dados dos testes): em x cru,
+    # o mapeamento de Polynomial.fit para [-1, 1] arredonda t já na 8ª casa
+    t = x - origem
+    polinomio = np.polynomial.Polynomial.fit(t, y, grau)
+    sqr = float(np.sum((y - polinomio(t)) ** 2))
+    sqt = float(np.sum((y - y.mean()) ** 2))
+    return lambda z: polinomio(np.asarray(z) - origem), sqr, 1 - sqr / sqt
+
+
+def _em_blocos(x: np.ndarray, y: np.ndarray, cortes) -> AcumuladorRegressao:
+    acumulador = AcumuladorRegressao()
+    for bx, by in zip(np.split(x, cortes), np.split(y, cortes)):
+        acumulador.adicionar(bx, by)
+    return acumulador
+
+
+@pytest.mark.parametrize("grau", [1, 2])
+@pytest.mark.parametrize("deslocamento", [0.0, 2000.0, 1.7e9])
+@pytest.mark.parametrize("cortes", [[], [1], [3, 500, 501, 9000]])
+def test_igual_polynomial_fit(grau, deslocamento, cortes):
+    rng = np.random.default_rng(grau)
+    x = deslocamento + rng.uniform(-50, 50, size=10_000)
+    t = x - deslocamento
+    y = 3.0 - 0.5 * t + (0.02 * t * t if grau == 2 else 0.0) + rng.normal(0, 2.0, size=x.size)
+    polinomio, sqr, r2 = _referencia(x, y, grau, deslocamento)
+    ajuste = _em_blocos(x, y, cortes).ajustar(grau)
+    assert ajuste.n == x.size
+    assert ajuste.sqr == pytest.approx(sqr, rel=1e-10)
+    assert ajuste.r2 == pytest.approx(r2, rel=1e-10)
+    np.testing.assert_allclose(ajuste.prever(x), polinomio(x), rtol=0, atol=1e-8 * np.abs(y).max())
+
+
+@pytest.mark.parametrize("grau, tolerancia", [(1, 1e-9), (2, 1e-3)])
+def test_primeiro_bloco_longe_dos_demais(grau, tolerancia):
+    # Com o deslocamento fixado pelo primeiro bloco ([0, 1]), Σdx² perdia tudo: sqr = 0, r² = 1.
+    # No grau 2 a curvatura vem só da largura do bloco distante (±1e3 em 1e9): as equações
+    # normais elevam o condicionamento ao quadrado, e a tolerância reflete isso
+    rng = np.random.default_rng(5)
+    xb = 1e9 + rng.uniform(-1e3, 1e3, size=100_000)
+    yb = 0.25 * (xb - 1e9) + rng.normal(0, 10.0, size=xb.size)
+    x = np.concatenate([[0.0, 1.0], xb])
+    y = np.concatenate([[0.0, 1.0], yb])
+    polinomio, sqr, r2 = _referencia(x, y, grau, 1e9)
+    ajuste = _em_blocos(x, y, [2]).ajustar(grau)
+    assert 0 < ajuste.sqr == pytest.approx(sqr, rel=tolerancia)
+    assert ajuste.r2 == pytest.approx(r2, rel=tolerancia) and ajuste.r2 < 1
+    np.testing.assert_allclose(ajuste.prever(xb), polinomio(xb), rtol=0, atol=tolerancia * np.abs(yb).max())
+
+
+def test_ordem_dos_blocos_nao_importa():
+    rng = np.random.default_rng(11)
+    partes = [(rng.normal(m, 1.0, size=s), rng.normal(size=s)) for m, s in [(0, 5), (300, 3000), (-40, 700)]]
+    ajustes = [AcumuladorRegressao() for _ in range(2)]
+    for bx, by in partes:
+        ajustes[0].adicionar(bx, by)
+    for bx, by in reversed(partes):
+        ajustes[1].adicionar(bx, by)
+    a, b = (acumulador.ajustar(2) for acumulador in ajustes)
+    assert a.sqr == pytest.approx(b.sqr, rel=1e-9)
+    for bx, _ in partes:
+        np.testing.assert_allclose(a.prever(bx), b.prever(bx), rtol=1e-9)
+
+
+def test_ignora_vazios_e_rejeita_x_constante():
+    ajuste = ajustar_regressao([1.0, np.nan, 2.0, 3.0], [2.0, 5.0, np.nan, 6.0])
+    assert ajuste.n == 2
+    np.testing.assert_allclose(ajuste.coeficientes, [0.0, 2.0], atol=1e-12)
+    acumulador = AcumuladorRegressao().adicionar([0.1] * 7, np.arange(7.0)).adicionar([0.1] * 5, np.arange(5.0))
+    with pytest.raises(ValueError, match="iguais"):
+        acumulador.ajustar(1)
@@ -0,0 +1,96 @@
+# test_resumo.py
+"""
+Mesclar resumos de partes deve dar o mesmo resultado do cálculo sobre os dados
+concatenados (descrever_discreto no modo exato), qualquer que seja a divisão.
+"""
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ferramentas.funcoes import descrever_discreto, variancia_df
+from ferramentas.resumo import ResumoDiscreto, mesclar_resumos
+
+
+@pytest.mark.parametrize("xi, fi, variancia", [
+    ([2.0, 0.3], [1.0, 1.0], 1.45),
+    ([0.5, 2.0, 4.0], [6.0, 1.0, 1.0], 1.63),
+])
+def test_empates_iguais_ao_calculo_direto(xi, fi, variancia):
+    df = pd.DataFrame({"xi": xi, "fi": fi})
+    inteiro = ResumoDiscreto.de_tabela(df)
+    por_linha = mesclar_resumos(ResumoDiscreto.de_tabela(df.iloc[[i]]) for i in range(len(df)))
+    assert inteiro.variancia() == por_linha.variancia() == variancia_df(df, modo="exato")
+    assert inteiro.descrever().variancia == variancia
+
+
+@pytest.mark.parametrize("semente", range(30))
+def test_mesclar_igual_concatenado(semente):
+    rng = np.random.default_rng(semente)
+    linhas = int(rng.integers(2, 40))
+    df = pd.DataFrame({
+        "xi": rng.integers(0, 50, linhas) / rng.choice([1, 2, 4, 10, 100], linhas),
+        "fi": rng.integers(0, 6, linhas).astype(float) + rng.choice([0.0, 0.5], linhas),
+    })
+    if df["fi"].astype(np.int64).sum() < 2:
+        df.loc[len(df)] = [1.0, 2.0]
+    esperado = descrever_discreto(df, modo="exato")
+
+    # Divisão aleatória em partes, mescladas em ordem aleatória; e linha a linha
+    cortes = np.sort(rng.choice(np.arange(1, len(df)), size=min(3, len(df) - 1), replace=False))
+    limites = [0, *cortes, len(df)]
+    partes = [ResumoDiscreto.de_tabela(df.iloc[a:b]) for a, b in zip(limites, limites[1:])]
+    rng.shuffle(partes)
+    assert mesclar_resumos(partes).descrever() == esperado
+    linha_a_linha = mesclar_resumos(ResumoDiscreto.de_tabela(df.iloc[[i]]) for i in range(len(df)))
+    assert linha_a_linha.descrever() == esperado
+
+
+def test_resumo_vai_e_volta_por_pickle():
+    # ferramentas.lote envia os resumos entre processos
+    resumo = ResumoDiscreto.de_valores([1.5, 2.0, 2.0, 7.25])
+    copia = pickle.loads(pickle.dumps(resumo))
+    assert copia.descrever() == resumo.descrever()
+
+
+def test_memoria_limitada_com_muitos_valores_distintos():
+    # 60k valores distintos em 12 partes: mediana pelo esboço, moda pelos contadores
+    from ferramentas import resumo as modulo
+    from ferramentas.quantis import erro_posto
+
+    rng = np.random.default_rng(3)
+    valores = np.concatenate([rng.normal(50.0, 10.0, 60_000).round(6), np.full(5_000, 42.0)])
+    rng.shuffle(valores)
+    partes = [ResumoDiscreto.de_valores(p) for p in np.array_split(valores, 12)]
+    assert not partes[0].aproximado
+    total = mesclar_resumos(partes)
+    assert total.aproximado
+    assert len(total.contagens) <= modulo.LIMITE_VALORES
+    assert total.esboco.itens_guardados <= 3 * total.esboco.k + 64
+    assert total.n == valores.size
+    assert total.variancia() == variancia_df(pd.DataFrame({"xi": valores, "fi": 1.0}), modo="exato")
+    ordenados = np.sort(valores)
+    posto = np.searchsorted(ordenados, total.mediana(), side="right") / valores.size
+    assert abs(posto - 0.5) <= erro_posto(modulo.K_PADRAO)
+    assert total.moda() == ([42.0], "unimodal")
+    assert total.contagens[42.0] + total.descontado >= 5_000 >= total.contagens[42.0]
+
+
+def test_linha_total_no_mesmo_modo_das_linhas(tmp_path, monkeypatch):
+    # Acima de LIMITE_EXATO linhas o modo "auto" passaria ao rápido; o total é exato
+    from ferramentas import lote
+    from ferramentas.lote import _linha_total, processar_arquivo
+
+    modos = []
+    monkeypatch.setattr(lote, "descrever_discreto", lambda df, modo="auto": modos.append(modo) or
+                        descrever_discreto(df, modo=modo))
+    caminho = tmp_path / "valores.csv"
+    valores = 1e8 + np.random.default_rng(1).integers(0, 7, 5_000) / 10
+    pd.DataFrame({"v": valores}).to_csv(caminho, index=False)
+    linha, resumo = processar_arquivo(str(caminho), resumir=True)
+    total = _linha_total(resumo)
+    campos = ["n", "media", "mediana", "modas", "tipo_moda", "variancia", "desvio_padrao", "coeficiente_variacao"]
+    assert "erro" not in linha and "erro" not in total
+    assert [linha[c] for c in campos] == [total[c] for c in campos]
+    assert modos == ["exato"]
@@ -0,0 +1,89 @@
+# test_sessao.py
+"""
+As tabelas guardadas no armazém da sessão são somente leitura e independentes do
+DataFrame de origem.
+"""
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ferramentas.sessao import ArmazemSessao, TabelaCompacta
+
+
+def test_tabela_nao_acompanha_o_df_de_origem():
+    df = pd.DataFrame({"x": [1.0, 2.0], "n": [1, 2], "t": ["1", "a"]}, index=pd.Index([5, 7]))
+    tabela = TabelaCompacta.de_df(df)
+    df.loc[5, "x"] = 99.0
+    df.loc[5, "n"] = 42
+    guardada = tabela.para_df()
+    assert guardada["x"].tolist() == [1.0, 2.0]
+    assert guardada["n"].tolist() == [1, 2]
+    assert np.isnan(guardada.loc[7, "t"])
+    assert not any(np.shares_memory(a, df[c].to_numpy()) for a, c in zip(tabela.arrays, df.columns))
+    assert not guardada["x"].to_numpy().flags.writeable
+
+
+def test_armazem_guarda_copia():
+    armazem = ArmazemSessao(disco=False)
+    df = pd.DataFrame({"xi": [1.0, 2.0], "fi": [3.0, 4.0]})
+    armazem.guardar("t", df)
+    df.loc[0, "fi"] = 0.0
+    assert armazem.obter("t")["fi"].tolist() == [3.0, 4.0]
+    assert armazem.guardar("t", df)
+
+
+def test_guardar_sem_mudanca_nao_converte():
+    # Rerun sem edição: compara direto com as colunas do DataFrame, sem montar outra tabela
+    armazem = ArmazemSessao(disco=False)
+    df = pd.DataFrame({"xi": np.arange(1_000_000, dtype=float), "fi": np.ones(1_000_000)})
+    assert armazem.guardar("t", df)
+    tracemalloc.start()
+    try:
+        assert not armazem.guardar("t", df)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert pico < df.memory_usage().sum() / 4
+    df.loc[10, "fi"] = 2.0
+    assert armazem.guardar("t", df)
+    assert armazem.obter("t")["fi"].sum() == 1_000_001
+
+
+def test_agregados_contam_no_orcamento():
+    from ferramentas.incremental import AgregadoClasses, AgregadoDiscreto
+
+    tabela = pd.DataFrame({"xi": np.arange(20_000, dtype=float), "fi": np.ones(20_000)})
+    armazem = ArmazemSessao(orcamento=2**30, disco=False)
+    armazem.guardar("df", tabela)
+    agregado = armazem.agregado("discreto", AgregadoDiscreto)
+    agregado.atualizar(tabela)
+    assert armazem.agregado("discreto", AgregadoDiscreto) is agregado
+    assert armazem.bytes_memoria == tabela.memory_usage(index=False).sum() + agregado.nbytes
+    assert agregado.nbytes > tabela.memory_usage().sum()
+    uso = armazem.uso()
+    assert uso["Tabela"].tolist() == ["df", "discreto"]
+    assert uso["Linhas"].tolist() == [20_000, 20_000]
+
+    # Passando do orçamento, o agregado usado há mais tempo é descartado e recriado vazio
+    armazem.orcamento = agregado.nbytes
+    armazem.agregado("classes", AgregadoClasses)
+    assert armazem.descartes == 1
+    novo = armazem.agregado("discreto", AgregadoDiscreto)
+    assert novo is not agregado and novo.linhas == 0
+    novo.atualizar(tabela)
+    assert novo.descrever(["media"]).media == agregado.descrever(["media"]).media
+
+
+def test_versao_muda_so_quando_o_conteudo_muda():
+    armazem = ArmazemSessao(disco=False)
+    assert armazem.versao("t") is None
+    df = pd.DataFrame({"xi": [1.0, 2.0], "fi": [3.0, 4.0]})
+    armazem.guardar("t", df)
+    v = armazem.versao("t")
+    armazem.guardar("t", df.copy())
+    assert armazem.versao("t") == v
+    armazem.guardar("t", df.assign(fi=[3.0, 5.0]))
+    assert armazem.versao("t") not in (None, v)
+    armazem.remover("t")
+    assert armazem.versao("t") is None
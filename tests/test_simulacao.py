@@ -0,0 +1,82 @@
+# test_simulacao.py
+"""
+A simulação depende só da semente e de n: o mesmo resultado, bit a bit, sorteando as
+partes no processo atual ou no pool de processos. comparar() deve concordar com os
+valores analíticos dentro de poucos erros padrão.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from ferramentas import simulacao
+from ferramentas.simulacao import Comparacao, ResumoSimulacao, comparar, simular, simular_tudo
+
+DISTRIBUICOES = [
+    ("uniforme", {"a": -1.0, "b": 3.0}, [(-math.inf, 0.0), (0.5, 1.5)]),
+    ("exponencial", {"lam": 0.5}, [(-math.inf, 1.0), (2.0, 6.0)]),
+    ("normal", {"mu": 10.0, "sigma": 2.0}, [(-math.inf, 8.0), (9.0, 13.0)]),
+    ("binomial", {"n": 30, "p": 0.3}, [(-math.inf, 7.0), (8.0, 11.0)]),
+    ("poisson", {"lam": 4.5}, [(-math.inf, 2.0), (4.0, 6.0)]),
+]
+
+
+def _campos(resumo: ResumoSimulacao) -> tuple:
+    return resumo.n, resumo.media, resumo.m2, resumo.contagens
+
+
+@pytest.mark.parametrize("nome, parametros, intervalos", DISTRIBUICOES[2:4])
+def test_processos_nao_mudam_o_resultado(nome, parametros, intervalos, monkeypatch):
+    # Partes pequenas para ter várias partes; a divisão é feita aqui e só o sorteio vai aos processos
+    monkeypatch.setattr(simulacao, "TAMANHO_PARTE", 10_000)
+    n = 45_678
+    local = simular_tudo(nome, parametros, n, intervalos, semente=7)
+    em_processos = simular_tudo(nome, parametros, n, intervalos, semente=7, processos=True)
+    assert local.n == n
+    assert _campos(em_processos) == _campos(local)
+    assert _campos(simular_tudo(nome, parametros, n, intervalos, semente=8)) != _campos(local)
+
+
+def test_estimativas_parciais_e_progresso(monkeypatch):
+    monkeypatch.setattr(simulacao, "TAMANHO_PARTE", 1_000)
+    avancos = []
+    parciais = list(simular("normal", {}, 3_500, [(0.0, math.inf)], progresso=lambda f, t: avancos.append((f, t))))
+    assert [r.n for r in parciais] == [1_000, 2_000, 3_000, 3_500]
+    assert avancos == [(1_000, 3_500), (2_000, 3_500), (3_000, 3_500), (3_500, 3_500)]
+
+
+def test_mesclar_igual_amostra_inteira():
+    x = np.random.default_rng(1).normal(1e6, 1.0, size=10_001)
+    intervalos = [(-math.inf, 1e6), (1e6 - 1, 1e6 + 1)]
+    partes = [ResumoSimulacao.de_amostra(p, intervalos) for p in np.array_split(x, 7)]
+    total = ResumoSimulacao(contagens=[0, 0])
+    for parte in partes:
+        total = total.mesclar(parte)
+    inteiro = ResumoSimulacao.de_amostra(x, intervalos)
+    assert total.n == inteiro.n and total.contagens == inteiro.contagens
+    assert total.media == pytest.approx(inteiro.media, rel=1e-15)
+    assert total.variancia == pytest.approx(x.var(ddof=1), rel=1e-10)
+
+
+@pytest.mark.parametrize("nome, parametros, intervalos", DISTRIBUICOES)
+def test_comparar_dentro_de_poucos_erros_padrao(nome, parametros, intervalos):
+    resumo = simular_tudo(nome, parametros, 200_000, intervalos)
+    linhas = comparar(nome, parametros, resumo, intervalos)
+    assert [l.medida for l in linhas][-2:] == ["Média", "Variância"]
+    assert linhas[0].medida.startswith("P(X ≤ ")
+    for linha in linhas[:-1]:
+        assert abs(linha.desvios) < 4.5, linha
+    variancia = linhas[-1]
+    assert variancia.desvios is None
+    assert variancia.simulado == pytest.approx(variancia.analitico, rel=0.02)
+
+
+def test_desvios_em_erros_padrao():
+    assert Comparacao("Média", 10.3, 10.0, 0.15).desvios == pytest.approx(2.0)
+    assert Comparacao("Variância", 4.1, 4.0, None).desvios is None
+
+
+@pytest.mark.parametrize("n", [0, -5, 2.5])
+def test_n_invalido(n):
+    with pytest.raises(ValueError, match="inteiro positivo"):
+        simular_tudo("normal", {}, n)
@@ -0,0 +1,94 @@
+# test_tabelas_frequencias.py
+"""
+As tabelas de frequências devem concordar com as medidas da mesma tabela: fi e Fac com
+a mediana e a moda, as colunas auxiliares com a média e a variância.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ferramentas import precisao
+from ferramentas.funcoes import (
+    construir_classes, media_agrupada, media_ponderada_df, mediana_agrupada, mediana_df,
+    moda_agrupada, moda_df, tabela_frequencias_classes, tabela_frequencias_discreta, variancia_df
+)
+
+
+def _conferir_acumuladas(t: pd.DataFrame):
+    fi = t["fi"].to_numpy()
+    n = fi.sum()
+    np.testing.assert_array_equal(t["Fac"], np.cumsum(fi))
+    np.testing.assert_allclose(t["fri"], fi / n, rtol=1e-15)
+    np.testing.assert_allclose(t["Fri"], np.cumsum(fi) / n, rtol=1e-15)
+    assert t["Fac"].iloc[-1] == n and t["Fri"].iloc[-1] == 1.0
+    assert math.fsum(t["fri"]) == pytest.approx(1.0, abs=1e-12)
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_discreta_concorda_com_as_medidas(semente):
+    rng = np.random.default_rng(semente)
+    linhas = int(rng.integers(3, 60))
+    df = pd.DataFrame({
+        "xi": rng.integers(0, 25, linhas) / rng.choice([1, 4, 10], linhas),  # xi repetidos, fora de ordem
+        "fi": rng.integers(0, 9, linhas).astype(float),
+    })
+    df.loc[len(df)] = [np.nan, 3.0]  # linha incompleta: ignorada
+    if df["fi"].sum() < 2:
+        df.loc[len(df)] = [1.0, 2.0]
+    t = tabela_frequencias_discreta(df, modo="exato")
+
+    # fi: contagem de cada xi distinto (fi > 0), em ordem crescente
+    completas = df.dropna()
+    esperado = completas.groupby("xi")["fi"].sum()
+    esperado = esperado[esperado > 0]
+    np.testing.assert_array_equal(t["xi"], esperado.index)
+    np.testing.assert_array_equal(t["fi"], esperado.to_numpy())
+    _conferir_acumuladas(t)
+
+    # Mediana e moda a partir da tabela
+    n = int(t["fi"].sum())
+    expandidos = np.repeat(t["xi"].to_numpy(), t["fi"].to_numpy().astype(int))
+    assert np.median(expandidos) == mediana_df(df)
+    modas, tipo = moda_df(df)
+    if tipo != "amodal":
+        assert sorted(modas) == t.loc[t["fi"] == t["fi"].max(), "xi"].tolist()
+
+    # Média e variância a partir das colunas auxiliares
+    assert math.fsum(t["xi·fi"]) / n == pytest.approx(media_ponderada_df(df, modo="exato"), rel=1e-14)
+    if n > 1:
+        assert math.fsum(t["(xi − x̄)²·fi"]) / (n - 1) == pytest.approx(variancia_df(df, modo="exato"),
+                                                                        rel=1e-12, abs=1e-300)
+
+
+def test_discreta_trunca_fi_como_as_medidas():
+    df = pd.DataFrame({"xi": [3.0, 1.0, 3.0, 2.0], "fi": [1.5, 2.9, 0.6, 0.4]})
+    t = tabela_frequencias_discreta(df)
+    assert t[["xi", "fi"]].to_dict("list") == {"xi": [1.0, 3.0], "fi": [2.0, 1.0]}
+    assert mediana_df(df) == 1.0 and moda_df(df) == ([1.0], "unimodal")
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_classes_concorda_com_as_medidas(semente):
+    valores = np.random.default_rng(semente).gamma(2.0, 3.0, size=500).round(1)
+    df = construir_classes(valores, "sturges")
+    t = tabela_frequencias_classes(df, modo="exato")
+    np.testing.assert_array_equal(t["Pmi"], (df["Li"] + df["Ls"]) / 2)
+    np.testing.assert_array_equal(t["fi"], df["fi"])
+    _conferir_acumuladas(t)
+
+    n = t["fi"].sum()
+    media = media_agrupada(df, modo="exato")
+    assert math.fsum(t["Pmi·fi"]) / n == pytest.approx(media, abs=0.005 + 1e-12)
+
+    # A última coluna usa a média do cartão: dividida por N − 1 é a variância antes de arredondar
+    variancia = precisao.variancia_amostral(t["Pmi"].to_numpy(), t["fi"].to_numpy(), centro=media, modo="exato")
+    assert math.fsum(t["(Pmi − x̄)²·fi"]) / (n - 1) == pytest.approx(variancia, rel=1e-12)
+
+    # Mediana pela primeira classe com Fri ≥ 1/2 e moda bruta pelas classes de fi máximo
+    i = int(np.searchsorted(t["Fac"], n / 2))
+    anterior = t["Fac"].iloc[i - 1] if i else 0.0
+    mediana = t["Li"].iloc[i] + (n / 2 - anterior) / t["fi"].iloc[i] * (t["Ls"].iloc[i] - t["Li"].iloc[i])
+    assert mediana_agrupada(df) == pytest.approx(mediana, abs=0.005 + 1e-12)
+    assert moda_agrupada(df)[0] == t.loc[t["fi"] == t["fi"].max(), "Pmi"].tolist()
@@ -0,0 +1,93 @@
+# test_tarefas.py
+"""
+submeter deve cancelar a tarefa anterior da mesma chave sem esperar por ela, e o
+cancelamento deve parar a função na próxima chamada de progresso; mapear devolve os
+resultados na ordem e não espera os blocos da fila quando o consumo para.
+"""
+import threading
+import time
+
+import pytest
+
+from ferramentas.tarefas import Cancelada, mapear, submeter
+
+
+def _contar(ate: int, passo: float, eventos: dict, progresso=None):
+    # Um bloco por iteração; registra se parou por cancelamento
+    eventos["inicio"].set()
+    try:
+        for i in range(ate):
+            time.sleep(passo)
+            progresso(i + 1, ate)
+    except Cancelada:
+        eventos["cancelada"].set()
+        raise
+    return ate
+
+
+def _eventos() -> dict:
+    return {"inicio": threading.Event(), "cancelada": threading.Event()}
+
+
+def test_conclui_com_progresso():
+    estado = {}
+    tarefa = submeter(estado, "t", _contar, 5, 0.001, _eventos())
+    assert estado["t"] is tarefa
+    assert tarefa.resultado(espera=10) == 5
+    assert tarefa.terminada and tarefa.fracao == 1.0
+    assert (tarefa.feito, tarefa.total) == (5, 5)
+
+
+def test_novo_envio_substitui_o_anterior():
+    estado = {}
+    eventos = _eventos()
+    anterior = submeter(estado, "t", _contar, 10_000, 0.001, eventos)
+    assert eventos["inicio"].wait(10)
+    inicio = time.perf_counter()
+    nova = submeter(estado, "t", _contar, 3, 0.0, _eventos())
+    assert time.perf_counter() - inicio < 1  # não espera a anterior
+    assert estado["t"] is nova
+    assert nova.resultado(espera=10) == 3
+    with pytest.raises(Cancelada):
+        anterior.resultado()
+    assert eventos["cancelada"].wait(10)  # a função anterior parou no progresso seguinte
+
+
+def test_chaves_diferentes_nao_se_cancelam():
+    estado = {}
+    a = submeter(estado, "a", _contar, 3, 0.001, _eventos())
+    b = submeter(estado, "b", _contar, 4, 0.001, _eventos())
+    assert (a.resultado(espera=10), b.resultado(espera=10)) == (3, 4)
+
+
+def test_cancelar_levanta_na_hora():
+    eventos = _eventos()
+    tarefa = submeter({}, "t", _contar, 10_000, 0.001, eventos)
+    assert eventos["inicio"].wait(10)
+    tarefa.cancelar()
+    inicio = time.perf_counter()
+    with pytest.raises(Cancelada):
+        tarefa.resultado()
+    assert time.perf_counter() - inicio < 0.5
+    assert tarefa.cancelada
+    assert eventos["cancelada"].wait(10)
+
+
+def test_erro_da_funcao_e_relancado():
+    def falhar(progresso=None):
+        raise ValueError("entrada ruim")
+
+    with pytest.raises(ValueError, match="entrada ruim"):
+        submeter({}, "t", falhar).resultado(espera=10)
+
+
+def test_mapear_em_ordem_e_para_sem_esperar_a_fila():
+    assert list(mapear(abs, range(-20, 0))) == list(range(20, 0, -1))
+    # Consumidor para no primeiro resultado (como uma Cancelada no progresso): os blocos
+    # ainda na fila são cancelados, e só os que já rodam terminam
+    inicio = time.perf_counter()
+    blocos = mapear(time.sleep, [0.2] * 100)
+    next(blocos)
+    blocos.close()
+    assert time.perf_counter() - inicio < 100 * 0.2 / 4
+    assert list(mapear(abs, [-1, -2])) == [1, 2]  # o pool continua utilizável
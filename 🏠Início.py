@@ -1,5 +1,11 @@
 import streamlit as st
 
+from ferramentas.aquecimento import iniciar as iniciar_aquecimento
+
+# Aquecimento do servidor (uma vez por processo, em segundo plano): pandas, gráficos e
+# cálculos ficam prontos enquanto esta página, que não usa nenhum deles, é exibida
+iniciar_aquecimento()
+
 # -------------------------------
 # Configuração da página
 # -------------------------------